@@ -0,0 +1,289 @@
+from contextlib import contextmanager
+from urllib.parse import urlparse
+import argparse
+import json
+import os
+import re
+import subprocess
+import tempfile
+import time
+
+from selenium.webdriver.support.ui import WebDriverWait
+
+import main
+from browser_manager import BrowserManager
+from popup_handler import PopupHandler
+from sofascore_scraper import SofaScoreScraper
+from player_scraper import PlayerScraper
+from worker_pool import ScraperWorker
+from replay_server import ReplayServer
+from instrumentation import metrics
+
+SITE_URL = "https://www.sofascore.com"
+LEAGUE_URL = "https://www.sofascore.com/en-us/tournament/soccer/spain/laliga/8#id:61643"
+
+SCRIPT_PATTERN = re.compile(r"<script\b[^>]*>.*?</script>", re.IGNORECASE | re.DOTALL)
+
+
+def _record_path(root, url):
+    path = urlparse(url).path.strip('/') or 'index'
+    return os.path.join(root, path + '.html')
+
+
+def _save_page(root, url, page_source):
+    # Scripts are dropped so that the replayed page stays exactly as rendered
+    # and never reaches out to the live site
+    path = _record_path(root, url)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(SCRIPT_PATTERN.sub('', page_source))
+
+
+def record(root, league_url=LEAGUE_URL, max_teams=2, max_players=5):
+    """
+    Records rendered standings, team and player pages from the live site for replay.
+
+    Team pages are saved in list view and player pages with the competition
+    selected, which is the state the scrapers expect to find them in.
+
+    Parameters:
+        root (str): Directory to save the pages to.
+        league_url (str): Standings page to start from.
+        max_teams (int): Number of teams to record.
+        max_players (int): Number of players to record per team.
+    """
+    browser_manager = BrowserManager(headless=True)
+    driver = browser_manager.get_driver()
+    popup_handler = PopupHandler(driver)
+    player_scraper = PlayerScraper(driver, popup_handler)
+    sofascore_scraper = SofaScoreScraper(driver, popup_handler, navigator=player_scraper.navigator)
+    sofascore_scraper.league_url = league_url
+
+    try:
+        teams = sofascore_scraper.get_teams()[:max_teams]
+        _save_page(root, league_url, driver.page_source)
+
+        for team in teams:
+            player_scraper.navigator.navigate(team['url'])
+            popup_handler.cerrar_popup()
+            sofascore_scraper.switch_to_list_view()
+            _save_page(root, team['url'], driver.page_source)
+            links = [a.get_attribute('href') for a in driver.find_elements(
+                "xpath", "//table[contains(@class, 'fEUhaC')]//tr[@class='TableRow ygnhC']//td[1]//a"
+            )][:max_players]
+
+            for link in links:
+                player_scraper.navigator.navigate(link)
+                popup_handler.cerrar_popup()
+                if player_scraper.select_competition():
+                    _save_page(root, link, driver.page_source)
+    finally:
+        browser_manager.quit()
+
+
+class BenchmarkProbe:
+    """
+    Measures a scraping run from the outside by wrapping the methods it goes through.
+
+    WebDriver commands and phase timings come from the shared instrumentation,
+    which is reset when the probe is attached.
+
+    Attributes:
+        teams (list[dict]): Wall time of every team scraped.
+        players (list[dict]): Wall time of every player scraped.
+        wait_seconds (float): Time spent in explicit waits.
+        sleep_seconds (float): Time spent in fixed sleeps.
+    """
+
+    def __init__(self):
+        self.teams = []
+        self.players = []
+        self.wait_seconds = 0.0
+        self.sleep_seconds = 0.0
+
+    @contextmanager
+    def attached(self):
+        """
+        Wraps the scraper and wait methods for the duration of the block.
+        """
+        probe = self
+        metrics.reset()
+        originals = {
+            (WebDriverWait, 'until'): WebDriverWait.until,
+            (ScraperWorker, 'scrape_team'): ScraperWorker.scrape_team,
+            (PlayerScraper, 'scrape_player'): PlayerScraper.scrape_player,
+            (time, 'sleep'): time.sleep,
+        }
+        original_sleep = time.sleep
+
+        def until(wait, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return originals[(WebDriverWait, 'until')](wait, *args, **kwargs)
+            finally:
+                probe.wait_seconds += time.perf_counter() - start
+
+        def scrape_team(worker, team):
+            start = time.perf_counter()
+            try:
+                return originals[(ScraperWorker, 'scrape_team')](worker, team)
+            finally:
+                probe.teams.append({'team': team['name'], 'seconds': time.perf_counter() - start})
+
+        def scrape_player(scraper, player, team_name):
+            start = time.perf_counter()
+            try:
+                return originals[(PlayerScraper, 'scrape_player')](scraper, player, team_name)
+            finally:
+                probe.players.append({'player': player['link'], 'team': team_name,
+                                      'seconds': time.perf_counter() - start})
+
+        def sleep(seconds):
+            probe.sleep_seconds += seconds
+            original_sleep(seconds)
+
+        replacements = {
+            (WebDriverWait, 'until'): until,
+            (ScraperWorker, 'scrape_team'): scrape_team,
+            (PlayerScraper, 'scrape_player'): scrape_player,
+            (time, 'sleep'): sleep,
+        }
+        for (owner, name), replacement in replacements.items():
+            setattr(owner, name, replacement)
+        try:
+            yield self
+        finally:
+            for (owner, name), original in originals.items():
+                setattr(owner, name, original)
+
+    def summary(self, wall_seconds):
+        """
+        Returns the measurements of the run.
+
+        Parameters:
+            wall_seconds (float): Wall time of the whole run.
+
+        Returns:
+            dict: Totals and per-team and per-player timings.
+        """
+        team_times = [team['seconds'] for team in self.teams]
+        player_times = [player['seconds'] for player in self.players]
+        instrumented = metrics.summary()
+        return {
+            'wall_seconds': wall_seconds,
+            'webdriver_commands': instrumented['total_commands'],
+            'wait_seconds': self.wait_seconds,
+            'sleep_seconds': self.sleep_seconds,
+            'mean_team_seconds': sum(team_times) / len(team_times) if team_times else None,
+            'mean_player_seconds': sum(player_times) / len(player_times) if player_times else None,
+            'teams': self.teams,
+            'players': self.players,
+            'phases': instrumented['phases'],
+            'commands': instrumented['commands'],
+        }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(root, output_dir="bench_results", workers=1, league_url=LEAGUE_URL, **main_options):
+    """
+    Runs `main` in headless Chrome against recorded pages served from a local server.
+
+    Parameters:
+        root (str): Directory holding the pages saved by `record`.
+        output_dir (str): Directory the JSON results are written to.
+        workers (int): Number of browsers `main` scrapes with.
+        league_url (str): Standings page the recording started from.
+        **main_options: Extra keyword arguments for `main.main`.
+
+    Returns:
+        dict: The benchmark results, also saved as JSON.
+    """
+    root = os.path.abspath(root)
+    output_dir = os.path.abspath(output_dir)
+    probe = BenchmarkProbe()
+    working_dir = os.getcwd()
+
+    with ReplayServer(root, rewrite_from=SITE_URL) as server, tempfile.TemporaryDirectory() as scratch:
+        replay_league_url = server.url + urlparse(league_url).path
+        os.chdir(scratch)  # Keep the run's CSV and checkpoint files out of the working tree
+        try:
+            with probe.attached():
+                start = time.perf_counter()
+                main.main(workers=workers, headless=True, league_url=replay_league_url, **main_options)
+                wall_seconds = time.perf_counter() - start
+        finally:
+            os.chdir(working_dir)
+
+    results = {
+        'commit': _git_commit(),
+        'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'workers': workers,
+        'options': main_options,
+        **probe.summary(wall_seconds),
+    }
+    os.makedirs(output_dir, exist_ok=True)
+    output_path = os.path.join(output_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{results['commit'] or 'unknown'}.json")
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Benchmark results saved to {output_path}")
+    return results
+
+
+def compare(baseline_path, candidate_path):
+    """
+    Prints how the totals of two saved benchmark runs differ.
+
+    Parameters:
+        baseline_path (str): JSON results of the earlier run.
+        candidate_path (str): JSON results of the later run.
+    """
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(candidate_path, encoding='utf-8') as f:
+        candidate = json.load(f)
+
+    print(f"{'metric':<22}{baseline['commit'] or 'baseline':>14}{candidate['commit'] or 'candidate':>14}{'change':>10}")
+    for metric in ('wall_seconds', 'mean_team_seconds', 'mean_player_seconds', 'webdriver_commands',
+                   'wait_seconds', 'sleep_seconds'):
+        before, after = baseline.get(metric), candidate.get(metric)
+        if before is None or after is None:
+            continue
+        change = f"{100 * (after - before) / before:+.0f}%" if before else "n/a"
+        print(f"{metric:<22}{before:>14.2f}{after:>14.2f}{change:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the scraping pipeline against recorded pages.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="Record pages from the live site.")
+    record_parser.add_argument("root", help="Directory to save the pages to.")
+    record_parser.add_argument("--teams", type=int, default=2, help="Number of teams to record.")
+    record_parser.add_argument("--players", type=int, default=5, help="Number of players to record per team.")
+
+    run_parser = commands.add_parser("run", help="Replay recorded pages through main.")
+    run_parser.add_argument("root", help="Directory holding the recorded pages.")
+    run_parser.add_argument("--output-dir", default="bench_results", help="Directory to write the results to.")
+    run_parser.add_argument("--workers", type=int, default=1, help="Number of browsers to scrape with.")
+    run_parser.add_argument("--profile", help="Browser profile to scrape with, e.g. 'lean'.")
+
+    compare_parser = commands.add_parser("compare", help="Compare two saved runs.")
+    compare_parser.add_argument("baseline", help="JSON results of the earlier run.")
+    compare_parser.add_argument("candidate", help="JSON results of the later run.")
+
+    args = parser.parse_args()
+    if args.command == "record":
+        record(args.root, max_teams=args.teams, max_players=args.players)
+    elif args.command == "run":
+        run(args.root, output_dir=args.output_dir, workers=args.workers, profile=args.profile, measure_traffic=True)
+    else:
+        compare(args.baseline, args.candidate)
@@ -1,8 +1,162 @@
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import SessionNotCreatedException
 from webdriver_manager.chrome import ChromeDriverManager
+from concurrent.futures import ThreadPoolExecutor
+import json
 import os
+import threading
+import time
+
+from instrumentation import metrics
+
+# Requests the statistics never depend on: images, fonts, media and ad/tracking hosts.
+# SofaScore serves team and player pictures from extensionless '/image' paths.
+BLOCKED_URL_PATTERNS = [
+    "*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*", "*/image", "*/image?*",
+    "*.woff*", "*.ttf*", "*.otf*", "*.eot*",
+    "*.mp4*", "*.webm*", "*.mp3*", "*.m3u8*",
+    "*doubleclick.net*", "*googlesyndication.com*", "*googletagservices.com*", "*googletagmanager.com*",
+    "*google-analytics.com*", "*adservice.google.*", "*amazon-adsystem.com*", "*criteo.*", "*taboola.com*",
+    "*outbrain.com*", "*scorecardresearch.com*", "*facebook.net*", "*hotjar.com*", "*adnxs.com*",
+]
+
+# Browser settings selectable by name. 'default' is the visible, maximized browser
+# the scraper always used; 'lean' only loads what reading the statistics needs.
+# The viewport stays wide enough for SofaScore's desktop layout, which the XPaths target.
+BROWSER_PROFILES = {
+    'default': {'headless': False, 'window_size': None, 'block_resources': False},
+    'headless': {'headless': True, 'window_size': None, 'block_resources': False},
+    'lean': {'headless': True, 'window_size': (1280, 800), 'block_resources': True},
+}
+
+
+# File remembering where webdriver-manager put the ChromeDriver binary
+DRIVER_PATH_CACHE = ".chromedriver_path"
+
+_driver_path_lock = threading.Lock()
+
+
+def resolve_driver_path(cache_file=DRIVER_PATH_CACHE, refresh=False):
+    """
+    Returns the path of the ChromeDriver binary, resolving it only once.
+
+    `ChromeDriverManager().install()` is only called when no cached path exists,
+    the cached binary is gone, or `refresh` is set. Browsers started at the same
+    time share a single resolution.
+
+    Parameters:
+        cache_file (str): File the resolved path is cached in.
+        refresh (bool): Resolve the path again, e.g. after Chrome was updated.
+
+    Returns:
+        str: Path of the ChromeDriver executable.
+    """
+    with _driver_path_lock:
+        if not refresh:
+            try:
+                with open(cache_file, encoding='utf-8') as f:
+                    path = f.read().strip()
+                if os.path.isfile(path) and os.access(path, os.X_OK):
+                    return path
+            except OSError:
+                pass
+
+        # Set WDM_LOCAL to use the cached ChromeDriver without checking for updates
+        os.environ["WDM_LOCAL"] = "1"
+        path = ChromeDriverManager().install()
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            f.write(path)
+        return path
+
+
+class TrafficMeter:
+    """
+    Measures the bytes a browser downloads for each page it loads.
+
+    Chrome's performance log reports the encoded size of every finished
+    request. The log is drained whenever the driver navigates, and the bytes
+    are attributed to the page that was showing until then.
+
+    Attributes:
+        page_bytes (dict): Bytes transferred per page URL.
+        pages (int): Number of page loads measured.
+    """
+
+    def __init__(self, driver):
+        """
+        Starts measuring the driver's navigations.
+
+        Parameters:
+            driver (webdriver.Chrome): A driver started with performance logging enabled.
+        """
+        self.driver = driver
+        self.page_bytes = {}
+        self.pages = 0
+        self._current_url = None
+
+        execute = driver.execute
+
+        def metered_execute(driver_command, params=None):
+            if driver_command == 'get':
+                self.drain()
+                self._current_url = params['url']
+                self.pages += 1
+            return execute(driver_command, params)
+
+        driver.execute = metered_execute
+
+    def drain(self):
+        """
+        Reads the requests finished since the last call and attributes them to the current page.
+
+        Returns:
+            int: Bytes transferred since the last call.
+        """
+        if self._current_url is None:
+            return 0
+        transferred = 0
+        for entry in self.driver.get_log('performance'):
+            message = json.loads(entry['message'])['message']
+            if message['method'] == 'Network.loadingFinished':
+                transferred += message['params'].get('encodedDataLength', 0)
+        self.page_bytes[self._current_url] = self.page_bytes.get(self._current_url, 0) + transferred
+        return transferred
+
+    def total_bytes(self):
+        """
+        Returns the bytes transferred over every page measured so far.
+        """
+        return sum(self.page_bytes.values())
+
+
+def report_traffic(meters, profile=None, top=5):
+    """
+    Prints the bytes transferred by several browsers, in total and for their heaviest pages.
+
+    Each meter is drained first, so the pages showing when the run ended are counted.
+
+    Parameters:
+        meters (list[TrafficMeter]): The meters of every browser.
+        profile (str, optional): The browser profile the run used, for the summary line.
+        top (int): Number of the heaviest pages to list.
+    """
+    page_bytes = {}
+    for meter in meters:
+        meter.drain()
+        for url, transferred in meter.page_bytes.items():
+            page_bytes[url] = page_bytes.get(url, 0) + transferred
+    pages = sum(meter.pages for meter in meters)
+    transferred = sum(page_bytes.values())
+    print(f"Transferred {transferred / 1024:.0f} KB over {pages} pages "
+          f"({transferred / 1024 / max(pages, 1):.0f} KB per page, profile '{profile or 'default'}')")
+    heaviest = sorted(page_bytes.items(), key=lambda item: item[1], reverse=True)[:top]
+    if heaviest:
+        print("Heaviest pages:")
+    for url, page_transferred in heaviest:
+        print(f"    {page_transferred / 1024:8.0f} KB  {url}")
+
 
 class BrowserManager:
     """
@@ -10,35 +164,129 @@ class BrowserManager:
 
     Attributes:
         driver (webdriver.Chrome): The active WebDriver instance.
+        profile (dict): The browser settings in use.
+        traffic (TrafficMeter | None): Bytes transferred per page, if measured.
+        attached (bool): Whether the driver attached to an already running browser,
+            which is then left running on `quit`.
     """
 
-    def __init__(self):
+    def __init__(self, headless=False, profile=None, measure_traffic=False, user_data_dir=None,
+                 debugger_address=None, remote_url=None):
         """
         Initializes the BrowserManager class.
 
         This sets up the WebDriver with Chrome options and a local ChromeDriver,
         configured to start maximized, disable extensions, and use eager page load strategy.
-        Also, sets timeouts for page load and implicit waits.
+        Also, sets the page load timeout; element waits go through AdaptiveWait
+        rather than an implicit wait. Every command the driver sends is timed by the
+        shared instrumentation.
+
+        Parameters:
+            headless (bool): Whether to run Chrome without a visible window.
+            profile (str, optional): Name of a BROWSER_PROFILES entry whose settings
+                override `headless`: window size and blocking of images, fonts, media and
+                ad domains through CDP `Network.setBlockedURLs`.
+            measure_traffic (bool): Whether to record the bytes transferred per page in
+                `traffic`.
+            user_data_dir (str, optional): Persistent Chrome profile directory, so that
+                cookies such as the consent choice survive between runs.
+            debugger_address (str, optional): 'host:port' of a running Chrome started with
+                --remote-debugging-port to attach to instead of launching one.
+            remote_url (str, optional): URL of a remote WebDriver (e.g. Selenium Grid)
+                to start the session on instead of a local ChromeDriver.
 
         Raises:
             WebDriverException: If the ChromeDriver fails to initialize.
         """
-        # Set WDM_LOCAL to use the cached ChromeDriver without checking for updates
-        os.environ["WDM_LOCAL"] = "1"
-
+        start = time.perf_counter()
+        self.profile = dict(BROWSER_PROFILES[profile]) if profile is not None else dict(BROWSER_PROFILES['default'], headless=headless)
 
         chrome_options = Options()
-        chrome_options.add_argument("--start-maximized")
+        if self.profile['window_size'] is None:
+            chrome_options.add_argument("--start-maximized")
+        else:
+            chrome_options.add_argument("--window-size={},{}".format(*self.profile['window_size']))
         chrome_options.add_argument("--disable-extensions")
+        if self.profile['headless']:
+            chrome_options.add_argument("--headless=new")
+        if user_data_dir is not None:
+            chrome_options.add_argument(f"--user-data-dir={os.path.abspath(user_data_dir)}")
+        if debugger_address is not None:
+            # The running browser keeps its own window and profile settings
+            chrome_options = Options()
+            chrome_options.debugger_address = debugger_address
+        if measure_traffic:
+            chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
         chrome_options.page_load_strategy = 'eager'
 
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
+        self.attached = debugger_address is not None
+        if remote_url is not None:
+            self.driver = webdriver.Remote(command_executor=remote_url, options=chrome_options)
+        else:
+            try:
+                self.driver = webdriver.Chrome(service=Service(resolve_driver_path()), options=chrome_options)
+            except SessionNotCreatedException:
+                # The cached driver no longer matches the installed Chrome
+                self.driver = webdriver.Chrome(service=Service(resolve_driver_path(refresh=True)), options=chrome_options)
 
         # Set timeouts to manage long load times
-        self. driver.set_page_load_timeout(30)  # Page load timeout
-        self.driver.implicitly_wait(10)  # Element load wait
+        self.driver.set_page_load_timeout(30)  # Page load timeout
+
+        if self.profile['block_resources'] and hasattr(self.driver, 'execute_cdp_cmd'):
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+        self.traffic = TrafficMeter(self.driver) if measure_traffic else None
+        metrics.instrument_driver(self.driver)
+        metrics.observe('browser_start', time.perf_counter() - start)
     
+    @classmethod
+    def pool(cls, size, headless=True, **browser_options):
+        """
+        Starts several browser instances at once for parallel scraping.
+
+        The browsers are launched concurrently so that pool start-up costs roughly
+        as much as a single browser start-up.
+
+        Parameters:
+            size (int): Number of browser instances to start.
+            headless (bool): Whether the browsers run without a visible window.
+            **browser_options: Extra keyword arguments for every BrowserManager, e.g. `profile`.
+                A `user_data_dir` is split into one subdirectory per browser, since Chrome
+                cannot share a profile directory between instances.
+
+        Returns:
+            list[BrowserManager]: The started browser managers.
+
+        Raises:
+            ValueError: If several browsers would attach to the same debugging address.
+            WebDriverException: If any ChromeDriver fails to initialize. Browsers that
+                did start are closed before the exception is raised.
+        """
+        if size > 1 and browser_options.get('debugger_address') is not None:
+            raise ValueError("Only one browser can attach to a debugging address")
+        user_data_dir = browser_options.pop('user_data_dir', None)
+
+        def options_for(index):
+            if user_data_dir is None:
+                return browser_options
+            return dict(browser_options, user_data_dir=os.path.join(user_data_dir, f"worker-{index}"))
+
+        with ThreadPoolExecutor(max_workers=size) as executor:
+            futures = [executor.submit(cls, headless, **options_for(i)) for i in range(size)]
+
+        managers = []
+        error = None
+        for future in futures:
+            try:
+                managers.append(future.result())
+            except Exception as e:
+                error = e
+        if error is not None:
+            for manager in managers:
+                manager.quit()
+            raise error
+        return managers
+
     def get_driver(self):
         """
         Returns the active WebDriver instance.
@@ -54,6 +302,14 @@ class BrowserManager:
         Closes the WebDriver instance and quits the browser session.
 
         This should be called to free up resources after completing browser interactions.
+        A browser attached through its debugging address is left running for the next
+        run; only the ChromeDriver started for it is stopped. Through a remote WebDriver
+        there is no local ChromeDriver, so nothing is stopped.
         """
+        if self.attached:
+            service = getattr(self.driver, 'service', None)
+            if service is not None:
+                service.stop()
+            return
         self.driver.quit()
 
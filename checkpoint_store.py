@@ -0,0 +1,160 @@
+import json
+import sqlite3
+import threading
+import time
+
+
+class CheckpointStore:
+    """
+    A durable record of the players and teams finished during a scrape run.
+
+    Backed by SQLite in WAL mode, so every player is committed as soon as it is
+    scraped and survives a browser or process crash. Players and teams are kept
+    per competition and season, so the jobs of a multi-season run resume
+    independently. One store can be shared by every worker of a run.
+
+    Attributes:
+        path (str): Location of the SQLite database.
+    """
+
+    def __init__(self, path="scrape_checkpoint.db"):
+        """
+        Opens the store, creating its tables if needed.
+
+        A checkpoint written without competition and season by an earlier version
+        is discarded, since its players cannot be assigned to a job.
+
+        Parameters:
+            path (str): Location of the SQLite database.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(players)")]
+        if columns and 'competition' not in columns:
+            print(f"Discarding the checkpoint in {path}, recorded without competition and season")
+            self._conn.execute("DROP TABLE players")
+            self._conn.execute("DROP TABLE IF EXISTS teams")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS players (
+                competition TEXT NOT NULL,
+                season TEXT NOT NULL,
+                team TEXT NOT NULL,
+                player_url TEXT NOT NULL,
+                player_name TEXT NOT NULL,
+                stats TEXT NOT NULL,
+                completed_at REAL NOT NULL,
+                PRIMARY KEY (competition, season, team, player_url)
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS teams (
+                competition TEXT NOT NULL,
+                season TEXT NOT NULL,
+                team TEXT NOT NULL,
+                completed_at REAL NOT NULL,
+                PRIMARY KEY (competition, season, team)
+            )
+            """
+        )
+
+    def record_player(self, team_name, player_url, player_name, stats, competition, season):
+        """
+        Records a finished player, replacing any earlier record for the same page and job.
+
+        Parameters:
+            team_name (str): The player's team.
+            player_url (str): URL of the player's page.
+            player_name (str): The player's name.
+            stats (dict): The player's statistics.
+            competition (str): The competition the statistics belong to.
+            season (str): The season the statistics belong to.
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO players VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (competition, season, team_name, player_url, player_name, json.dumps(stats), time.time())
+            )
+
+    def record_team(self, team_name, competition, season):
+        """
+        Records that every player of a team has been scraped for a competition and season.
+
+        Parameters:
+            team_name (str): The finished team.
+            competition (str): The competition the team was scraped for.
+            season (str): The season the team was scraped for.
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO teams VALUES (?, ?, ?, ?)", (competition, season, team_name, time.time())
+            )
+
+    def team_completed(self, team_name, competition, season):
+        """
+        Returns whether a team was finished for a competition and season in the checkpointed run.
+
+        Parameters:
+            team_name (str): The team to look up.
+            competition (str): The competition to look up.
+            season (str): The season to look up.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM teams WHERE competition = ? AND season = ? AND team = ?",
+                (competition, season, team_name)
+            ).fetchone()
+        return row is not None
+
+    def completed_players(self, team_name, competition, season):
+        """
+        Returns the finished players of a team for a competition and season.
+
+        Parameters:
+            team_name (str): The team to look up.
+            competition (str): The competition to look up.
+            season (str): The season to look up.
+
+        Returns:
+            dict: Each finished player's name and statistics, keyed by the player's URL.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT player_url, player_name, stats FROM players WHERE competition = ? AND season = ? AND team = ?",
+                (competition, season, team_name)
+            ).fetchall()
+        return {url: (name, json.loads(stats)) for url, name, stats in rows}
+
+    def load_team(self, team_name, competition, season):
+        """
+        Returns the finished players of a team in the layout of `PlayerScraper.teams_data`.
+
+        Parameters:
+            team_name (str): The team to load.
+            competition (str): The competition to load.
+            season (str): The season to load.
+
+        Returns:
+            dict: The players' statistics, keyed by player name.
+        """
+        return {name: stats for name, stats in self.completed_players(team_name, competition, season).values()}
+
+    def clear(self):
+        """
+        Forgets every recorded player and team, to start a fresh run.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM players")
+            self._conn.execute("DELETE FROM teams")
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        with self._lock:
+            self._conn.close()
@@ -1,2 +1,11 @@
 class CompetitionNotAvailableException(Exception):
     pass
+
+
+class PlayerScrapeError(Exception):
+    """
+    Raised when a player page does not show what is needed to scrape it, e.g.
+    its statistics block never appears. Unlike a competition or season the
+    player does not play in, this is usually transient and worth retrying.
+    """
+    pass
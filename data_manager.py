@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 
+CURRENT_SEASON = "24/25"
+
 def clean_stat_value(raw_text, index):
     """
     Cleans and converts a statistical value from a text string.
@@ -20,6 +22,28 @@ def clean_stat_value(raw_text, index):
 
     return value_str
 
+# Sample structure with all possible columns for both field players and goalkeepers
+COLUMNS = [
+    # General stats (applicable to both field players and goalkeepers)
+    'Games Played', 'Minutes Played',
+
+    # Field player stats
+    'Goals', 'Expected Goals (xG)','Big Chances Missed' ,'Shots Per Game', 'Shots on Target Per Game',
+    'Assists', 'Expected Assists (xA)', 'Big Chances Created', 'Key Passes Per Game',
+    'Passes Completed Per Game', 'Pass Completion Percentage','Succesful Passes Opp. Half',
+    'Succesful Passes Opp. Half Percentage', 'Succesful Long Balls', 'Succesful Long Balls Percentage',
+    'Successful Dribbles Per Game', 'Total Duels Won Per Game', 'Total Duels Won Percentage',
+    'Ground Duels Won Per Game', 'Ground Duels Won Percentage', 'Aerial Duels Won Per Game', 
+    'Aerial Duels Won Percentage', 'Interceptions Per Game', 'Tackles Per Game', 'Possession Won Opp. Half',
+    'Balls Recovered Per Game', 'Dribbled Past Per Game', 'Clearances Per Game', 
+    'Possession Lost Per Game','Fouls Committed Per Game' ,'Fouls Received Per Game', 'Offsides Per Game',
+
+    # Goalkeeper stats
+    'Goals Conceded Per Game', 'Penalties Saved', 'Penalties Faced', 'Saves Per Game', 'Saves Per Game Percentage',
+    'Goals Conceded', 'Total Saves', 'Goals Prevented', 'Passes Completed', 
+    'Percentage of Passes Completed', 'Clean Sheets', 'Errors leading to shot', 'Errors leading to goal'
+]
+
 def create_dataframe(teams_data):
     """
     Convert the structured dictionary into a pandas DataFrame with multi-level indexing
@@ -32,27 +56,7 @@ def create_dataframe(teams_data):
     - pd.DataFrame: The resulting DataFrame with teams and players as multi-level indices.
     """
 
-    # Sample structure with all possible columns for both field players and goalkeepers
-    columns = [
-        # General stats (applicable to both field players and goalkeepers)
-        'Games Played', 'Minutes Played',
-
-        # Field player stats
-        'Goals', 'Expected Goals (xG)','Big Chances Missed' ,'Shots Per Game', 'Shots on Target Per Game',
-        'Assists', 'Expected Assists (xA)', 'Big Chances Created', 'Key Passes Per Game',
-        'Passes Completed Per Game', 'Pass Completion Percentage','Succesful Passes Opp. Half',
-        'Succesful Passes Opp. Half Percentage', 'Succesful Long Balls', 'Succesful Long Balls Percentage',
-        'Successful Dribbles Per Game', 'Total Duels Won Per Game', 'Total Duels Won Percentage',
-        'Ground Duels Won Per Game', 'Ground Duels Won Percentage', 'Aerial Duels Won Per Game', 
-        'Aerial Duels Won Percentage', 'Interceptions Per Game', 'Tackles Per Game', 'Possession Won Opp. Half',
-        'Balls Recovered Per Game', 'Dribbled Past Per Game', 'Clearances Per Game', 
-        'Possession Lost Per Game','Fouls Committed Per Game' ,'Fouls Received Per Game', 'Offsides Per Game',
-        
-        # Goalkeeper stats
-        'Goals Conceded Per Game', 'Penalties Saved', 'Penalties Faced', 'Saves Per Game', 'Saves Per Game Percentage',
-        'Goals Conceded', 'Total Saves', 'Goals Prevented', 'Passes Completed', 
-        'Percentage of Passes Completed', 'Clean Sheets', 'Errors leading to shot', 'Errors leading to goal'
-    ]
+    columns = COLUMNS
 
     data = []
 
@@ -64,7 +68,175 @@ def create_dataframe(teams_data):
             player_data['Player Name'] = player_name
             data.append(player_data)
     
-    # Create DataFrame and set multi-level index
-    df = pd.DataFrame(data)
+    # Create DataFrame and set multi-level index; the columns are given so that no players still yields them
+    df = pd.DataFrame(data, columns=['Team', 'Player Name'] + columns)
     df.set_index(['Team', 'Player Name'], inplace=True)
     return df
+
+# Columns holding whole-season counts; every other column is a rate or percentage
+COUNT_COLUMNS = [
+    'Games Played', 'Goals', 'Big Chances Missed', 'Assists', 'Big Chances Created',
+    'Penalties Saved', 'Penalties Faced', 'Goals Conceded', 'Total Saves', 'Clean Sheets',
+    'Errors leading to shot', 'Errors leading to goal'
+]
+
+# Columns that may hold an "a/b" fraction, mapped to the column that receives "b"
+FRACTION_COLUMNS = {'Penalties Saved': 'Penalties Faced'}
+
+def convert_stat_columns(df):
+    """
+    Convert the raw text statistics of a player DataFrame into compact numeric columns.
+
+    Whole columns are converted at once: percent signs and thousands separators
+    are stripped, "a/b" fractions are split (the denominator going to the paired
+    column in FRACTION_COLUMNS), and anything unparseable becomes missing.
+    Count columns become nullable int16, every other column float32 with NaN for
+    missing values. The Team and Player Name index levels become categorical.
+
+    Parameters:
+    - df (pd.DataFrame): A DataFrame as returned by `create_dataframe`.
+
+    Returns:
+    - pd.DataFrame: The same table with typed columns.
+    """
+    typed = {}
+    denominators = {}
+
+    for col in df.columns:
+        values = df[col].astype('string').str.strip().str.rstrip('%').str.replace(',', '', regex=False)
+        parts = values.str.split('/', n=1, expand=True)
+        if parts.shape[1] == 0:
+            # A column without rows splits into no parts at all
+            typed[col] = pd.Series(np.nan, index=df.index, dtype='float64')
+            continue
+        numeric = pd.to_numeric(parts[0], errors='coerce')
+        if col in FRACTION_COLUMNS and parts.shape[1] > 1:
+            denominators[FRACTION_COLUMNS[col]] = pd.to_numeric(parts[1], errors='coerce')
+        typed[col] = numeric
+
+    for col, denominator in denominators.items():
+        if col in typed:
+            typed[col] = denominator.fillna(typed[col])
+
+    for col, numeric in typed.items():
+        if col in COUNT_COLUMNS:
+            typed[col] = numeric.round().astype('Int16')
+        else:
+            typed[col] = numeric.astype('float32')
+
+    typed_df = pd.DataFrame(typed, index=df.index)
+    typed_df.index = pd.MultiIndex.from_arrays(
+        [pd.Categorical(df.index.get_level_values(level)) for level in range(df.index.nlevels)],
+        names=df.index.names
+    )
+    return typed_df
+
+def memory_report(raw_df, typed_df):
+    """
+    Compare the deep memory footprint of a raw and a typed player DataFrame.
+
+    Parameters:
+    - raw_df (pd.DataFrame): The DataFrame before `convert_stat_columns`.
+    - typed_df (pd.DataFrame): The DataFrame after `convert_stat_columns`.
+
+    Returns:
+    - tuple[int, int]: Bytes used by the raw and the typed DataFrame, index included.
+    """
+    raw_bytes = int(raw_df.memory_usage(deep=True).sum())
+    typed_bytes = int(typed_df.memory_usage(deep=True).sum())
+    saving = 100 * (1 - typed_bytes / raw_bytes) if raw_bytes else 0
+    print(f"Memory usage: {raw_bytes:,} bytes as text, {typed_bytes:,} bytes typed ({saving:.0f}% smaller)")
+    return raw_bytes, typed_bytes
+
+class PlayerStatsAccumulator:
+    """
+    An append-only columnar store of player statistics.
+
+    Each column lives in its own preallocated NumPy array that doubles in size
+    when full, so adding a player costs O(columns) regardless of how many
+    players are already stored. DataFrames are built on demand from views of
+    these arrays rather than by walking a nested dictionary.
+
+    Attributes:
+        columns (list[str]): The statistics columns stored for every player.
+    """
+
+    def __init__(self, columns=COLUMNS, capacity=64):
+        """
+        Initializes an empty store.
+
+        Parameters:
+            columns (list[str]): The statistics columns to store.
+            capacity (int): Number of players to preallocate room for.
+        """
+        self.columns = list(columns)
+        self._size = 0
+        self._capacity = capacity
+        self._teams = np.empty(capacity, dtype=object)
+        self._players = np.empty(capacity, dtype=object)
+        self._data = {col: np.full(capacity, np.nan, dtype=object) for col in self.columns}
+        self._rows = {}
+
+    def __len__(self):
+        return self._size
+
+    def _grow(self):
+        capacity = self._capacity * 2
+        self._teams = np.concatenate([self._teams, np.empty(self._capacity, dtype=object)])
+        self._players = np.concatenate([self._players, np.empty(self._capacity, dtype=object)])
+        for col in self.columns:
+            self._data[col] = np.concatenate([self._data[col], np.full(self._capacity, np.nan, dtype=object)])
+        self._capacity = capacity
+
+    def add_player(self, team_name, player_name, stats):
+        """
+        Stores one player's statistics, replacing any earlier entry for the same player.
+
+        Parameters:
+            team_name (str): The player's team.
+            player_name (str): The player's name.
+            stats (dict): The player's statistics; missing columns are stored as NaN.
+        """
+        row = self._rows.get((team_name, player_name))
+        if row is None:
+            if self._size == self._capacity:
+                self._grow()
+            row = self._size
+            self._size += 1
+            self._rows[(team_name, player_name)] = row
+            self._teams[row] = team_name
+            self._players[row] = player_name
+
+        for col in self.columns:
+            self._data[col][row] = stats.get(col, np.nan)
+
+    def add_team(self, team_name, players):
+        """
+        Stores every player of a team.
+
+        Parameters:
+            team_name (str): The team's name.
+            players (dict): The team's players' statistics, keyed by player name.
+        """
+        for player_name, stats in players.items():
+            self.add_player(team_name, player_name, stats)
+
+    def to_dataframe(self, start=0):
+        """
+        Returns the stored players as a DataFrame indexed by team and player name.
+
+        The DataFrame's columns are views of the store's arrays, not copies, so it
+        is cheap to build; it reflects later replacements of players already in it.
+
+        Parameters:
+            start (int): Index of the first stored player to include, e.g. to get
+                only the players added since an earlier call.
+
+        Returns:
+            pd.DataFrame: The same layout as `create_dataframe` produces.
+        """
+        index = pd.MultiIndex.from_arrays(
+            [self._teams[start:self._size], self._players[start:self._size]], names=['Team', 'Player Name']
+        )
+        data = {col: self._data[col][start:self._size] for col in self.columns}
+        return pd.DataFrame(data, index=index, copy=False)
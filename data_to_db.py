@@ -1,22 +1,19 @@
-import pandas as pd
 from sqlalchemy import create_engine
-from sqlalchemy import text
 
+from db_loader import load_csv
 
-engine = create_engine("postgresql:#################")
-
-df = pd.read_csv("route/players_data.csv")
-df.to_sql('player_data', engine, if_exists='replace', index=False)
 
-print("Initial CSV data successfully loaded into the database.")
+engine = create_engine("postgresql:#################")
 
 def update_stats():
-    with engine.connect() as conn:
-        conn.execute(text("TRUNCATE TABLE player_data RESTART IDENTITY;"))
-        
-    new_df = pd.read_csv("route/players_data.csv")
-    new_df.to_sql('player_data', engine, if_exists='append', index=False)
-    
-    print("Table player_data updated with the latest CSV data.")
+    """
+    Upserts the latest CSV data into the player_data table.
+
+    Only players whose statistics changed are written, in a single transaction,
+    so the table is never empty or half-loaded while readers query it.
+    """
+    changed = load_csv(engine, "route/players_data.csv")
+    print(f"Table player_data updated with the latest CSV data ({changed} rows changed).")
 
-update_stats()
+if __name__ == "__main__":
+    update_stats()
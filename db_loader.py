@@ -0,0 +1,140 @@
+import io
+
+import pandas as pd
+from sqlalchemy import Column, Float, MetaData, Table, Text, inspect, text
+
+from data_manager import CURRENT_SEASON
+
+KEY_COLUMNS = ['Team', 'Player Name', 'Season']
+
+
+def _player_table(metadata, name, stat_columns, temporary=False):
+    columns = [Column(key, Text, primary_key=not temporary, nullable=False) for key in KEY_COLUMNS]
+    columns += [Column(col, Float) for col in stat_columns]
+    prefixes = ['TEMPORARY'] if temporary else []
+    return Table(name, metadata, *columns, prefixes=prefixes)
+
+
+def prepare_rows(df, season=CURRENT_SEASON):
+    """
+    Flattens a player DataFrame into rows keyed by team, player and season.
+
+    Parameters:
+        df (pd.DataFrame): Player statistics indexed by 'Team' and 'Player Name', as
+            written to players_data.csv.
+        season (str): The season the statistics belong to.
+
+    Returns:
+        pd.DataFrame: One row per player with the key columns first and None for missing values.
+    """
+    rows = df.reset_index()
+    rows['Season'] = season
+    stat_columns = [col for col in rows.columns if col not in KEY_COLUMNS]
+    rows = rows[KEY_COLUMNS + stat_columns]
+    rows[stat_columns] = rows[stat_columns].apply(pd.to_numeric, errors='coerce')
+    return rows.astype(object).where(rows.notna(), None)
+
+
+def _ensure_table(conn, table, season):
+    existing = inspect(conn)
+    if not existing.has_table(table.name):
+        table.create(conn)
+        return
+
+    # Tables created by the old truncate-and-reload script have no season or key yet
+    columns = {col['name'] for col in existing.get_columns(table.name)}
+    quote = conn.dialect.identifier_preparer.quote
+    for col in table.columns:
+        if col.name not in columns:
+            conn.execute(text(f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(col.name)} "
+                              f"{col.type.compile(dialect=conn.dialect)}"))
+    if 'Season' not in columns:
+        conn.execute(text(f"UPDATE {quote(table.name)} SET {quote('Season')} = :season"), {'season': season})
+    key = ", ".join(quote(col) for col in KEY_COLUMNS)
+    conn.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS {quote(table.name + '_key')} ON {quote(table.name)} ({key})"))
+
+
+def _stage_rows(conn, stage, rows, batch_size):
+    if conn.dialect.name == 'postgresql':
+        # COPY streams the whole batch in one command
+        quote = conn.dialect.identifier_preparer.quote
+        columns = ", ".join(quote(col) for col in rows.columns)
+        copy_sql = f"COPY {quote(stage.name)} ({columns}) FROM STDIN WITH (FORMAT csv)"
+        buffer = io.StringIO()
+        rows.to_csv(buffer, header=False, index=False)
+        cursor = conn.connection.driver_connection.cursor()
+        if hasattr(cursor, 'copy_expert'):
+            buffer.seek(0)
+            cursor.copy_expert(copy_sql, buffer)
+        else:
+            with cursor.copy(copy_sql) as copy:
+                copy.write(buffer.getvalue())
+        return
+
+    records = rows.to_dict('records')
+    for start in range(0, len(records), batch_size):
+        conn.execute(stage.insert(), records[start:start + batch_size])
+
+
+def load_players(engine, df, table_name="player_data", season=CURRENT_SEASON, batch_size=1000):
+    """
+    Upserts player statistics into the database, writing only rows that changed.
+
+    The rows are bulk-loaded into a temporary staging table (COPY on PostgreSQL,
+    batched executemany elsewhere) and merged into the target table on its
+    (Team, Player Name, Season) key in a single transaction, so readers never
+    see a partially loaded or empty table.
+
+    Parameters:
+        engine (sqlalchemy.engine.Engine): The database to load into.
+        df (pd.DataFrame): Player statistics indexed by 'Team' and 'Player Name'.
+        table_name (str): The target table, created if it does not exist.
+        season (str): The season the statistics belong to.
+        batch_size (int): Rows per executemany batch when COPY is not available.
+
+    Returns:
+        int: Number of rows inserted or updated.
+    """
+    rows = prepare_rows(df, season)
+    stat_columns = [col for col in rows.columns if col not in KEY_COLUMNS]
+
+    metadata = MetaData()
+    table = _player_table(metadata, table_name, stat_columns)
+    stage = _player_table(metadata, f"{table_name}_stage", stat_columns, temporary=True)
+
+    with engine.begin() as conn:
+        quote = conn.dialect.identifier_preparer.quote
+        _ensure_table(conn, table, season)
+        stage.create(conn)
+        _stage_rows(conn, stage, rows, batch_size)
+
+        distinct = "IS DISTINCT FROM" if conn.dialect.name == 'postgresql' else "IS NOT"
+        columns = ", ".join(quote(col) for col in rows.columns)
+        keys = ", ".join(quote(col) for col in KEY_COLUMNS)
+        updates = ", ".join(f"{quote(col)} = excluded.{quote(col)}" for col in stat_columns)
+        changed = " OR ".join(f"{quote(table_name)}.{quote(col)} {distinct} excluded.{quote(col)}"
+                              for col in stat_columns)
+        result = conn.execute(text(
+            f"INSERT INTO {quote(table_name)} ({columns}) "
+            f"SELECT {columns} FROM {quote(stage.name)} WHERE true "
+            f"ON CONFLICT ({keys}) DO UPDATE SET {updates} WHERE {changed}"
+        ))
+        stage.drop(conn)
+    return result.rowcount
+
+
+def load_csv(engine, csv_path, table_name="player_data", season=CURRENT_SEASON):
+    """
+    Upserts the players of a CSV written by `main` into the database.
+
+    Parameters:
+        engine (sqlalchemy.engine.Engine): The database to load into.
+        csv_path (str): Path of players_data.csv.
+        table_name (str): The target table.
+        season (str): The season the statistics belong to.
+
+    Returns:
+        int: Number of rows inserted or updated.
+    """
+    df = pd.read_csv(csv_path, index_col=['Team', 'Player Name'])
+    return load_players(engine, df, table_name, season)
@@ -0,0 +1,302 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+import json
+import os
+import threading
+import time
+
+# Upper bounds, in seconds, of the latency histogram buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class Histogram:
+    """
+    A fixed-bucket latency histogram.
+
+    Attributes:
+        buckets (tuple[float]): Upper bounds of the buckets, in seconds.
+        counts (list[int]): Observations per bucket, with a final overflow bucket.
+        count (int): Number of observations.
+        total (float): Sum of the observed seconds.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds):
+        """
+        Adds an observation.
+
+        Parameters:
+            seconds (float): The observed latency.
+        """
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def quantile(self, q):
+        """
+        Estimates a quantile as the upper bound of the bucket it falls into.
+
+        Parameters:
+            q (float): The quantile, between 0 and 1.
+
+        Returns:
+            float | None: The estimate, or None if nothing was observed.
+        """
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+    def summary(self):
+        """
+        Returns the count, total, mean and estimated p50/p95 of the histogram.
+        """
+        return {
+            'count': self.count,
+            'seconds': round(self.total, 6),
+            'mean': round(self.total / self.count, 6) if self.count else None,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+        }
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Instrumentation:
+    """
+    Collects per-phase latencies and WebDriver command counts during a run.
+
+    Phases are timed with `timed`, used as a context manager or decorator.
+    Drivers passed to `instrument_driver` have every command they send timed
+    and attributed to the team and player set with `scope` on the calling
+    thread. Recording costs a clock read and a dictionary update under a lock,
+    so the instrumentation can stay on in production.
+
+    Attributes:
+        enabled (bool): Whether anything is recorded.
+        phases (dict): Histogram of every phase, keyed by name.
+        commands (dict): Histogram of every WebDriver command, keyed by command name.
+        team_commands (dict): Number of WebDriver commands sent per team.
+        player_commands (dict): Number of WebDriver commands sent per player URL.
+        milestones (dict): Seconds from the start of recording until each milestone
+            was first reached, e.g. 'first_team_page'.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        """
+        Discards everything recorded so far.
+        """
+        with self._lock:
+            self.phases = {}
+            self.commands = {}
+            self.team_commands = {}
+            self.player_commands = {}
+            self.milestones = {}
+            self._started = time.perf_counter()
+
+    def observe(self, phase, seconds):
+        """
+        Records one timing of a phase.
+
+        Parameters:
+            phase (str): Name of the phase.
+            seconds (float): How long it took.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.phases.get(phase)
+            if histogram is None:
+                histogram = self.phases[phase] = Histogram()
+            histogram.observe(seconds)
+
+    def milestone(self, name):
+        """
+        Records how long after the start of recording a milestone was first reached.
+
+        Later calls for the same milestone are ignored.
+
+        Parameters:
+            name (str): Name of the milestone.
+        """
+        if not self.enabled or name in self.milestones:
+            return
+        with self._lock:
+            self.milestones.setdefault(name, time.perf_counter() - self._started)
+
+    @contextmanager
+    def timed(self, phase):
+        """
+        Times the enclosed block, or the decorated function, as one run of a phase.
+
+        Parameters:
+            phase (str): Name of the phase.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(phase, time.perf_counter() - start)
+
+    @contextmanager
+    def scope(self, team=None, player=None):
+        """
+        Attributes the WebDriver commands sent by this thread within the block
+        to a team and/or player.
+
+        Parameters:
+            team (str, optional): The team being scraped.
+            player (str, optional): URL of the player being scraped.
+        """
+        previous = (getattr(self._local, 'team', None), getattr(self._local, 'player', None))
+        if team is not None:
+            self._local.team = team
+        if player is not None:
+            self._local.player = player
+        try:
+            yield
+        finally:
+            self._local.team, self._local.player = previous
+
+    def _record_command(self, command, seconds):
+        team = getattr(self._local, 'team', None)
+        player = getattr(self._local, 'player', None)
+        with self._lock:
+            histogram = self.commands.get(command)
+            if histogram is None:
+                histogram = self.commands[command] = Histogram()
+            histogram.observe(seconds)
+            if team is not None:
+                self.team_commands[team] = self.team_commands.get(team, 0) + 1
+            if player is not None:
+                self.player_commands[player] = self.player_commands.get(player, 0) + 1
+
+    def instrument_driver(self, driver):
+        """
+        Times every command the driver sends to the browser.
+
+        All WebDriver calls (`get`, `find_element`, `execute_script`, ...) go
+        through `driver.execute`, which is wrapped on this instance only, so time
+        spent in implicit waits shows up under the command that waited.
+
+        Parameters:
+            driver (webdriver.Chrome): The WebDriver instance to instrument.
+
+        Returns:
+            webdriver.Chrome: The same driver.
+        """
+        execute = driver.execute
+
+        def timed_execute(driver_command, params=None):
+            if not self.enabled:
+                return execute(driver_command, params)
+            start = time.perf_counter()
+            try:
+                return execute(driver_command, params)
+            finally:
+                self._record_command(driver_command, time.perf_counter() - start)
+
+        driver.execute = timed_execute
+        return driver
+
+    def summary(self):
+        """
+        Returns everything recorded so far as a JSON-serializable summary.
+
+        Returns:
+            dict: Phase and command histograms summaries, and command counts per team and player.
+        """
+        with self._lock:
+            return {
+                'phases': {name: histogram.summary() for name, histogram in sorted(self.phases.items())},
+                'commands': {name: histogram.summary() for name, histogram in sorted(self.commands.items())},
+                'total_commands': sum(histogram.count for histogram in self.commands.values()),
+                'team_commands': dict(self.team_commands),
+                'player_commands': dict(self.player_commands),
+                'milestones': {name: round(seconds, 6) for name, seconds in self.milestones.items()},
+            }
+
+    def to_prometheus(self):
+        """
+        Renders the histograms and per-team command counts in the Prometheus text format.
+
+        Per-player counts are left out to keep the number of series bounded; they
+        are only part of the JSON summary.
+
+        Returns:
+            str: The metrics in the Prometheus exposition format.
+        """
+        lines = []
+        with self._lock:
+            for metric, label, histograms, description in (
+                ('scraper_phase_seconds', 'phase', self.phases, "Time spent in each scraping phase."),
+                ('scraper_webdriver_command_seconds', 'command', self.commands, "Time spent in each WebDriver command."),
+            ):
+                lines.append(f"# HELP {metric} {description}")
+                lines.append(f"# TYPE {metric} histogram")
+                for name, histogram in sorted(histograms.items()):
+                    name = _label(name)
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f'{metric}_bucket{{{label}="{name}",le="{bound}"}} {cumulative}')
+                    lines.append(f'{metric}_bucket{{{label}="{name}",le="+Inf"}} {histogram.count}')
+                    lines.append(f'{metric}_sum{{{label}="{name}"}} {histogram.total}')
+                    lines.append(f'{metric}_count{{{label}="{name}"}} {histogram.count}')
+
+            lines.append("# HELP scraper_milestone_seconds Seconds from start until each milestone was reached.")
+            lines.append("# TYPE scraper_milestone_seconds gauge")
+            for name, seconds in sorted(self.milestones.items()):
+                lines.append(f'scraper_milestone_seconds{{milestone="{_label(name)}"}} {seconds}')
+
+            lines.append("# HELP scraper_team_webdriver_commands_total WebDriver commands sent per team.")
+            lines.append("# TYPE scraper_team_webdriver_commands_total counter")
+            for team, count in sorted(self.team_commands.items()):
+                lines.append(f'scraper_team_webdriver_commands_total{{team="{_label(team)}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, directory):
+        """
+        Saves the summary as metrics.json and the Prometheus text as metrics.prom.
+
+        Parameters:
+            directory (str): Directory to write the files to.
+        """
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "metrics.json"), 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2)
+        with open(os.path.join(directory, "metrics.prom"), 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+
+    def report(self):
+        """
+        Prints the count, total and mean time of every phase.
+        """
+        summary = self.summary()
+        for name, phase in summary['phases'].items():
+            print(f"Phase {name}: {phase['count']} runs, {phase['seconds']:.2f}s total, {phase['mean']:.3f}s mean")
+        for name, seconds in summary['milestones'].items():
+            print(f"Milestone {name}: reached after {seconds:.2f}s")
+        print(f"WebDriver commands sent: {summary['total_commands']}")
+
+
+# Shared by every scraper of the process
+metrics = Instrumentation()
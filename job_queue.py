@@ -0,0 +1,374 @@
+import json
+import random
+import sqlite3
+import threading
+import time
+
+from data_manager import create_dataframe
+
+# Task kinds, in the order they are claimed within a priority level
+TASK_KINDS = ('standings', 'team', 'player')
+
+
+def _target(kind, payload):
+    if kind == 'standings':
+        return payload['league_url']
+    if kind == 'team':
+        return payload['team']['url']
+    return payload['player']['link']
+
+
+def task_key(kind, payload):
+    """
+    Returns the key identifying a task, so that the same task is only queued once.
+
+    Parameters:
+        kind (str): One of TASK_KINDS.
+        payload (dict): The task's payload.
+    """
+    return f"{kind}|{_target(kind, payload)}|{payload['competition']}|{payload['season']}"
+
+
+class JobQueue:
+    """
+    A durable queue of scraping tasks shared by worker processes through SQLite.
+
+    Workers claim a task by taking a lease on it, and keep the lease alive
+    with heartbeats while they work. A lease that is not renewed in time, e.g.
+    because its worker crashed or lost its browser, expires and the task goes
+    back to the queue for another worker. Claims and completions run in
+    immediate transactions, so any number of processes, on one host or on
+    several hosts sharing the database file, can use the queue at once. Task
+    results are stored in the same database.
+
+    WAL mode is faster but needs every process on the same host; leave `wal`
+    off when the file lives on a shared network filesystem.
+
+    Attributes:
+        path (str): Location of the SQLite database.
+        lease_seconds (float): How long a claimed task stays leased without a heartbeat.
+        max_attempts (int): Claims of a task before it is given up on.
+        base_delay (float): Seconds a failed task waits before its first retry; doubles
+            with every further attempt.
+    """
+
+    def __init__(self, path="job_queue.db", lease_seconds=120.0, max_attempts=3, base_delay=5.0, wal=False):
+        """
+        Opens the queue, creating its tables if needed.
+
+        Parameters:
+            path (str): Location of the SQLite database.
+            lease_seconds (float): How long a claimed task stays leased without a heartbeat.
+            max_attempts (int): Claims of a task before it is given up on.
+            base_delay (float): Seconds a failed task waits before its first retry.
+            wal (bool): Use WAL journaling; only if every process runs on the same host.
+        """
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        if wal:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY,
+                key TEXT NOT NULL UNIQUE,
+                kind TEXT NOT NULL,
+                priority INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                available_at REAL NOT NULL DEFAULT 0,
+                lease_owner TEXT,
+                lease_expires REAL,
+                error TEXT,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS tasks_claim ON tasks (status, priority, kind, available_at);
+            CREATE TABLE IF NOT EXISTS results (
+                competition TEXT NOT NULL,
+                season TEXT NOT NULL,
+                team TEXT NOT NULL,
+                player_url TEXT NOT NULL,
+                player_name TEXT NOT NULL,
+                stats TEXT NOT NULL,
+                worker TEXT NOT NULL,
+                completed_at REAL NOT NULL,
+                PRIMARY KEY (competition, season, team, player_url)
+            );
+            """
+        )
+
+    def _transaction(self, work):
+        # BEGIN IMMEDIATE takes the write lock up front, so two processes can never
+        # read the same pending task and both claim it
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(self._conn)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    @staticmethod
+    def _insert(conn, kind, payload, priority, now):
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO tasks (key, kind, priority, payload, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (task_key(kind, payload), kind, priority, json.dumps(payload), now)
+        )
+        return cursor.rowcount
+
+    def add(self, kind, payload, priority=0):
+        """
+        Queues a task unless the same task is already queued.
+
+        Parameters:
+            kind (str): One of TASK_KINDS.
+            payload (dict): What the task works on, with its 'competition' and 'season'.
+            priority (int): Lower is claimed first.
+
+        Returns:
+            bool: True if the task was added.
+        """
+        return self._transaction(lambda conn: self._insert(conn, kind, payload, priority, time.time())) == 1
+
+    def reclaim_expired(self):
+        """
+        Puts every task whose lease expired back in the queue.
+
+        A task whose lease expired on its last attempt, e.g. because it keeps
+        crashing its workers, is given up on instead.
+
+        Returns:
+            int: Number of tasks reclaimed.
+        """
+        return self._transaction(self._reclaim)
+
+    def _reclaim(self, conn):
+        now = time.time()
+        conn.execute(
+            "UPDATE tasks SET status = 'failed', lease_owner = NULL, lease_expires = NULL, "
+            "error = 'Lease expired on the last attempt', updated_at = ? "
+            "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?", (now, now, self.max_attempts)
+        )
+        cursor = conn.execute(
+            "UPDATE tasks SET status = 'pending', lease_owner = NULL, lease_expires = NULL, "
+            "error = 'Lease expired', updated_at = ? WHERE status = 'leased' AND lease_expires < ?", (now, now)
+        )
+        return cursor.rowcount
+
+    def claim(self, worker_id):
+        """
+        Leases the next available task to a worker, reclaiming expired leases first.
+
+        Tasks are claimed by priority, then standings before teams before players,
+        then in the order they were queued.
+
+        Parameters:
+            worker_id (str): Identifier of the claiming worker.
+
+        Returns:
+            dict | None: The task's 'id', 'kind', 'payload' and 'attempts', or None if no
+                task is available right now.
+        """
+        def claim(conn):
+            self._reclaim(conn)
+            now = time.time()
+            row = conn.execute(
+                "SELECT id, kind, payload, attempts FROM tasks WHERE status = 'pending' AND available_at <= ? "
+                "ORDER BY priority, CASE kind WHEN 'standings' THEN 0 WHEN 'team' THEN 1 ELSE 2 END, id LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE tasks SET status = 'leased', attempts = attempts + 1, lease_owner = ?, lease_expires = ?, "
+                "updated_at = ? WHERE id = ?", (worker_id, now + self.lease_seconds, now, row[0])
+            )
+            return {'id': row[0], 'kind': row[1], 'payload': json.loads(row[2]), 'attempts': row[3] + 1}
+
+        return self._transaction(claim)
+
+    def heartbeat(self, task_id, worker_id):
+        """
+        Extends a worker's lease on a task.
+
+        Parameters:
+            task_id (int): The leased task.
+            worker_id (str): The worker holding the lease.
+
+        Returns:
+            bool: False if the worker no longer holds the lease, e.g. because it expired
+                and the task was reclaimed.
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE tasks SET lease_expires = ?, updated_at = ? "
+                "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (now + self.lease_seconds, now, task_id, worker_id)
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, task_id, worker_id, results=(), children=()):
+        """
+        Marks a leased task done, storing its results and queueing the tasks it produced.
+
+        Everything happens in one transaction, and only while the worker still holds
+        the lease, so a task reclaimed from a slow worker is never completed twice.
+
+        Parameters:
+            task_id (int): The leased task.
+            worker_id (str): The worker holding the lease.
+            results (list[dict]): Scraped players, each with 'competition', 'season', 'team',
+                'player_url', 'player_name' and 'stats'.
+            children (list[tuple[str, dict, int]]): Tasks to queue, as (kind, payload, priority).
+
+        Returns:
+            bool: False if the worker had lost the lease and nothing was stored.
+        """
+        def complete(conn):
+            now = time.time()
+            cursor = conn.execute(
+                "UPDATE tasks SET status = 'done', lease_owner = NULL, lease_expires = NULL, error = NULL, "
+                "updated_at = ? WHERE id = ? AND status = 'leased' AND lease_owner = ?", (now, task_id, worker_id)
+            )
+            if cursor.rowcount != 1:
+                return False
+            conn.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(result['competition'], result['season'], result['team'], result['player_url'],
+                  result['player_name'], json.dumps(result['stats']), worker_id, now) for result in results]
+            )
+            for kind, payload, priority in children:
+                self._insert(conn, kind, payload, priority, now)
+            return True
+
+        return self._transaction(complete)
+
+    def fail(self, task_id, worker_id, error, retry=True):
+        """
+        Releases a leased task after an error, queueing it again with a backoff delay
+        or giving up on it once it ran out of attempts.
+
+        Parameters:
+            task_id (int): The leased task.
+            worker_id (str): The worker holding the lease.
+            error (str): What went wrong, kept for the failure report.
+            retry (bool): Whether the error is worth another attempt.
+
+        Returns:
+            bool: True if the task will be retried.
+        """
+        def fail(conn):
+            now = time.time()
+            row = conn.execute(
+                "SELECT attempts FROM tasks WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (task_id, worker_id)
+            ).fetchone()
+            if row is None:
+                return False
+            attempts = row[0]
+            if not retry or attempts >= self.max_attempts:
+                conn.execute(
+                    "UPDATE tasks SET status = 'failed', lease_owner = NULL, lease_expires = NULL, error = ?, "
+                    "updated_at = ? WHERE id = ?", (error, now, task_id)
+                )
+                return False
+            delay = self.base_delay * 2 ** (attempts - 1) * random.uniform(0.5, 1.0)
+            conn.execute(
+                "UPDATE tasks SET status = 'pending', lease_owner = NULL, lease_expires = NULL, error = ?, "
+                "available_at = ?, updated_at = ? WHERE id = ?", (error, now + delay, now, task_id)
+            )
+            return True
+
+        return self._transaction(fail)
+
+    def counts(self):
+        """
+        Returns the number of tasks of every kind in every status.
+
+        Returns:
+            dict: {kind: {status: count}}.
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT kind, status, COUNT(*) FROM tasks GROUP BY kind, status").fetchall()
+        counts = {}
+        for kind, status, count in rows:
+            counts.setdefault(kind, {})[status] = count
+        return counts
+
+    def is_finished(self):
+        """
+        Returns whether every task is done or failed, so no more work can appear.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM tasks WHERE status IN ('pending', 'leased') LIMIT 1").fetchone()
+        return row is None
+
+    def failures(self):
+        """
+        Returns the tasks that were given up on.
+
+        Returns:
+            list[dict]: Each failed task's 'kind', 'payload', 'attempts' and last 'error'.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT kind, payload, attempts, error FROM tasks WHERE status = 'failed' ORDER BY id"
+            ).fetchall()
+        return [{'kind': kind, 'payload': json.loads(payload), 'attempts': attempts, 'error': error}
+                for kind, payload, attempts, error in rows]
+
+    def jobs(self):
+        """
+        Returns the (competition, season) pairs that have results.
+        """
+        with self._lock:
+            return self._conn.execute("SELECT DISTINCT competition, season FROM results ORDER BY 1, 2").fetchall()
+
+    def load_results(self, competition, season):
+        """
+        Returns the stored players of a competition and season.
+
+        Parameters:
+            competition (str): The competition to load.
+            season (str): The season to load.
+
+        Returns:
+            pd.DataFrame: Raw statistics in the layout of `create_dataframe`; empty, with every
+                column of COLUMNS, if no player of the job is stored.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT team, player_name, stats FROM results WHERE competition = ? AND season = ?",
+                (competition, season)
+            ).fetchall()
+        teams_data = {}
+        for team, player_name, stats in rows:
+            teams_data.setdefault(team, {})[player_name] = json.loads(stats)
+        return create_dataframe(teams_data)
+
+    def report(self):
+        """
+        Prints the progress of every kind of task and the tasks that failed.
+        """
+        for kind, statuses in sorted(self.counts().items(), key=lambda item: TASK_KINDS.index(item[0])):
+            print(f"{kind}: " + ", ".join(f"{count} {status}" for status, count in sorted(statuses.items())))
+        for failure in self.failures():
+            payload = failure['payload']
+            print(f"Failed {failure['kind']} {_target(failure['kind'], payload)} "
+                  f"({payload['competition']} {payload['season']}) after {failure['attempts']} attempts: "
+                  f"{failure['error']}")
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        with self._lock:
+            self._conn.close()
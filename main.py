@@ -1,10 +1,24 @@
-from browser_manager import BrowserManager
-from popup_handler import PopupHandler
-from sofascore_scraper import SofaScoreScraper
-from player_scraper import PlayerScraper
-from data_manager import create_dataframe
+import argparse
+import os
 
-def main():
+from data_manager import CURRENT_SEASON, create_dataframe, PlayerStatsAccumulator, convert_stat_columns, memory_report
+from worker_pool import WorkerPool, MAX_WORKERS
+from browser_manager import BROWSER_PROFILES, report_traffic
+from sofascore_api import SofaScoreApiClient, ApiTeamScraper, ApiPlayerScraper, API_URL
+from page_parser import PageParserPool, reparse_directory
+from checkpoint_store import CheckpointStore
+from snapshot_store import SnapshotStore
+from page_cache import PageCache
+from parquet_writer import write_partitioned
+from instrumentation import metrics
+from scheduler import CrawlJob, CrawlScheduler
+from ndjson_sink import NDJSONSink, read_dataframe, write_csv
+
+def main(workers=1, max_workers=MAX_WORKERS, headless=None, profile=None, measure_traffic=False,
+         user_data_dir=None, debugger_address=None, remote_url=None, league_url=None, backend="browser", api_url=API_URL, concurrency=4,
+         parse_offline=False, html_dir=None, resume=False, checkpoint_path="scrape_checkpoint.db",
+         refresh=False, snapshot_path="player_snapshots.db", cache_dir=None,
+         parquet_dir=None, metrics_dir=None, stream_path=None):
     """
     Main function to execute the web scraping process.
 
@@ -13,54 +27,419 @@ def main():
     page views. Upon completion, it closes the browser session.
 
     Workflow:
-        - Initializes browser, popup handler, and scraper instances.
-        - Retrieves teams and iterates over them to scrape player information.
+        - Initializes a pool of browser workers, each with its own popup handler and scrapers.
+        - Retrieves teams and hands them out across the workers to scrape player information.
         - Switches to list view for each team page if available.
         - Handles any popups encountered during the scraping process.
-        - Closes the browser instance after scraping.
+        - Merges every worker's results and closes the browser instances after scraping.
+
+    With the 'http' backend the same teams_data is filled from SofaScore's JSON API
+    over a pooled session instead, without starting a browser.
+
+    Parameters:
+        workers (int): Number of browsers to scrape with. A single worker runs a visible
+            browser; several workers run headless.
+        max_workers (int): Upper bound on the number of browsers started.
+        headless (bool, optional): Whether the browsers run without a visible window;
+            by default only when several workers are used.
+        profile (str, optional): Browser profile from BROWSER_PROFILES, e.g. 'lean' to run
+            headless in a small window without images, fonts, media or ads. Overrides `headless`.
+        measure_traffic (bool): Report the bytes the browsers transferred per page.
+        user_data_dir (str, optional): Directory of persistent Chrome profiles, one per worker,
+            so that consent cookies survive between runs.
+        debugger_address (str, optional): 'host:port' of a warm Chrome started with
+            --remote-debugging-port to attach to; only with a single worker.
+        remote_url (str, optional): Remote WebDriver endpoint to start the browsers on.
+        league_url (str, optional): Standings page to start from instead of LaLiga's,
+            e.g. a page served by a local replay server.
+        backend (str): 'browser' to drive Chrome, 'http' to read the JSON API.
+        api_url (str): Root of the JSON API, e.g. a local replay server.
+        concurrency (int): Maximum number of API requests in flight with the 'http' backend.
+        parse_offline (bool): Capture each player page's HTML and parse it in a process
+            pool while the browser moves on to the next player.
+        html_dir (str, optional): Directory to save captured pages to, so they can be
+            parsed again later with `reparse`.
+        resume (bool): Continue the run recorded in the checkpoint store, reloading
+            finished players and teams instead of scraping them again.
+        checkpoint_path (str, optional): SQLite file every finished player is recorded in;
+            None runs without a checkpoint, which cannot be resumed.
+        refresh (bool): Only extract players whose games played or minutes changed since
+            their last snapshot; the others reuse their stored statistics.
+        snapshot_path (str): SQLite file the player snapshots are kept in across refresh runs;
+            only opened with `refresh`.
+        cache_dir (str, optional): Directory of an on-disk cache of standings, player pages
+            and API responses, consulted before navigating or requesting them.
+        parquet_dir (str, optional): Directory of a Parquet dataset, partitioned by
+            competition, season and team, that each team is written to once scraped.
+        metrics_dir (str, optional): Directory to save the run's phase timings and
+            WebDriver command counts to, as metrics.json and Prometheus metrics.prom.
+        stream_path (str, optional): NDJSON file (gzip compressed if it ends in '.gz') every
+            finished player is appended to as soon as it is scraped. Players are then not
+            kept in memory, and players_data.csv is built from the stream at the end.
 
     Raises:
+        ValueError: If `resume` is set without a `checkpoint_path`.
         Exception: If errors occur during page view switching or data scraping.
     """
-    browser_manager = BrowserManager()
-    driver = browser_manager.get_driver()
-    
-    popup_handler = PopupHandler(driver)
-    sofascore_scraper = SofaScoreScraper(driver, popup_handler)
-    player_scraper = PlayerScraper(driver, popup_handler)
-    
-    teams = sofascore_scraper.get_teams()
-
-    for i, team in enumerate(teams):
-        print(f"Scraping players from: {team['name']}")
-        team_name = team['name']
-        driver.get(team['url'])
-        popup_handler.cerrar_popup()
-        
-        try:
-            sofascore_scraper.switch_to_list_view(team['url'])
-        except Exception as e:
-            print(f"Error switching to list view: {e}")
-            popup_handler.cerrar_popup()
-            
-        player_scraper.scrape_players_data(team_name)
+    checkpoint = open_checkpoint(checkpoint_path, resume)
+    cache = PageCache(cache_dir) if cache_dir is not None else None
+    # A resumed run keeps the players streamed before it was interrupted
+    sink = NDJSONSink(stream_path, append=resume) if stream_path is not None else None
+    client = pool = parser_pool = snapshots = None
+
+    try:
+        if backend == "http":
+            client = SofaScoreApiClient(api_url, pool_size=concurrency, max_concurrency=concurrency, cache=cache)
+            teams = ApiTeamScraper(client).get_teams()
+            results = ApiPlayerScraper(client, checkpoint=checkpoint, sink=sink).scrape_teams(teams)
+        else:
+            parser_pool = PageParserPool(html_dir=html_dir) if parse_offline else None
+            # Snapshots are only read and recorded by refresh runs
+            snapshots = SnapshotStore(snapshot_path) if refresh else None
+            browser_options = {'profile': profile, 'measure_traffic': measure_traffic, 'user_data_dir': user_data_dir,
+                               'debugger_address': debugger_address, 'remote_url': remote_url}
+            pool = start_pool(workers, max_workers, headless, browser_options, league_url, cache=cache,
+                              parser_pool=parser_pool, checkpoint=checkpoint, snapshots=snapshots,
+                              refresh=refresh, sink=sink)
+            teams = pool.workers[0].sofascore_scraper.get_teams()
+            results = pool.scrape_teams(teams)
+
+        accumulator = collect_teams(results, sink, parquet_dir)
+        if pool is not None and len(pool.retries):
+            retry_failed(pool, accumulator, sink, stream_path, parquet_dir)
+        write_output(accumulator, sink, stream_path)
+
+        metrics.report()
+        if metrics_dir is not None:
+            metrics.write(metrics_dir)
+        if cache is not None:
+            cache.report()
+        if pool is not None:
+            report_pool(pool, refresh, measure_traffic, profile)
+    finally:
+        for resource in (sink, checkpoint, cache, client, snapshots):
+            if resource is not None:
+                resource.close()
+        if pool is not None:
+            pool.quit()
+        if parser_pool is not None:
+            parser_pool.close()
+
+def open_checkpoint(checkpoint_path, resume):
+    """
+    Opens the checkpoint store, starting it over unless the run is resumed.
+
+    Parameters:
+        checkpoint_path (str | None): SQLite file every finished player is recorded in,
+            or None to run without a checkpoint.
+        resume (bool): Keep the players and teams recorded by the previous run.
+
+    Returns:
+        CheckpointStore | None: The store, or None if checkpointing is disabled.
+
+    Raises:
+        ValueError: If the run is resumed without a checkpoint to resume from.
+    """
+    if checkpoint_path is None:
+        if resume:
+            raise ValueError("Resuming a run needs a checkpoint_path")
+        return None
+    checkpoint = CheckpointStore(checkpoint_path)
+    if not resume:
+        checkpoint.clear()
+    return checkpoint
+
+def start_pool(workers, max_workers, headless, browser_options, league_url=None, **pool_options):
+    """
+    Starts the browser workers and points them at the standings page to start from.
+
+    Parameters:
+        workers (int): Number of browsers to scrape with.
+        max_workers (int): Upper bound on the number of browsers started.
+        headless (bool, optional): Whether the browsers run without a visible window;
+            by default only when several workers are used.
+        browser_options (dict): Options every worker's BrowserManager is created with.
+        league_url (str, optional): Standings page to start from instead of LaLiga's.
+        **pool_options: Stores and settings passed on to the WorkerPool.
+
+    Returns:
+        WorkerPool: The started pool.
+    """
+    if headless is None:
+        headless = workers > 1
+    pool = WorkerPool(workers, headless=headless, max_workers=max_workers, browser_options=browser_options,
+                      **pool_options)
+    if league_url is not None:
+        pool.workers[0].sofascore_scraper.league_url = league_url
+    return pool
+
+def collect_teams(results, sink=None, parquet_dir=None):
+    """
+    Gathers every team's players as it is scraped, saving partial results along the way.
+
+    Parameters:
+        results (iterable): (team_name, players) pairs in the order the teams finish.
+        sink (NDJSONSink, optional): Stream the players were already written to; they are
+            then not kept in memory.
+        parquet_dir (str, optional): Directory of a Parquet dataset each team is written to.
+
+    Returns:
+        PlayerStatsAccumulator: The players scraped, empty when they were streamed.
+    """
+    accumulator = PlayerStatsAccumulator()
+
+    for i, (team_name, players) in enumerate(results):
+        if sink is not None:
+            # The players are already in the stream; only this team's are held until written
+            print(f"{team_name}: {len(players)} players, {sink.records} streamed so far")
+            if parquet_dir is not None:
+                write_partitioned(create_dataframe({team_name: players}), parquet_dir)
+            continue
+
+        team_start = len(accumulator)
+        accumulator.add_team(team_name, players)
+        if parquet_dir is not None:
+            write_partitioned(accumulator.to_dataframe(start=team_start), parquet_dir)
 
         # Convert partial data to DataFrame and display every iteration for debugging
-        partial_df = create_dataframe(player_scraper.teams_data)
+        partial_df = accumulator.to_dataframe()
         print(f"Data after scraping {team_name}:")
         print(partial_df.head())  # Adjust head() to view more or fewer rows as neededt
         # Optional: display after a set number of teams for larger data collections
         if (i + 1) % 2 == 0:
             print(f"Data after scraping {i + 1} teams:")
             print(partial_df)
-            partial_df.to_csv("partial_player_data.csv", index=True)
-    
+            write_partial(accumulator)
+    return accumulator
+
+def retry_failed(pool, accumulator, sink=None, stream_path=None, parquet_dir=None):
+    """
+    Retries the players that failed during the run, now that every team is done.
+
+    Parameters:
+        pool (WorkerPool): The pool whose retry queue holds the failed players.
+        accumulator (PlayerStatsAccumulator): The players scraped, unused when they are streamed.
+        sink (NDJSONSink, optional): Stream the recovered players are written to.
+        stream_path (str, optional): The stream's file, read back to rewrite retried teams.
+        parquet_dir (str, optional): Directory of a Parquet dataset the retried teams are written to again.
+    """
+    print(f"Retrying {len(pool.retries)} players that failed...")
+    retried_teams = set()
+    for entry, players in pool.retry_deferred():
+        if players:
+            retried_teams.add(entry['team_name'])
+        if sink is None:
+            accumulator.add_team(entry['team_name'], players)
+    if parquet_dir is not None and retried_teams:
+        # A team's partition is replaced as a whole, so its other players are written again too
+        if sink is not None:
+            sink.flush()
+            retried_df = read_dataframe(stream_path, teams=retried_teams)
+        else:
+            retried_df = accumulator.to_dataframe()
+            retried_df = retried_df[retried_df.index.get_level_values('Team').isin(retried_teams)]
+        write_partitioned(retried_df, parquet_dir)
+
+def write_output(accumulator, sink=None, stream_path=None, path="players_data.csv"):
+    """
+    Saves every player scraped to the final CSV.
+
+    Parameters:
+        accumulator (PlayerStatsAccumulator): The players scraped, unused when they are streamed.
+        sink (NDJSONSink, optional): Stream the players were written to; it is closed and
+            the CSV is built from it.
+        stream_path (str, optional): The stream's file.
+        path (str): The CSV file to write.
+    """
+    if sink is not None:
+        sink.close()
+        written = write_csv(stream_path, path)
+        print(f"Wrote {written} players from {stream_path} to {path}")
+        return
     # Convert collected data into a DataFrame
-    players_df = create_dataframe(player_scraper.teams_data)
+    raw_df = accumulator.to_dataframe()
+    players_df = convert_stat_columns(raw_df)
+    memory_report(raw_df, players_df)
     print(players_df)  # Display the DataFrame or save it as needed
-    players_df.to_csv("players_data.csv", index=True)  # Index=True to keep the team and player names as index columns
+    players_df.to_csv(path, index=True)  # Index=True to keep the team and player names as index columns
+
+def report_pool(pool, refresh=False, measure_traffic=False, profile=None):
+    """
+    Prints the browser workers' retries, circuit breaker trips, popups, refresh counts and traffic.
+
+    Parameters:
+        pool (WorkerPool): The pool that ran the scrape.
+        refresh (bool): Whether the run only re-extracted changed players.
+        measure_traffic (bool): Whether the browsers measured their traffic.
+        profile (str, optional): The browser profile the run used.
+    """
+    pool.retries.report()
+    pool.breaker.report()
+    popup_checks = sum(worker.popup_handler.checks for worker in pool.workers)
+    popups_dismissed = sum(worker.popup_handler.popups_dismissed for worker in pool.workers)
+    print(f"Popup checks: {popup_checks}, popups dismissed: {popups_dismissed}")
+    if refresh:
+        unchanged = sum(worker.player_scraper.refresh_counts['unchanged'] for worker in pool.workers)
+        changed = sum(worker.player_scraper.refresh_counts['changed'] for worker in pool.workers)
+        print(f"Refresh: {unchanged} players unchanged, {changed} players re-extracted")
+    if measure_traffic:
+        report_traffic([worker.browser_manager.traffic for worker in pool.workers], profile)
 
-    browser_manager.quit()
+def write_partial(accumulator, path="partial_player_data.csv"):
+    """
+    Saves every player scraped so far, replacing the previous partial dump.
+
+    The whole file is rewritten, so that players stored again since the last
+    dump (e.g. after a retry) are saved with their latest statistics. It is
+    written next to the old one first, so an interrupted dump leaves the
+    previous one in place.
+
+    Parameters:
+        accumulator (PlayerStatsAccumulator): The players scraped so far.
+        path (str): The CSV file to write.
+    """
+    convert_stat_columns(accumulator.to_dataframe()).to_csv(path + ".tmp", index=True)
+    os.replace(path + ".tmp", path)
+
+def reparse(html_dir, competition="LaLiga", season=CURRENT_SEASON):
+    """
+    Rebuilds players_data.csv from previously captured player pages without scraping.
+
+    Parameters:
+        html_dir (str): Directory the pages were saved to by a run with `html_dir` set.
+        competition (str): The competition whose pages are parsed.
+        season (str): The season whose pages are parsed.
+    """
+    players_df = convert_stat_columns(create_dataframe(reparse_directory(html_dir, competition=competition,
+                                                                         season=season)))
+    print(players_df)
+    players_df.to_csv("players_data.csv", index=True)
+
+def crawl(jobs, workers=1, max_workers=MAX_WORKERS, headless=None, profile=None, cache_dir=None, parquet_dir=None,
+          stream_path=None):
+    """
+    Crawls several competitions and seasons with one shared pool of browsers.
+
+    Each job is saved to its own players_data_<competition>_<season>.csv as soon as
+    it finishes, so that a later failure does not lose the jobs already done. A job
+    that gets players back from the final retries is saved again.
+
+    Parameters:
+        jobs (list[tuple[str, str]]): The (competition, season) pairs to crawl.
+        workers (int): Number of browsers to scrape with.
+        max_workers (int): Upper bound on the number of browsers started.
+        headless (bool, optional): Whether the browsers run without a visible window;
+            by default only when several workers are used.
+        profile (str, optional): Browser profile from BROWSER_PROFILES.
+        cache_dir (str, optional): Directory of an on-disk page cache.
+        parquet_dir (str, optional): Directory of a Parquet dataset every job is also written to.
+        stream_path (str, optional): NDJSON file every finished player is appended to. The
+            jobs' players are then not kept in memory, and their CSVs are built from the stream.
+    """
+    cache = PageCache(cache_dir) if cache_dir is not None else None
+    sink = NDJSONSink(stream_path, append=False) if stream_path is not None else None
+    if headless is None:
+        headless = workers > 1
+    pool = WorkerPool(workers, headless=headless, max_workers=max_workers, cache=cache,
+                      browser_options={'profile': profile}, sink=sink)
+
+    def write_job(job):
+        file_name = f"players_data_{job.competition}_{job.season}.csv".replace(" ", "_").replace("/", "-")
+        if sink is not None:
+            sink.flush()
+            if write_csv(stream_path, file_name, competition=job.competition, season=job.season) == 0:
+                print(f"[{job.label}] No players scraped")
+            elif parquet_dir is not None:
+                write_partitioned(read_dataframe(stream_path, competition=job.competition, season=job.season),
+                                  parquet_dir, competition=job.competition, season=job.season)
+            return
+        if len(job.accumulator) == 0:
+            print(f"[{job.label}] No players scraped")
+            return
+        players_df = convert_stat_columns(job.accumulator.to_dataframe())
+        players_df.to_csv(file_name, index=True)
+        if parquet_dir is not None:
+            write_partitioned(players_df, parquet_dir, competition=job.competition, season=job.season)
+
+    scheduler = CrawlScheduler(pool, [CrawlJob(competition, season) for competition, season in jobs],
+                               accumulate=sink is None, on_finished=write_job)
+    try:
+        scheduler.run()
+        scheduler.report()
+        metrics.report()
+    finally:
+        if sink is not None:
+            sink.close()
+        pool.quit()
+        if cache is not None:
+            cache.report()
+            cache.close()
+
+def parse_job(value):
+    """
+    Parses a COMPETITION:SEASON command line value, e.g. 'Premier League:23/24'.
+    """
+    competition, _, season = value.partition(":")
+    if not competition or not season:
+        raise argparse.ArgumentTypeError("expected COMPETITION:SEASON, e.g. 'LaLiga:24/25'")
+    return competition, season
+
+def parse_args():
+    """
+    Parses the command line options of the scraper.
+
+    Returns:
+        argparse.Namespace: The parsed options.
+    """
+    parser = argparse.ArgumentParser(description="Scrape LaLiga player statistics from SofaScore.")
+    parser.add_argument("--workers", type=int, default=1, help="Number of browsers to scrape with.")
+    parser.add_argument("--max-workers", type=int, default=MAX_WORKERS, help="Upper bound on the number of browsers.")
+    parser.add_argument("--profile", choices=sorted(BROWSER_PROFILES),
+                        help="Browser profile; 'lean' runs headless and blocks images, fonts, media and ads.")
+    parser.add_argument("--measure-traffic", action="store_true", help="Report the bytes transferred per page.")
+    parser.add_argument("--user-data-dir", help="Directory of persistent Chrome profiles reused between runs.")
+    parser.add_argument("--debugger-address", help="host:port of a running Chrome to attach to (single worker).")
+    parser.add_argument("--remote-url", help="Remote WebDriver endpoint to start the browsers on.")
+    parser.add_argument("--backend", choices=["browser", "http"], default="browser",
+                        help="Drive Chrome or read SofaScore's JSON API directly.")
+    parser.add_argument("--api-url", default=API_URL, help="Root of the JSON API for the 'http' backend.")
+    parser.add_argument("--concurrency", type=int, default=4, help="API requests in flight for the 'http' backend.")
+    parser.add_argument("--parse-offline", action="store_true",
+                        help="Capture player pages and parse them in a process pool.")
+    parser.add_argument("--html-dir", help="Directory to save captured player pages to.")
+    parser.add_argument("--job", type=parse_job, action="append", dest="jobs",
+                        help="Crawl COMPETITION:SEASON with the shared scheduler; may be repeated.")
+    parser.add_argument("--reparse", metavar="HTML_DIR",
+                        help="Rebuild the CSV from saved player pages and exit; a --job picks their competition "
+                             "and season.")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue the checkpointed run, skipping players already scraped.")
+    parser.add_argument("--checkpoint", default="scrape_checkpoint.db", help="SQLite file recording finished players.")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Only re-extract players whose statistics changed since the last run.")
+    parser.add_argument("--snapshots", default="player_snapshots.db", help="SQLite file keeping player snapshots.")
+    parser.add_argument("--cache-dir", help="Directory of an on-disk page cache to consult before navigating.")
+    parser.add_argument("--parquet-dir", help="Also write a Parquet dataset partitioned by competition/season/team.")
+    parser.add_argument("--metrics-dir", help="Directory to save phase timings and WebDriver command counts to.")
+    parser.add_argument("--stream", metavar="NDJSON_PATH",
+                        help="Append every finished player to this NDJSON file (.gz to compress) instead of "
+                             "keeping players in memory.")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.reparse:
+        competition, season = args.jobs[0] if args.jobs else ("LaLiga", CURRENT_SEASON)
+        reparse(args.reparse, competition, season)
+    elif args.jobs:
+        crawl(args.jobs, workers=args.workers, max_workers=args.max_workers, profile=args.profile,
+              cache_dir=args.cache_dir, parquet_dir=args.parquet_dir, stream_path=args.stream)
+    else:
+        main(workers=args.workers, max_workers=args.max_workers, profile=args.profile,
+             measure_traffic=args.measure_traffic, user_data_dir=args.user_data_dir,
+             debugger_address=args.debugger_address, remote_url=args.remote_url, backend=args.backend,
+             api_url=args.api_url, concurrency=args.concurrency,
+             parse_offline=args.parse_offline or args.html_dir is not None, html_dir=args.html_dir,
+             resume=args.resume, checkpoint_path=args.checkpoint,
+             refresh=args.refresh, snapshot_path=args.snapshots, cache_dir=args.cache_dir,
+             parquet_dir=args.parquet_dir, metrics_dir=args.metrics_dir, stream_path=args.stream)
@@ -0,0 +1,384 @@
+import gzip
+import json
+import os
+import threading
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from data_manager import COLUMNS, convert_stat_columns
+
+
+class NDJSONSink:
+    """
+    An append-only stream of finished players, one JSON record per line.
+
+    Every player is written as soon as it is scraped, so nothing accumulates
+    in memory however many teams and competitions a run covers. Records are
+    flushed to the operating system as they are written, which lets `tail`
+    follow the file live, and fsynced in batches of `fsync_every` records or
+    `fsync_interval` seconds, whichever comes first. Paths ending in '.gz' are
+    gzip compressed; each batch is written as a complete gzip member so that a
+    reader can decompress everything written so far. Appending to a stream left
+    behind by a crash first cuts the unfinished record or gzip member at its
+    end. One sink can be shared by every worker of a run.
+
+    Each record holds the player's 'team', 'player', 'competition', 'season',
+    'url', the time it was 'written_at' and its 'stats'.
+
+    Attributes:
+        path (str): Location of the NDJSON file.
+        compressed (bool): Whether the file is gzip compressed.
+        fsync_every (int): Records written between two fsyncs.
+        fsync_interval (float): Seconds after which pending records are fsynced anyway.
+        records (int): Number of records written by this sink.
+    """
+
+    def __init__(self, path, append=True, fsync_every=50, fsync_interval=1.0):
+        """
+        Opens the file for appending, creating it if needed.
+
+        Parameters:
+            path (str): Location of the NDJSON file; a '.gz' suffix turns on compression.
+            append (bool): Keep the records already in the file, e.g. when resuming a run.
+                If False, the file is started afresh.
+            fsync_every (int): Records written between two fsyncs.
+            fsync_interval (float): Seconds after which pending records are fsynced anyway.
+        """
+        self.path = path
+        self.compressed = path.endswith('.gz')
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.records = 0
+        self._pending = 0
+        self._synced_at = time.monotonic()
+        self._lock = threading.Lock()
+        if append and os.path.exists(path):
+            _repair(path, self.compressed)
+        self._raw = open(path, 'ab' if append else 'wb')
+        self._file = gzip.GzipFile(fileobj=self._raw, mode='ab') if self.compressed else self._raw
+
+    def write(self, team_name, player_name, stats, competition=None, season=None, player_url=None):
+        """
+        Appends one finished player to the stream.
+
+        Parameters:
+            team_name (str): The player's team.
+            player_name (str): The player's name.
+            stats (dict): The player's statistics.
+            competition (str, optional): The competition the statistics belong to.
+            season (str, optional): The season the statistics belong to.
+            player_url (str, optional): URL of the player's page.
+        """
+        line = json.dumps({
+            'team': team_name, 'player': player_name, 'competition': competition, 'season': season,
+            'url': player_url, 'written_at': time.time(), 'stats': stats,
+        }, ensure_ascii=False).encode('utf-8') + b'\n'
+        with self._lock:
+            self._file.write(line)
+            if not self.compressed:
+                self._file.flush()
+            self.records += 1
+            self._pending += 1
+            if self._pending >= self.fsync_every or time.monotonic() - self._synced_at >= self.fsync_interval:
+                self._sync()
+
+    def _sync(self, reopen=True):
+        if self.compressed and (self._pending or not reopen):
+            # Closing the member writes its trailer; only the batch being written can be cut short
+            self._file.close()
+            if reopen:
+                self._file = gzip.GzipFile(fileobj=self._raw, mode='ab')
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        self._pending = 0
+        self._synced_at = time.monotonic()
+
+    def flush(self):
+        """
+        Flushes and fsyncs every record written so far.
+        """
+        with self._lock:
+            self._sync()
+
+    def close(self):
+        """
+        Flushes the pending records and closes the file.
+        """
+        with self._lock:
+            if self._raw.closed:
+                return
+            self._sync(reopen=False)
+            self._raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _gzip_members(f):
+    """
+    Decompresses a file of concatenated gzip members a chunk at a time.
+
+    Stops without raising at a member cut short by a crash, or at anything that
+    is not a valid member.
+
+    Yields:
+        tuple[bytes, int | None]: The data decompressed from a chunk, and the offset at which
+            its member ends if the member is complete with this chunk.
+    """
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    offset = 0
+    while True:
+        data = f.read(65536)
+        if not data:
+            return
+        while data:
+            try:
+                out = decompressor.decompress(data)
+            except zlib.error:
+                return
+            if not decompressor.eof:
+                offset += len(data)
+                yield out, None
+                break
+            unused = decompressor.unused_data
+            offset += len(data) - len(unused)
+            yield out, offset
+            data = unused
+            decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+
+
+def _repair(path, compressed):
+    """
+    Cuts the end a crash left in a stream, so that records appended to it stay readable.
+
+    A plain stream loses its last line if it is unfinished. In a compressed stream,
+    the unfinished member is replaced by a complete one holding the records that
+    can still be decompressed from it.
+    """
+    with open(path, 'rb+') as f:
+        size = f.seek(0, os.SEEK_END)
+        if not compressed:
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b'\n':
+                return
+            end = size
+            while end > 0:
+                start = max(0, end - 65536)
+                f.seek(start)
+                newline = f.read(end - start).rfind(b'\n')
+                if newline != -1:
+                    end = start + newline + 1
+                    break
+                end = start
+            f.truncate(end)
+            print(f"Removed an unfinished record from the end of {path}")
+            return
+
+        f.seek(0)
+        valid = 0
+        pending = []
+        for data, member_end in _gzip_members(f):
+            if member_end is None:
+                pending.append(data)
+            else:
+                valid = member_end
+                pending = []
+        if valid == size:
+            return
+        recovered = b''.join(pending)
+        recovered = recovered[:recovered.rfind(b'\n') + 1]
+        records = recovered.count(b'\n')
+        f.truncate(valid)
+        f.seek(valid)
+        if recovered:
+            with gzip.GzipFile(fileobj=f, mode='ab') as member:
+                member.write(recovered)
+        print(f"Repaired the end of {path}, recovering {records} records")
+
+
+def _lines(path):
+    if not path.endswith('.gz'):
+        with open(path, 'rb') as f:
+            yield from f
+        return
+    buffer = b''
+    with open(path, 'rb') as f:
+        for data, _ in _gzip_members(f):
+            buffer += data
+            *lines, buffer = buffer.split(b'\n')
+            yield from lines
+
+
+def _matches(record, competition, season, teams):
+    return (competition is None or record.get('competition') == competition) and \
+        (season is None or record.get('season') == season) and \
+        (teams is None or record['team'] in teams)
+
+
+def read_records(path, competition=None, season=None, teams=None):
+    """
+    Reads the records of a stream in the order they were written.
+
+    A line or gzip member cut short by a crash is skipped.
+
+    Parameters:
+        path (str): Location of the NDJSON file, gzip compressed if it ends in '.gz'.
+        competition (str, optional): Only read records of this competition.
+        season (str, optional): Only read records of this season.
+        teams (list[str], optional): Only read records of these teams.
+
+    Yields:
+        dict: One record per finished player.
+    """
+    for line in _lines(path):
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if _matches(record, competition, season, teams):
+            yield record
+
+
+def _records_to_dataframe(records, columns):
+    rows = []
+    for record in records:
+        stats = record['stats']
+        row = {col: stats.get(col, np.nan) for col in columns}
+        row['Team'] = record['team']
+        row['Player Name'] = record['player']
+        rows.append(row)
+    df = pd.DataFrame(rows, columns=['Team', 'Player Name'] + list(columns))
+    return df.set_index(['Team', 'Player Name'])
+
+
+def read_chunks(path, chunksize=10000, competition=None, season=None, teams=None, columns=COLUMNS):
+    """
+    Reads a stream back as DataFrames in the layout of `create_dataframe`, a chunk at a time.
+
+    Only one chunk of records is held in memory at once. A player written more
+    than once, e.g. after a crash between the stream and the checkpoint, is only
+    returned the first time.
+
+    Parameters:
+        path (str): Location of the NDJSON file.
+        chunksize (int): Number of players per DataFrame.
+        competition (str, optional): Only read players of this competition.
+        season (str, optional): Only read players of this season.
+        teams (list[str], optional): Only read players of these teams.
+        columns (list[str]): Statistics columns of the DataFrames.
+
+    Yields:
+        pd.DataFrame: Raw text statistics indexed by 'Team' and 'Player Name'.
+    """
+    seen = set()
+    chunk = []
+    for record in read_records(path, competition, season, teams):
+        key = (record['team'], record['player'], record.get('competition'), record.get('season'))
+        if key in seen:
+            continue
+        seen.add(key)
+        chunk.append(record)
+        if len(chunk) == chunksize:
+            yield _records_to_dataframe(chunk, columns)
+            chunk = []
+    if chunk:
+        yield _records_to_dataframe(chunk, columns)
+
+
+def read_dataframe(path, competition=None, season=None, teams=None, columns=COLUMNS):
+    """
+    Reads a whole stream back as one DataFrame in the layout of `create_dataframe`.
+
+    Parameters:
+        path (str): Location of the NDJSON file.
+        competition (str, optional): Only read players of this competition.
+        season (str, optional): Only read players of this season.
+        teams (list[str], optional): Only read players of these teams.
+        columns (list[str]): Statistics columns of the DataFrame.
+
+    Returns:
+        pd.DataFrame: Raw text statistics indexed by 'Team' and 'Player Name'.
+    """
+    chunks = list(read_chunks(path, competition=competition, season=season, teams=teams, columns=columns))
+    if not chunks:
+        return _records_to_dataframe([], columns)
+    return pd.concat(chunks)
+
+
+def write_csv(path, csv_path, chunksize=10000, competition=None, season=None):
+    """
+    Converts a stream into a typed CSV file chunk by chunk, without loading it whole.
+
+    Parameters:
+        path (str): Location of the NDJSON file.
+        csv_path (str): CSV file to write, with the team and player names as index columns.
+        chunksize (int): Number of players converted at a time.
+        competition (str, optional): Only write players of this competition.
+        season (str, optional): Only write players of this season.
+
+    Returns:
+        int: Number of players written.
+    """
+    written = 0
+    for chunk in read_chunks(path, chunksize, competition, season):
+        convert_stat_columns(chunk).to_csv(csv_path, index=True, mode='w' if written == 0 else 'a',
+                                           header=written == 0)
+        written += len(chunk)
+    return written
+
+
+def tail(path, from_start=True, poll_interval=0.5, stop=None):
+    """
+    Follows a stream as it is written, like `tail -f`.
+
+    Works on compressed streams too, decompressing what has been flushed so far.
+
+    Parameters:
+        path (str): Location of the NDJSON file.
+        from_start (bool): Yield the records already in the file first; otherwise only
+            records written from now on. Compressed streams are always read from the start.
+        poll_interval (float): Seconds to wait for new data when the end of the file is reached.
+        stop (threading.Event, optional): Ends the generator once set and no data is left.
+
+    Yields:
+        dict: One record per finished player, as soon as it is written.
+    """
+    compressed = path.endswith('.gz')
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16) if compressed else None
+    buffer = b''
+    with open(path, 'rb') as f:
+        if not from_start and not compressed:
+            f.seek(0, os.SEEK_END)
+        while True:
+            data = f.read(65536)
+            if not data:
+                if stop is not None and stop.is_set():
+                    return
+                time.sleep(poll_interval)
+                continue
+            if compressed:
+                chunks = []
+                while data:
+                    chunks.append(decompressor.decompress(data))
+                    data = decompressor.unused_data
+                    if decompressor.eof:
+                        # Every time the file is reopened for appending a new gzip member starts
+                        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+                    else:
+                        data = b''
+                data = b''.join(chunks)
+            buffer += data
+            *lines, buffer = buffer.split(b'\n')
+            for line in lines:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
@@ -0,0 +1,175 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+# Seconds each kind of resource stays fresh. Standings change after every match
+# day, squads rarely change outside the transfer windows, and the statistics of
+# a finished season never change again.
+DEFAULT_TTLS = {
+    'standings': 60 * 60,
+    'team': 3 * 24 * 60 * 60,
+    'player': 12 * 60 * 60,
+    'api': 60 * 60,
+    'archive': 30 * 24 * 60 * 60,
+}
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+class PageCache:
+    """
+    An on-disk cache of captured page HTML and JSON payloads.
+
+    Entries are keyed by URL plus the selected competition and season, expire
+    after a per-kind TTL, and the least recently used entries are evicted once
+    the cache grows past its size limit. Hits and misses are counted per kind.
+
+    Attributes:
+        root (str): Directory holding the cached files and their index.
+        max_bytes (int): Size limit of the cached files.
+        ttls (dict): Seconds an entry of each kind stays fresh.
+        hits (dict): Number of cache hits per kind.
+        misses (dict): Number of cache misses per kind.
+    """
+
+    def __init__(self, root=".page_cache", max_bytes=DEFAULT_MAX_BYTES, ttls=None):
+        """
+        Opens the cache, creating its directory and index if needed.
+
+        Parameters:
+            root (str): Directory holding the cached files and their index.
+            max_bytes (int): Size limit of the cached files.
+            ttls (dict, optional): TTLs overriding the defaults, by kind.
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.hits = {}
+        self.misses = {}
+        self._lock = threading.Lock()
+
+        os.makedirs(root, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(root, "index.db"), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+
+    @staticmethod
+    def _key(url, competition, season):
+        return hashlib.sha1(f"{url}|{competition or ''}|{season or ''}".encode('utf-8')).hexdigest()
+
+    def _file(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def get(self, kind, url, competition=None, season=None):
+        """
+        Returns a cached resource if it is present and still fresh.
+
+        Parameters:
+            kind (str): Kind of resource, selecting its TTL.
+            url (str): URL the resource was captured from.
+            competition (str, optional): Competition selected when it was captured.
+            season (str, optional): Season selected when it was captured.
+
+        Returns:
+            str | None: The cached content, or None on a miss.
+        """
+        key = self._key(url, competition, season)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT created_at FROM entries WHERE key = ?", (key,)).fetchone()
+            fresh = row is not None and now - row[0] <= self.ttls.get(kind, 0)
+            if fresh:
+                try:
+                    with open(self._file(key), encoding='utf-8') as f:
+                        content = f.read()
+                except OSError:
+                    self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                    fresh = False
+            if not fresh:
+                self.misses[kind] = self.misses.get(kind, 0) + 1
+                return None
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits[kind] = self.hits.get(kind, 0) + 1
+        return content
+
+    def put(self, kind, url, content, competition=None, season=None):
+        """
+        Stores a resource, evicting least recently used entries if the cache is full.
+
+        Parameters:
+            kind (str): Kind of resource, selecting its TTL.
+            url (str): URL the resource was captured from.
+            content (str): The HTML or JSON text to cache.
+            competition (str, optional): Competition selected when it was captured.
+            season (str, optional): Season selected when it was captured.
+        """
+        key = self._key(url, competition, season)
+        path = self._file(key)
+        data = content.encode('utf-8')
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = path + ".tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+
+            now = time.time()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)", (key, kind, len(data), now, now)
+            )
+            self._evict()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY accessed_at").fetchall():
+            try:
+                os.remove(self._file(key))
+            except OSError:
+                pass
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self):
+        """
+        Returns the hit and miss counts of every kind requested so far.
+
+        Returns:
+            dict: Hits, misses and hit ratio, keyed by kind.
+        """
+        summary = {}
+        for kind in sorted(set(self.hits) | set(self.misses)):
+            hits = self.hits.get(kind, 0)
+            misses = self.misses.get(kind, 0)
+            summary[kind] = {'hits': hits, 'misses': misses, 'hit_ratio': hits / (hits + misses)}
+        return summary
+
+    def report(self):
+        """
+        Prints the hit and miss counts of every kind requested so far.
+        """
+        for kind, counts in self.stats().items():
+            print(f"Cache {kind}: {counts['hits']} hits, {counts['misses']} misses ({counts['hit_ratio']:.0%} hit ratio)")
+
+    def close(self):
+        """
+        Closes the cache index.
+        """
+        with self._lock:
+            self._conn.close()
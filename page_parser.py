@@ -0,0 +1,138 @@
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import json
+import os
+import threading
+
+from data_manager import CURRENT_SEASON
+from player_stats import HtmlStatReader, parse_field_player, parse_goalkeeper
+
+MANIFEST_FILE = "manifest.jsonl"
+
+
+def parse_player_page(page_source, position):
+    """
+    Parses a captured player page into the player's name and statistics.
+
+    Runs in the parser processes, so it only depends on the HTML and position.
+
+    Parameters:
+        page_source (str): HTML of the player page after the competition was selected.
+        position (str): The player's position from the squad table.
+
+    Returns:
+        tuple[str, dict]: The player's name and statistics, as the live scrapers build them.
+    """
+    reader = HtmlStatReader(page_source)
+    if position.lower() == "goalkeeper":
+        return parse_goalkeeper(reader)
+    return parse_field_player(reader)
+
+
+class PageParserPool:
+    """
+    Parses captured player pages in a pool of processes while the browser moves on.
+
+    Captured pages can also be written to a directory together with a manifest,
+    so that they can be parsed again later with `reparse_directory`. The manifest
+    records the team, competition and season of every page.
+
+    Attributes:
+        html_dir (str | None): Directory the captured pages are saved to, if any.
+    """
+
+    def __init__(self, max_workers=None, html_dir=None):
+        """
+        Starts the parser processes.
+
+        Parameters:
+            max_workers (int, optional): Number of parser processes; defaults to the CPU count.
+            html_dir (str, optional): Directory to save captured pages to.
+        """
+        self.html_dir = html_dir
+        self._executor = ProcessPoolExecutor(max_workers=max_workers)
+        self._manifest_lock = threading.Lock()
+        if html_dir is not None:
+            os.makedirs(html_dir, exist_ok=True)
+
+    def submit(self, team_name, player_link, position, page_source, competition="LaLiga", season=CURRENT_SEASON):
+        """
+        Queues a captured player page for parsing.
+
+        Parameters:
+            team_name (str): The team the player belongs to.
+            player_link (str): URL of the player's page.
+            position (str): The player's position from the squad table.
+            page_source (str): HTML of the player page.
+            competition (str): The competition selected on the page.
+            season (str): The season selected on the page.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the player's name and statistics.
+        """
+        if self.html_dir is not None:
+            self._save(team_name, player_link, position, page_source, competition, season)
+        return self._executor.submit(parse_player_page, page_source, position)
+
+    def _save(self, team_name, player_link, position, page_source, competition, season):
+        # The same player page shows a different season once another one is selected
+        page_key = f"{player_link}|{competition}|{season}"
+        file_name = hashlib.sha1(page_key.encode('utf-8')).hexdigest() + ".html"
+        with open(os.path.join(self.html_dir, file_name), 'w', encoding='utf-8') as f:
+            f.write(page_source)
+
+        entry = {'team': team_name, 'link': player_link, 'position': position, 'competition': competition,
+                 'season': season, 'file': file_name}
+        with self._manifest_lock:
+            with open(os.path.join(self.html_dir, MANIFEST_FILE), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def close(self):
+        """
+        Waits for queued pages to be parsed and stops the parser processes.
+        """
+        self._executor.shutdown()
+
+
+def reparse_directory(html_dir, max_workers=None, competition="LaLiga", season=CURRENT_SEASON):
+    """
+    Rebuilds teams_data from the pages saved by a `PageParserPool`, without a browser.
+
+    Only the pages of one competition and season are parsed. Manifest entries
+    written before the competition and season were recorded count as LaLiga in
+    the current season, the only ones captured then.
+
+    Parameters:
+        html_dir (str): Directory holding the saved pages and their manifest.
+        max_workers (int, optional): Number of parser processes.
+        competition (str): The competition to rebuild.
+        season (str): The season to rebuild.
+
+    Returns:
+        dict: The scraped team and player data, in the same layout as `PlayerScraper.teams_data`.
+    """
+    entries = {}
+    with open(os.path.join(html_dir, MANIFEST_FILE), encoding='utf-8') as f:
+        for line in f:
+            entry = json.loads(line)
+            if (entry.get('competition', "LaLiga"), entry.get('season', CURRENT_SEASON)) != (competition, season):
+                continue
+            entries[(entry['team'], entry['link'])] = entry  # Later captures replace earlier ones
+
+    teams_data = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = []
+        for entry in entries.values():
+            with open(os.path.join(html_dir, entry['file']), encoding='utf-8') as f:
+                page_source = f.read()
+            futures.append((entry['team'], executor.submit(parse_player_page, page_source, entry['position'])))
+
+        for team_name, future in futures:
+            teams_data.setdefault(team_name, {})
+            try:
+                player_name, stats = future.result()
+            except Exception as e:
+                print(f"Error parsing a saved page of {team_name}: {e}")
+                continue
+            teams_data[team_name][player_name] = stats
+    return teams_data
@@ -0,0 +1,84 @@
+from instrumentation import metrics
+
+
+class PageNavigator:
+    """
+    Tracks what the browser is currently showing so that pages are only loaded,
+    and competitions and seasons only selected, when that state actually changes.
+
+    Attributes:
+        driver (webdriver.Chrome): The WebDriver instance to navigate with.
+        current_url (str | None): The URL most recently loaded through the navigator.
+        competition (str | None): The competition selected on the current page.
+        season (str | None): The season shown on the current page.
+        load_counts (dict): Number of times each URL has been loaded.
+        popup_handler (PopupHandler | None): If set, its popup counters are collected
+            before every page load.
+    """
+
+    def __init__(self, driver, popup_handler=None):
+        """
+        Initializes the navigator with a WebDriver.
+
+        Parameters:
+            driver (webdriver.Chrome): The WebDriver instance to navigate with.
+            popup_handler (PopupHandler, optional): Handler whose counters would be lost
+                with the page.
+        """
+        self.driver = driver
+        self.popup_handler = popup_handler
+        self.current_url = None
+        self.competition = None
+        self.season = None
+        self.load_counts = {}
+
+    def navigate(self, url):
+        """
+        Loads a URL unless it is already the current page.
+
+        Loading a new page resets the known competition and season, since the
+        page starts out with its own defaults.
+
+        Parameters:
+            url (str): The URL to show.
+
+        Returns:
+            bool: True if the page was loaded, False if it was already showing.
+        """
+        if url == self.current_url:
+            return False
+
+        if self.popup_handler is not None:
+            self.popup_handler.collect()
+        with metrics.timed('navigate'):
+            self.driver.get(url)
+        self.current_url = url
+        self.competition = None
+        self.season = None
+        self.load_counts[url] = self.load_counts.get(url, 0) + 1
+        return True
+
+    def page_loads(self, url):
+        """
+        Returns how many times a URL has been loaded.
+
+        Parameters:
+            url (str): The URL to look up.
+        """
+        return self.load_counts.get(url, 0)
+
+    def total_page_loads(self):
+        """
+        Returns the number of pages loaded through the navigator.
+        """
+        return sum(self.load_counts.values())
+
+    def invalidate(self):
+        """
+        Forgets the current page state, forcing the next navigation to reload.
+
+        Should be called after the browser was navigated without the navigator.
+        """
+        self.current_url = None
+        self.competition = None
+        self.season = None
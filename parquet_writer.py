@@ -0,0 +1,74 @@
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from data_manager import CURRENT_SEASON, convert_stat_columns
+
+PARTITION_COLUMNS = ['Competition', 'Season', 'Team']
+
+
+def write_partitioned(df, root, competition="LaLiga", season=CURRENT_SEASON, compression="zstd"):
+    """
+    Writes player statistics as Parquet files partitioned by competition, season and team.
+
+    Each team's partition is replaced as a whole, so writing the same team again
+    (e.g. after every team of a run) never duplicates rows.
+
+    Parameters:
+        df (pd.DataFrame): Player statistics indexed by 'Team' and 'Player Name'. Text
+            columns are converted with `convert_stat_columns` first.
+        root (str): Directory of the partitioned dataset.
+        competition (str): The competition the statistics belong to.
+        season (str): The season the statistics belong to.
+        compression (str): Parquet compression codec.
+    """
+    if df.empty:
+        return
+    if (df.dtypes == object).any():
+        df = convert_stat_columns(df)
+
+    rows = df.reset_index()
+    rows['Team'] = rows['Team'].astype(str)
+    rows['Competition'] = competition
+    rows['Season'] = season
+    table = pa.Table.from_pandas(rows, preserve_index=False)
+    pq.write_to_dataset(
+        table, root, partition_cols=PARTITION_COLUMNS, compression=compression,
+        existing_data_behavior='delete_matching'
+    )
+
+
+def read_players(root, columns=None, teams=None, competition=None, season=None):
+    """
+    Reads player statistics back from a partitioned dataset.
+
+    Only the requested columns are read, and partitions not matching the given
+    teams, competition or season are skipped without being opened.
+
+    Parameters:
+        root (str): Directory of the partitioned dataset.
+        columns (list[str], optional): Statistics columns to read; all if not given.
+        teams (list[str], optional): Teams to read; all if not given.
+        competition (str, optional): Competition to read; all if not given.
+        season (str, optional): Season to read; all if not given.
+
+    Returns:
+        pd.DataFrame: The statistics indexed by 'Team' and 'Player Name'.
+    """
+    dataset = ds.dataset(root, format='parquet', partitioning='hive')
+
+    conditions = []
+    if teams is not None:
+        conditions.append(ds.field('Team').isin(teams))
+    if competition is not None:
+        conditions.append(ds.field('Competition') == competition)
+    if season is not None:
+        conditions.append(ds.field('Season') == season)
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+
+    if columns is not None:
+        columns = ['Team', 'Player Name'] + [col for col in columns if col not in ('Team', 'Player Name')]
+    table = dataset.to_table(columns=columns, filter=expression)
+    return table.to_pandas().set_index(['Team', 'Player Name'])
@@ -0,0 +1,263 @@
+import numpy as np
+import pandas as pd
+
+from data_manager import COLUMNS, COUNT_COLUMNS, convert_stat_columns
+
+# Season totals, normalised by the minutes played over the whole season
+TOTAL_COLUMNS = [col for col in COUNT_COLUMNS if col != 'Games Played'] + [
+    'Expected Goals (xG)', 'Expected Assists (xA)', 'Goals Prevented'
+]
+
+# Per-game averages, normalised by the minutes played per game. SofaScore shows
+# the successful passes, long balls and possession won rows per game as well.
+PER_GAME_COLUMNS = [col for col in COLUMNS if col.endswith('Per Game')] + [
+    'Succesful Passes Opp. Half', 'Succesful Long Balls', 'Possession Won Opp. Half', 'Passes Completed'
+]
+
+# Shares that are already comparable between players and are ranked as they are
+PERCENTAGE_COLUMNS = [col for col in COLUMNS if 'Percentage' in col]
+
+# Statistics where a lower value ranks higher
+LOWER_IS_BETTER = {
+    'Big Chances Missed', 'Dribbled Past Per Game', 'Possession Lost Per Game', 'Fouls Committed Per Game',
+    'Offsides Per Game', 'Goals Conceded Per Game', 'Goals Conceded', 'Errors leading to shot',
+    'Errors leading to goal',
+}
+
+# Columns that, when present, split players into separate leagues and teams
+LEAGUE_COLUMNS = ['Competition', 'Season']
+
+
+def per90_name(col):
+    """
+    Returns the name of a statistic's per-90 column, e.g. 'Shots per 90' for 'Shots Per Game'.
+    """
+    return col[:-len(' Per Game')] + ' per 90' if col.endswith(' Per Game') else col + ' per 90'
+
+
+def _numeric(df, columns):
+    columns = [col for col in columns if col in df.columns]
+    return columns, df[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def per90_table(df):
+    """
+    Converts season totals and per-game averages into per-90-minute rates.
+
+    Season minutes are 'Games Played' times 'Minutes Played', which holds minutes
+    per game. Totals are divided by the season minutes and per-game averages by
+    the minutes per game, both for every player and column at once. Players
+    without minutes get NaN. Statistics kept in separate columns for goalkeepers
+    and field players ('Passes Completed' and 'Passes Completed Per Game') share
+    one per-90 column.
+
+    Parameters:
+        df (pd.DataFrame): Typed player statistics, as returned by `convert_stat_columns`.
+
+    Returns:
+        pd.DataFrame: 'Minutes', 'Goalkeeper' and the per-90 columns, with the same index
+            as `df` (and its league columns, if any).
+    """
+    games = df['Games Played'].to_numpy(dtype=np.float64, na_value=np.nan)
+    minutes_per_game = df['Minutes Played'].to_numpy(dtype=np.float64, na_value=np.nan)
+    minutes = games * minutes_per_game
+
+    total_columns, totals = _numeric(df, TOTAL_COLUMNS)
+    per_game_columns, per_game = _numeric(df, PER_GAME_COLUMNS)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        season_factor = np.where(minutes > 0, 90 / minutes, np.nan)[:, None]
+        game_factor = np.where(minutes_per_game > 0, 90 / minutes_per_game, np.nan)[:, None]
+        rates = np.hstack([totals * season_factor, per_game * game_factor])
+
+    columns = {}
+    for j, col in enumerate(total_columns + per_game_columns):
+        name = per90_name(col)
+        if name in columns:
+            columns[name] = np.where(np.isnan(columns[name]), rates[:, j], columns[name])
+        else:
+            columns[name] = rates[:, j]
+    table = pd.DataFrame(columns, index=df.index)
+    table.insert(0, 'Minutes', minutes)
+    table.insert(1, 'Goalkeeper', df['Saves Per Game'].notna().to_numpy() if 'Saves Per Game' in df.columns
+                 else np.zeros(len(df), dtype=bool))
+    for col in LEAGUE_COLUMNS:
+        if col in df.columns:
+            table[col] = df[col].to_numpy()
+    return table
+
+
+def percentile_ranks(per90, percentages=None, min_minutes=450):
+    """
+    Ranks every player against the players of the same league and position.
+
+    Goalkeepers and field players are ranked separately within each
+    competition and season. Only players with at least `min_minutes` form the
+    reference distribution and get a rank; the others get NaN. Columns in
+    LOWER_IS_BETTER are ranked in reverse.
+
+    Parameters:
+        per90 (pd.DataFrame): Per-90 rates, as returned by `per90_table`.
+        percentages (pd.DataFrame, optional): Percentage columns to rank alongside, on the same index.
+        min_minutes (float): Season minutes a player needs to be ranked.
+
+    Returns:
+        pd.DataFrame: Percentile ranks from 0 to 100, on the same index.
+    """
+    rate_columns = [col for col in per90.columns if col.endswith(' per 90')]
+    values = per90[rate_columns].to_numpy(dtype=np.float64)
+    columns = rate_columns
+    if percentages is not None:
+        values = np.hstack([values, percentages.to_numpy(dtype=np.float64, na_value=np.nan)])
+        columns = rate_columns + list(percentages.columns)
+    reverse = np.array([col in LOWER_IS_BETTER or col[:-len(' per 90')] in LOWER_IS_BETTER
+                        or col[:-len(' per 90')] + ' Per Game' in LOWER_IS_BETTER for col in columns])
+
+    eligible = per90['Minutes'].to_numpy(dtype=np.float64) >= min_minutes
+    group_columns = [col for col in LEAGUE_COLUMNS if col in per90.columns] + ['Goalkeeper']
+    group_codes = pd.MultiIndex.from_frame(per90[group_columns].astype(str)).factorize()[0]
+
+    ranks = np.full(values.shape, np.nan)
+    for group in np.unique(group_codes):
+        rows = np.flatnonzero((group_codes == group) & eligible)
+        block = values[rows]
+        for j in range(block.shape[1]):
+            column = block[:, j]
+            reference = np.sort(column[~np.isnan(column)])
+            if len(reference) == 0:
+                continue
+            # Midpoint rank, so that tied players share a percentile
+            below = np.searchsorted(reference, column, side='left')
+            at_or_below = np.searchsorted(reference, column, side='right')
+            pct = 100 * (below + at_or_below) / (2 * len(reference))
+            if reverse[j]:
+                pct = 100 - pct
+            ranks[rows, j] = np.where(np.isnan(column), np.nan, pct)
+    return pd.DataFrame(ranks, index=per90.index, columns=columns)
+
+
+def team_aggregates(per90, df):
+    """
+    Sums every team's minutes and season totals and turns them into team per-90 rates.
+
+    Team rates are per 90 minutes of the team's matches, not of its players:
+    the team is taken to have played as many matches as its most used player,
+    so 'Match Minutes' is the highest 'Games Played' in the team times 90.
+    'Minutes' keeps the sum of its players' minutes.
+
+    Parameters:
+        per90 (pd.DataFrame): Per-90 rates, as returned by `per90_table`.
+        df (pd.DataFrame): The typed player statistics `per90` was computed from.
+
+    Returns:
+        pd.DataFrame: One row per team with its players, minutes, match minutes, totals
+            and per-90 rates.
+    """
+    team_keys = _team_keys(df)
+    codes, teams = team_keys.factorize()
+    minutes = np.nan_to_num(per90['Minutes'].to_numpy(dtype=np.float64))
+    games = np.nan_to_num(df['Games Played'].to_numpy(dtype=np.float64, na_value=np.nan))
+    matches = np.zeros(len(teams))
+    np.maximum.at(matches, codes, games)
+    total_columns, totals = _numeric(df, TOTAL_COLUMNS)
+
+    aggregates = {
+        'Players': np.bincount(codes, minlength=len(teams)),
+        'Minutes': np.bincount(codes, weights=minutes, minlength=len(teams)),
+        'Match Minutes': matches * 90,
+    }
+    sums = np.column_stack([
+        np.bincount(codes, weights=np.nan_to_num(totals[:, j]), minlength=len(teams)) for j in range(totals.shape[1])
+    ]) if total_columns else np.empty((len(teams), 0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        match_minutes = aggregates['Match Minutes'][:, None]
+        rates = np.where(match_minutes > 0, sums * 90 / match_minutes, np.nan)
+    for j, col in enumerate(total_columns):
+        aggregates[col] = sums[:, j]
+    for j, col in enumerate(total_columns):
+        aggregates[per90_name(col)] = rates[:, j]
+    return pd.DataFrame(aggregates, index=teams)
+
+
+def _team_keys(df):
+    rows = df.reset_index()
+    return pd.MultiIndex.from_frame(rows[[col for col in LEAGUE_COLUMNS if col in rows.columns] + ['Team']].astype(str))
+
+
+class MetricsEngine:
+    """
+    Keeps per-90 rates, percentile ranks and team aggregates up to date across refreshes.
+
+    Every call to `update` hashes each team's rows and recomputes per-90 rates
+    and team aggregates only for teams whose rows changed, were added or were
+    removed. Percentile ranks depend on the whole league and are always
+    recomputed, from the cached per-90 rates.
+
+    Attributes:
+        min_minutes (float): Season minutes a player needs to be ranked.
+        per90 (pd.DataFrame | None): Per-90 rates of every player.
+        percentiles (pd.DataFrame | None): Percentile ranks of every player.
+        teams (pd.DataFrame | None): Aggregates of every team.
+        changed_teams (list[tuple]): Keys of the teams recomputed by the last update.
+    """
+
+    def __init__(self, min_minutes=450):
+        """
+        Initializes an empty engine.
+
+        Parameters:
+            min_minutes (float): Season minutes a player needs to be ranked.
+        """
+        self.min_minutes = min_minutes
+        self.per90 = None
+        self.percentiles = None
+        self.teams = None
+        self.changed_teams = []
+        self._hashes = {}
+        self._per90_blocks = {}
+        self._share_blocks = {}
+        self._team_rows = {}
+
+    def update(self, df):
+        """
+        Brings the metrics in line with a new player table.
+
+        Parameters:
+            df (pd.DataFrame): Player statistics as returned by `create_dataframe`, raw or
+                converted with `convert_stat_columns`.
+
+        Returns:
+            list[tuple]: Keys of the teams whose metrics were recomputed.
+        """
+        if (df.dtypes == object).any():
+            df = convert_stat_columns(df)
+
+        team_keys = _team_keys(df)
+        codes, teams = team_keys.factorize()
+        row_hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+        team_hashes = np.zeros(len(teams), dtype=np.uint64)
+        np.add.at(team_hashes, codes, row_hashes)
+
+        changed = [i for i, key in enumerate(teams) if self._hashes.get(key) != team_hashes[i]]
+        for key in set(self._hashes) - set(teams):
+            del self._hashes[key], self._per90_blocks[key], self._share_blocks[key], self._team_rows[key]
+
+        if changed:
+            rows = np.isin(codes, changed)
+            subset = df[rows]
+            subset_codes = codes[rows]
+            per90 = per90_table(subset)
+            shares = subset[[col for col in PERCENTAGE_COLUMNS if col in subset.columns]]
+            aggregates = team_aggregates(per90, subset)
+            for i in changed:
+                key = teams[i]
+                self._hashes[key] = team_hashes[i]
+                self._per90_blocks[key] = per90[subset_codes == i]
+                self._share_blocks[key] = shares[subset_codes == i]
+                self._team_rows[key] = aggregates.loc[[key]]
+
+        self.per90 = pd.concat([self._per90_blocks[key] for key in teams])
+        self.teams = pd.concat([self._team_rows[key] for key in teams])
+        percentages = pd.concat([self._share_blocks[key] for key in teams])
+        self.percentiles = percentile_ranks(self.per90, percentages, self.min_minutes)
+        self.changed_teams = [teams[i] for i in changed]
+        return self.changed_teams
@@ -1,12 +1,38 @@
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
-from data_manager import clean_stat_value
-from competition_error import CompetitionNotAvailableException
-
-
-import time
+from player_stats import (BatchStatReader, LiveStatReader, STATS_BLOCK_XPATH, parse_field_player, parse_goalkeeper,
+                          read_fingerprint)
+from competition_error import CompetitionNotAvailableException, PlayerScrapeError
+from page_state import PageNavigator
+from page_parser import parse_player_page
+from data_manager import CURRENT_SEASON
+from instrumentation import metrics
+from wait_engine import AdaptiveWait
+from retry_queue import RETRYABLE_ERRORS, describe_error
+
+COMPETITION_DROPDOWN_XPATH = "//div[@class='Box Flex ggRYVx qjBwj']//div[1]//button[1]"
+SEASON_DROPDOWN_XPATH = "//div[@class='Box Flex ggRYVx qjBwj']//div[2]//button[1]"
+MENU_OPTION_XPATH = "//bdi[@class='Text jFxLbA'][normalize-space()='{label}']"
+SQUAD_TABLE_XPATH = "//table[contains(@class, 'fEUhaC')]"
+SQUAD_ROW_XPATH = SQUAD_TABLE_XPATH + "//tr[@class='TableRow ygnhC']"
+
+# Reads the link and position of every squad table row in the browser, so that
+# the whole squad costs a single WebDriver command.
+READ_SQUAD_SCRIPT = """
+const rows = document.evaluate(arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+function first(xpath, context) {
+    return document.evaluate(xpath, context, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+}
+const players = [];
+for (let i = 0; i < rows.snapshotLength; i++) {
+    const row = rows.snapshotItem(i);
+    const link = first('.//td[1]//a', row);
+    const position = first('.//td[2]', row);
+    players.push({link: link === null ? null : link.href, position: position === null ? null : position.innerText});
+}
+return players;
+"""
 
 class PlayerScraper:
     """
@@ -14,434 +40,540 @@ class PlayerScraper:
 
     Attributes:
         teams_data (dict): A dictionary to store scraped team and player data.
+        batch_extraction (bool): Whether the statistics block is read in a single
+            round trip instead of one WebDriver command per row.
+        navigator (PageNavigator): Tracks the loaded page, competition and season.
+        competition (str): The competition whose statistics are scraped.
+        season (str): The season whose statistics are scraped.
+        parser_pool (PageParserPool | None): If set, player pages are captured and
+            parsed in the pool instead of being read in the browser.
+        checkpoint (CheckpointStore | None): If set, every finished player is recorded
+            there, and players it already holds are reloaded instead of scraped.
+        snapshots (SnapshotStore | None): If set, the latest statistics and fingerprint
+            of every scraped player are kept there across runs.
+        refresh (bool): Whether players whose fingerprint matches their snapshot reuse
+            the stored statistics instead of being extracted again.
+        refresh_counts (dict): Number of players found 'unchanged' and 'changed' in refresh mode.
+        cache (PageCache | None): If set, player pages are looked up there before
+            navigating, and every captured page is stored there.
+        waits (AdaptiveWait): Wait engine for the elements the scraper needs.
+        retries (RetryQueue | None): If set, players that fail are deferred there to be
+            retried at the end of the run instead of raising.
+        breaker (CircuitBreaker | None): If set, player pages are only requested while
+            the site's recent error rate allows.
+        sink (NDJSONSink | None): If set, every finished player is appended to it as
+            soon as it is scraped.
     """
 
-    def __init__(self, driver, popup_handler):
+    def __init__(self, driver, popup_handler, batch_extraction=True, navigator=None, parser_pool=None,
+                 checkpoint=None, snapshots=None, refresh=False, cache=None, waits=None, retries=None,
+                 breaker=None, sink=None):
         """
         Initializes the PlayerScraper with a WebDriver and popup handler.
 
         Parameters:
             driver (webdriver.Chrome): The WebDriver instance for browser automation.
             popup_handler (PopupHandler): An instance to handle popups during scraping.
+            batch_extraction (bool): Read the statistics block with one `execute_script`
+                call rather than one `find_element` call per row.
+            navigator (PageNavigator, optional): Navigator shared with the other users of
+                the driver. A new one is created if not given.
+            parser_pool (PageParserPool, optional): Pool to hand captured player pages to.
+            checkpoint (CheckpointStore, optional): Store recording finished players.
+            snapshots (SnapshotStore, optional): Store of player snapshots kept across runs.
+            refresh (bool): Only extract players whose fingerprint changed since their snapshot.
+            cache (PageCache, optional): Cache of captured player pages.
+            waits (AdaptiveWait, optional): Wait engine shared with the other users of the
+                driver. A new one is created if not given.
+            retries (RetryQueue, optional): Queue failed players are deferred to.
+            breaker (CircuitBreaker, optional): Circuit breaker guarding player page requests.
+            sink (NDJSONSink, optional): Stream finished players are appended to.
         """
 
         self.driver = driver
         self.popup_handler = popup_handler
+        self.batch_extraction = batch_extraction
+        self.navigator = navigator if navigator is not None else PageNavigator(driver, popup_handler)
+        self.competition = "LaLiga"
+        self.season = CURRENT_SEASON
+        self.parser_pool = parser_pool
+        self.checkpoint = checkpoint
+        self.snapshots = snapshots
+        self.refresh = refresh
+        self.refresh_counts = {'unchanged': 0, 'changed': 0}
+        self._fingerprints = {}
+        self.cache = cache
+        self.waits = waits if waits is not None else AdaptiveWait(driver)
+        self.retries = retries
+        self.breaker = breaker
+        self.sink = sink
         self.teams_data = {}
+        self._pending_pages = []
 
+    @metrics.timed('select_competition')
     def select_competition(self):
         """
         Selects 'LaLiga' in the competition dropdown if not already selected.
 
         This function waits for the competition dropdown to become clickable,
-        checks if 'LaLiga' is already selected, and if not, selects it. 
-        Handles exceptions for timeouts and other errors.
+        checks if 'LaLiga' is already selected, and if not, selects it and waits
+        until the statistics of the selected competition are rendered.
+        Nothing is done if the navigator already knows the competition is
+        selected on the current page.
+
+        Returns:
+            bool: True if the competition is selected, False if it is not offered for this player.
 
         Raises:
-            TimeoutException: If the dropdown or LaLiga option takes too long to load.
-            Exception: For any other error that may occur during element selection.
+            PlayerScrapeError: If the competition dropdown never appears.
         """
         
+        if self.navigator.competition == self.competition:
+            return True
+
         try:
-            dropdown_button = WebDriverWait(self.driver, 30).until(
-                EC.element_to_be_clickable((By.XPATH, "//div[@class='Box Flex ggRYVx qjBwj']//div[1]//button[1]"))
+            dropdown_button = self.waits.until(
+                'competition_dropdown',
+                EC.element_to_be_clickable((By.XPATH, COMPETITION_DROPDOWN_XPATH))
             )
-            current_competition = dropdown_button.text
+        except TimeoutException as e:
+            raise PlayerScrapeError("No competition dropdown was found") from e
+        current_competition = dropdown_button.text
 
-            if "LaLiga" in current_competition:
-                return True  # LaLiga is already selected
+        if self.competition in current_competition:
+            self.navigator.competition = self.competition
+            return True  # LaLiga is already selected
 
-            dropdown_button.click()
-            la_liga_option = WebDriverWait(self.driver, 30).until(
-                EC.element_to_be_clickable((By.XPATH, "//bdi[@class='Text jFxLbA'][normalize-space()='LaLiga']"))
+        previous_stats = read_fingerprint(self.driver)
+        dropdown_button.click()
+        try:
+            la_liga_option = self.waits.until(
+                'competition_option',
+                EC.element_to_be_clickable((By.XPATH, MENU_OPTION_XPATH.format(label=self.competition))),
+                fallback=False
             )
-            la_liga_option.click()
-            time.sleep(2)  # Pause to ensure page loads after selecting competition
-            return True
-
         except TimeoutException:
-            print("'LaLiga' option not available in the menu for this player. Skipping to te next player...")
+            print(f"'{self.competition}' option not available in the menu for this player. Skipping to te next player...")
             return False  # Return False if LaLiga is not found or clickable
+        la_liga_option.click()
+        self._wait_for_selection('competition_stats', COMPETITION_DROPDOWN_XPATH, self.competition, previous_stats)
+        self.navigator.competition = self.competition
+        self.navigator.season = None
+        return True
 
-        except Exception as e:
-            print(f"Error selecting competition: {e}")
-            return False
-        
-        
 
-    def scrape_goalkeeper_data(self, player_link, team_name):
+    def select_season(self):
         """
-        Scrapes data for a goalkeeper from the player's profile page.
+        Selects the scraper's season in the season dropdown if not already selected.
 
-        Parameters:
-            player_link (str): URL link to the player's profile page.
+        Returns:
+            bool: True if the season is selected, False if it is not offered for
+                this player and competition.
         """
-
         try:
-            self.driver.get(player_link)
-            self.popup_handler.cerrar_popup()
-        
-            # Ensure 'LaLiga' competition is selected
-            self.select_competition()
+            dropdown_button = self.waits.until(
+                'season_dropdown',
+                EC.element_to_be_clickable((By.XPATH, SEASON_DROPDOWN_XPATH))
+            )
+            if self.season not in dropdown_button.text:
+                previous_stats = read_fingerprint(self.driver)
+                dropdown_button.click()
+                season_option = self.waits.until(
+                    'season_option',
+                    EC.element_to_be_clickable((By.XPATH, MENU_OPTION_XPATH.format(label=self.season))),
+                    fallback=False
+                )
+                season_option.click()
+                self._wait_for_selection('season_stats', SEASON_DROPDOWN_XPATH, self.season, previous_stats)
+            self.navigator.season = self.season
+            return True
+        except TimeoutException:
+            return False
 
-            player_name = self.driver.find_element(By.XPATH, "//h2[@class='Text cuNqBu']").text
-            print(f"Scraping {player_name}")
+    def _wait_for_selection(self, name, dropdown_xpath, label, previous_stats):
+        """
+        Waits until the statistics block shows a newly selected competition or season.
 
-            games = self.driver.find_element(By.XPATH, "//div[@class='Box kNZKNS']//div[4]//div[1]//div[2]//div[1]").text
-            amount_games = clean_stat_value(games, 2)
-            
-            minutes_played = self.driver.find_element(By.XPATH,
-                                                 "//div[@class='Box kNZKNS']//div[4]//div[1]//div[2]//div[4]").text
-            amount_minutes_played = clean_stat_value(minutes_played, 3)
+        The block is considered updated once the dropdown shows the label and the
+        statistics fingerprint differs from the one shown before the switch. A
+        player can have identical numbers in both selections, so running out of
+        time here is not an error.
 
-            goals_conceded_per_game = self.driver.find_element(By.XPATH,
-                                                          "//div[@class='Box kNZKNS']//div[5]//div[1]//div[2]//div[1]").text
-            amount_goals_conceded_per_game = clean_stat_value(goals_conceded_per_game, 4)
+        Parameters:
+            name (str): Name of the readiness condition.
+            dropdown_xpath (str): XPath of the dropdown that was changed.
+            label (str): The competition or season selected.
+            previous_stats (str | None): Fingerprint shown before the switch.
+        """
+        def selection_rendered(driver):
+            dropdown_button = driver.find_element(By.XPATH, dropdown_xpath)
+            if label not in dropdown_button.text:
+                return False
+            fingerprint = read_fingerprint(driver)
+            return fingerprint is not None and fingerprint != previous_stats
 
-            try:
-                penalties_saved = self.driver.find_element(By.XPATH,
-                                                    "//div[@class='Box kNZKNS']//div[5]//div[1]//div[2]//div[2]").text
-                amount_penalties_saved_and_faced = clean_stat_value(penalties_saved, 2)
-                if '/' in amount_penalties_saved_and_faced:
-                    penalty_saved, penalties_faced = map(int, amount_penalties_saved_and_faced.split('/'))
-                else:
-                    # If it's a single number, assume it represents penalties faced with 0 penalties saved
-                    penalties_faced = int(amount_penalties_saved_and_faced)
-                    penalty_saved = 0
-            except Exception as e:
-                print(f"Error retrieving penalties saved data: {e}")
-                penalties_faced = 0
-                penalty_saved = 0
-
-            saves_per_game = self.driver.find_element(By.XPATH,
-                                                 "//div[@class='Box kNZKNS']//div[5]//div[1]//div[2]//div[3]").text
-            amount_saves_per_game = clean_stat_value(saves_per_game, 3)
-            
-
-            saves_per_game_percentage = self.driver.find_element(By.XPATH,
-                                                            "//div[@class='Box kNZKNS']//div[5]//div[1]//div[2]//div[3]").text
-            amount_saves_per_game_percentage = clean_stat_value(saves_per_game_percentage, 4)
-            
-
-            goals_conceded = self.driver.find_element(By.XPATH,
-                                                 "//div[@class='Box kNZKNS']//div[5]//div[1]//div[2]//div[5]").text
-            amount_goals_conceded = clean_stat_value(goals_conceded, 2)
-
-            total_saves = self.driver.find_element(By.XPATH,
-                                              "//div[@class='Box kNZKNS']//div[5]//div[1]//div[2]//div[8]").text
-            amount_total_saves = clean_stat_value(total_saves, 2)
-
-            goals_prevented = self.driver.find_element(By.XPATH,
-                                                  "//div[@class='Box kNZKNS']//div[5]//div[1]//div[2]//div[9]").text
-            amount_goals_prevented = clean_stat_value(goals_prevented, 2)
-
-            passes_completed = self.driver.find_element(By.XPATH,
-                                                   "//div[@class='Box kNZKNS']//div[7]//div[1]//div[2]//div[6]").text
-            amount_passes_completed = clean_stat_value(passes_completed, 3)
-
-            passes_completed_percentage = self.driver.find_element(By.XPATH,
-                                                              "//div[@class='Box kNZKNS']//div[7]//div[1]//div[2]//div[6]").text
-            amount_passes_completed_percentage = clean_stat_value(passes_completed_percentage, 4)
-
-            clean_sheets = self.driver.find_element(By.XPATH,
-                                               "//div[@class='Box kNZKNS']//div[8]//div[1]//div[2]//div[1]").text
-            amount_clean_sheets = clean_stat_value(clean_sheets, 2)
-
-            error_leading_to_shot = self.driver.find_element(By.XPATH,
-                                                        "//div[@class='Box kNZKNS']//div[8]//div[1]//div[2]//div[8]").text
-            amount_error_leading_to_shot = clean_stat_value(error_leading_to_shot, 4)
-
-            error_leading_to_goal = self.driver.find_element(By.XPATH,
-                                                        "//div[@class='Box kNZKNS']//div[8]//div[1]//div[2]//div[9]").text
-            amount_error_leading_to_goal = clean_stat_value(error_leading_to_goal, 4)
-
-            if team_name not in self.teams_data:
-                self.teams_data[team_name] = {}
-            self.teams_data[team_name][player_name] = {
-            'Games Played': amount_games,
-            'Minutes Played': amount_minutes_played,
-            'Goals Conceded Per Game': amount_goals_conceded_per_game,
-            'Penalties Saved': penalty_saved,
-            'Penalties Faced': penalties_faced,
-            'Saves Per Game': amount_saves_per_game,
-            'Saves Per Game Percentage': amount_saves_per_game_percentage,
-            'Goals Conceded': amount_goals_conceded,
-            'Total Saves': amount_total_saves,
-            'Goals Prevented': amount_goals_prevented,
-            'Passes Completed': amount_passes_completed,
-            'Percentage of Passes Completed': amount_passes_completed_percentage,
-            'Clean Sheets': amount_clean_sheets,
-            'Errors leading to shot': amount_error_leading_to_shot,
-            'Errors leading to goal': amount_error_leading_to_goal
-            }
-            
+        try:
+            self.waits.until(name, selection_rendered, default=10, fallback=False)
         except TimeoutException:
-            print("Error: Element took too long to load.")
-        except Exception as e:
-            print(f"Error extracting {player_name}'s data: {e}")
-        
+            pass
 
-    def scrape_field_player_data(self, player_link, team_name):
+    def _open_player_page(self, player_link):
         """
-        Scrapes data for a general player from the player's profile page.
+        Shows a player's page, loading it and closing popups only if it is not already showing.
 
         Parameters:
             player_link (str): URL link to the player's profile page.
         """
-
-        try:
-            self.driver.get(player_link)
+        if self.navigator.navigate(player_link):
             self.popup_handler.cerrar_popup()
 
-            # Ensure 'LaLiga' competition is selected
-            self.select_competition()
+    def _current_season(self):
+        """
+        Returns the season shown on the current player page.
 
-            player_name = self.driver.find_element(By.XPATH, "//h2[@class='Text cuNqBu']").text
-            print(f"Scraping {player_name}")
+        The season selector is only read once per page and competition.
 
-            games = self.driver.find_element(By.XPATH, "//div[@class='Box kNZKNS']//div[4]//div[1]//div[2]//div[1]").text
-            amount_games = clean_stat_value(games, 2)
+        Raises:
+            TimeoutException: If no season selector appears.
+        """
+        if self.navigator.season is None:
+            with metrics.timed('season_wait'):
+                season_element = self.waits.until(
+                    'season_label',
+                    EC.presence_of_element_located((By.CLASS_NAME, "Text.jFxLbA"))
+                )
+            self.navigator.season = season_element.text
+        return self.navigator.season
+
+    def _stat_reader(self):
+        """
+        Returns a reader over the statistics block of the current player page.
+        """
+        if self.batch_extraction:
+            return BatchStatReader(self.driver)
+        return LiveStatReader(self.driver)
 
-            minutes_played = self.driver.find_element(By.XPATH, "//div[@class='Box kNZKNS']//div[4]//div[1]//div[2]//div[4]").text
-            amount_minutes_played = clean_stat_value(minutes_played, 3)
+    def scrape_goalkeeper_data(self, player_link, team_name):
+        """
+        Scrapes data for a goalkeeper from the player's profile page.
 
-            goals = self.driver.find_element(By.XPATH, "//div[@class='Box kNZKNS']//div[5]//div[1]//div[2]//div[1]").text
-            amount_goals = clean_stat_value(goals, 1)
+        Parameters:
+            player_link (str): URL link to the player's profile page.
 
-            amount_xg = 0
-            amount_shots_per_game = 0
-            amount_shots_target_per_game = 0
-            amount_big_chances_missed = 0    
+        Raises:
+            WebDriverException: If the statistics cannot be read from the page.
+        """
+        self._open_player_page(player_link)
 
-            try:
-                xg_element = self.driver.find_element(By.XPATH, "//div[@class='Box kNZKNS']//div[5]//div[1]//div[2]//div[2]").text
-                if "Expected Goals (xG)" in xg_element:
-                    amount_xg = clean_stat_value(xg_element, 3)
-                    
+        # Ensure 'LaLiga' competition is selected
+        self.select_competition()
 
-                    shots_per_game = self.driver.find_element(By.XPATH, "//div[@class='Box kNZKNS']//div[5]//div[1]//div[2]//div[5]").text
-                    amount_shots_per_game = clean_stat_value(shots_per_game, 3)
+        with metrics.timed('extract'):
+            player_name, stats = parse_goalkeeper(self._stat_reader())
 
-                    shots_target_per_game = self.driver.find_element(By.XPATH, "//div[@class='Box kNZKNS']//div[5]//div[1]//div[2]//div[6]").text
-                    amount_shots_target_per_game = clean_stat_value(shots_target_per_game, 5)
+        self.teams_data.setdefault(team_name, {})[player_name] = stats
+        self.record_player(team_name, player_link, player_name, stats)
 
-                    big_chances_missed  = self.driver.find_element(By.XPATH,
-                                                    "//div[@class='Box kNZKNS']//div[5]//div[1]//div[2]//div[7]").text
-                    amount_big_chances_missed = clean_stat_value(big_chances_missed, 3)
+    def scrape_field_player_data(self, player_link, team_name):
+        """
+        Scrapes data for a general player from the player's profile page.
 
-            except Exception as e:
-                print(f"Error retrieving {player_name}'s xG related data: {e}")
-            
-            
-            assists = self.driver.find_element(By.XPATH, "//div[@class='Box kNZKNS']//div[6]//div[1]//div[2]//div[1]").text
-            amount_assists = clean_stat_value(assists, 1)
+        Parameters:
+            player_link (str): URL link to the player's profile page.
 
-            xa = self.driver.find_element(By.XPATH, "//div[@class='Box kNZKNS']//div[6]//div[1]//div[2]//div[2]").text
-            amount_xa = clean_stat_value(xa, 3)
+        Raises:
+            WebDriverException: If the statistics cannot be read from the page.
+        """
+        self._open_player_page(player_link)
 
-            big_chances_created = self.driver.find_element(By.XPATH, "//div[@class='Box kNZKNS']//div[6]//div[1]//div[2]//div[4]").text
-            amount_big_chances_created = clean_stat_value(big_chances_created, 3)
+        # Ensure 'LaLiga' competition is selected
+        self.select_competition()
 
-            key_passes_per_game = self.driver.find_element(By.XPATH, "//div[@class='Box kNZKNS']//div[6]//div[1]//div[2]//div[5]").text
-            amount_key_passes_per_game = clean_stat_value(key_passes_per_game, 2)
+        with metrics.timed('extract'):
+            player_name, stats = parse_field_player(self._stat_reader())
 
-            passes_completed_per_game = self.driver.find_element(By.XPATH, "//div[@class='Box kNZKNS']//div[6]//div[1]//div[2]//div[6]").text
-            amount_passes_completed_per_game = clean_stat_value(passes_completed_per_game, 3)
+        self.teams_data.setdefault(team_name, {})[player_name] = stats
+        self.record_player(team_name, player_link, player_name, stats)
 
-            passes_completed_per_game_percentage = self.driver.find_element(By.XPATH, "//div[@class='Box kNZKNS']//div[6]//div[1]//div[2]//div[6]").text
-            amount_passes_completed_per_game_percentage = clean_stat_value(passes_completed_per_game_percentage, 4)
 
-            succesful_dribles = self.driver.find_element(By.XPATH, "//div[@class='Box kNZKNS']//div[8]//div[1]//div[2]//div[1]").text
-            amount_succesful_dribles = clean_stat_value(succesful_dribles, 2)
+    def scrape_players_data(self, team_name, players=None):
+        """
+        Scrapes player data from a table on the webpage.
 
-            total_duels_won_per_game = self.driver.find_element(By.XPATH,
-                                                        "//div[@class='Box kNZKNS']//div[8]//div[1]//div[2]//div[2]").text
-            amount_total_duels_won_per_game = clean_stat_value(total_duels_won_per_game, 3)
+        This method waits for the player data table to be present, retrieves each row 
+        in the table, and extracts information about each player. The extracted data is 
+        stored in a list, which can later be processed or saved.
 
-            total_duels_won_percentage = self.driver.find_element(By.XPATH,
-                                                            "//div[@class='Box kNZKNS']//div[8]//div[1]//div[2]//div[2]").text
-            amount_total_duels_won_percentage = clean_stat_value(total_duels_won_percentage, 4)
+        Players already recorded in the checkpoint store are reloaded from it
+        without visiting their pages. Players that fail are deferred to the retry
+        queue, if any, and the rest of the squad carries on.
 
-            ground_duels_won_per_game = self.driver.find_element(By.XPATH,
-                                                            "//div[@class='Box kNZKNS']//div[8]//div[1]//div[2]//div[3]").text
-            amount_ground_duels_won_per_game = clean_stat_value(ground_duels_won_per_game, 3)
+        Parameters:
+            team_name (str): The team the players belong to.
+            players (list[dict], optional): The squad, e.g. from the roster cache; read from
+                the team page currently loaded if not given.
 
-            ground_duels_won_per_game_percentage = self.driver.find_element(By.XPATH,
-                                                                    "//div[@class='Box kNZKNS']//div[8]//div[1]//div[2]//div[3]").text
-            amount_ground_duels_won_per_game_percentage = clean_stat_value(ground_duels_won_per_game_percentage, 4)
+        Returns:
+            bool: True if the squad table was read and every player was processed.
+        """
+        
+        if team_name not in self.teams_data:
+            self.teams_data[team_name] = {}  # Creates a new dictionary for this team
 
-            aerial_duels_won_per_game = self.driver.find_element(By.XPATH,
-                                                                "//div[@class='Box kNZKNS']//div[8]//div[1]//div[2]//div[4]").text
-            amount_aerial_duels_won_per_game = clean_stat_value(aerial_duels_won_per_game, 3)
+        loads_before = self.navigator.total_page_loads()
+        if players is None:
+            try:
+                players = self.read_squad()
+            except TimeoutException:
+                print(f"Error: The squad table of {team_name} took too long to load.")
+                return False
+
+        completed = (self.checkpoint.completed_players(team_name, self.competition, self.season)
+                     if self.checkpoint is not None else {})
+        all_scraped = True
+        for player in players:
+            if player['link'] in completed:
+                player_name, stats = completed[player['link']]
+                self.teams_data[team_name][player_name] = stats
+                continue
+            with metrics.scope(player=player['link']), metrics.timed('player'):
+                all_scraped = self.try_player(player, team_name) and all_scraped
+        self.collect_parsed_pages()
+
+        print(f"Loaded {self.navigator.total_page_loads() - loads_before} pages for {len(players)} players of {team_name}")
+        return all_scraped
+
+    @metrics.timed('squad_table')
+    def read_squad(self):
+        """
+        Reads the players listed in the squad table of the current team page.
 
-            aerial_duels_won_per_game_percentage = self.driver.find_element(By.XPATH,
-                                                                        "//div[@class='Box kNZKNS']//div[8]//div[1]//div[2]//div[4]").text
-            amount_aerial_duels_won_per_game_percentage = clean_stat_value(aerial_duels_won_per_game_percentage, 4)
+        Every row is read with a single script evaluation. Rows without a player
+        link or position are skipped.
 
-            possession_lost_per_game = self.driver.find_element(By.XPATH,
-                                                            "//div[@class='Box kNZKNS']//div[8]//div[1]//div[2]//div[5]").text
-            amount_possession_lost_per_game = clean_stat_value(possession_lost_per_game, 2)
+        Returns:
+            list[dict]: The 'link' and 'position' of every player in the table.
 
-            fouls_received_per_game = self.driver.find_element(By.XPATH,
-                                                            "//div[@class='Box kNZKNS']//div[8]//div[1]//div[2]//div[7]").text
-            amount_fouls_received_per_game = clean_stat_value(fouls_received_per_game, 2)
+        Raises:
+            TimeoutException: If the table takes too long to load.
+        """
+        self.waits.until(
+            'squad_table',
+            EC.presence_of_element_located((By.XPATH, SQUAD_TABLE_XPATH))
+        )
+        players = []
+        for row in self.driver.execute_script(READ_SQUAD_SCRIPT, SQUAD_ROW_XPATH):
+            if row['link'] is None or row['position'] is None:
+                print(f"Error extracting row data: {row}")
+                continue
+            players.append({'link': row['link'], 'position': row['position']})
+        return players
+
+    def try_player(self, player, team_name):
+        """
+        Scrapes a single player, deferring it to the retry queue if the page misbehaves.
 
-            offside_per_game = self.driver.find_element(By.XPATH,
-                                                    "//div[@class='Box kNZKNS']//div[8]//div[1]//div[2]//div[8]").text
-            amount_offside_per_game = clean_stat_value(offside_per_game, 1)
+        Requests wait for the circuit breaker first, and report their outcome to it.
+        Errors that are not worth retrying, e.g. a statistics layout the parser does
+        not expect, point at a bug rather than the site. They are given up on
+        straight away, so that the rest of the squad carries on, and the retry
+        queue reports them apart from the transient failures.
 
-            succesful_passes_opp_half = self.driver.find_element(By.XPATH,
-                                                    "//div[@class='Box kNZKNS']//div[6]//div[1]//div[2]//div[8]").text
-            amount_succesful_passes_opp_half = clean_stat_value(succesful_passes_opp_half, 3)
+        Parameters:
+            player (dict): The player's 'link' and 'position' from the squad table.
+            team_name (str): The team the player belongs to.
 
-            succesful_passes_opp_half_percentage = self.driver.find_element(By.XPATH,
-                                                    "//div[@class='Box kNZKNS']//div[6]//div[1]//div[2]//div[8]").text
-            amount_succesful_passes_opp_half_percentage = clean_stat_value(succesful_passes_opp_half_percentage, 4)
+        Returns:
+            bool: True if the player was processed, False if it was deferred or given up on.
 
-            succesful_long_balls = self.driver.find_element(By.XPATH,
-                                                    "//div[@class='Box kNZKNS']//div[6]//div[1]//div[2]//div[9]").text
-            amount_succesful_long_balls = clean_stat_value(succesful_long_balls, 3)
+        Raises:
+            Exception: Whatever the player failed with, if there is no retry queue.
+        """
+        if self.breaker is not None:
+            self.breaker.before(player['link'])
+        try:
+            self.scrape_player(player, team_name)
+        except RETRYABLE_ERRORS as e:
+            # Whatever the page shows now cannot be trusted by the next player
+            self.navigator.invalidate()
+            if self.breaker is not None:
+                self.breaker.record(player['link'], False)
+            if self.retries is None:
+                raise
+            entry = {'player': player, 'team_name': team_name, 'competition': self.competition, 'season': self.season}
+            if self.retries.defer(entry, e):
+                print(f"Error scraping {player['link']}, retrying it at the end of the run: {type(e).__name__}")
+            else:
+                print(f"Error scraping {player['link']}, giving up on it: {type(e).__name__}")
+            return False
+        except Exception as e:
+            # Not the site's fault, so the breaker is left alone
+            self.navigator.invalidate()
+            if self.retries is None:
+                raise
+            entry = {'player': player, 'team_name': team_name, 'competition': self.competition, 'season': self.season}
+            self.retries.give_up(entry, e)
+            print(f"Unexpected error scraping {player['link']}, giving up on it: {describe_error(e)}")
+            return False
+        if self.breaker is not None:
+            self.breaker.record(player['link'], True)
+        if self.retries is not None:
+            self.retries.succeeded({'player': player, 'competition': self.competition, 'season': self.season})
+        return True
 
-            succesful_long_balls_percentage = self.driver.find_element(By.XPATH,
-                                                    "//div[@class='Box kNZKNS']//div[6]//div[1]//div[2]//div[9]").text
-            amount_succesful_long_balls_percentage = clean_stat_value(succesful_long_balls_percentage, 4)
+    def scrape_player(self, player, team_name):
+        """
+        Scrapes a single player listed in a team's squad table.
 
+        The player's page is loaded and the competition selected at most once; the
+        goalkeeper and field player scrapers then reuse that page state. A
+        competition or season the player does not play in is skipped; a page that
+        does not load as expected raises.
 
-            first_element = self.driver.find_element(By.XPATH, "//div[@class='Box kNZKNS']//div[7]//div[1]//div[2]//div[1]").text
-            first_element_verification = clean_stat_value(first_element, 0)
+        Parameters:
+            player (dict): The player's 'link' and 'position' from the squad table.
+            team_name (str): The team the player belongs to.
 
+        Raises:
+            PlayerScrapeError: If the season selector or statistics block never appears.
+            WebDriverException: If the browser fails while the page is scraped.
+        """
+        # Statistics of a finished season no longer change, so they are cached for longer
+        cache_kind = 'player' if self.season == CURRENT_SEASON else 'archive'
+        if self.cache is not None and self._use_cached_page(player, team_name, cache_kind):
+            return
 
-            if 'Clean' in first_element_verification:
-                interceptions_per_game = self.driver.find_element(By.XPATH, "//div[@class='Box kNZKNS']//div[7]//div[1]//div[2]//div[2]").text
-                tackles_per_game = self.driver.find_element(By.XPATH, "//div[@class='Box kNZKNS']//div[7]//div[1]//div[2]//div[3]").text
-                possession_won_opp_half_per_game = self.driver.find_element(By.XPATH, "//div[@class='Box kNZKNS']//div[7]//div[1]//div[2]//div[4]").text
-                balls_recovered_per_game = self.driver.find_element(By.XPATH, "//div[@class='Box kNZKNS']//div[7]//div[1]//div[2]//div[5]").text
-                dribbled_past_per_game = self.driver.find_element(By.XPATH, "//div[@class='Box kNZKNS']//div[7]//div[1]//div[2]//div[6]").text
-                clearances_per_game = self.driver.find_element(By.XPATH, "//div[@class='Box kNZKNS']//div[7]//div[1]//div[2]//div[7]").text
-            else:
-                interceptions_per_game = self.driver.find_element(By.XPATH, "//div[@class='Box kNZKNS']//div[7]//div[1]//div[2]//div[1]").text
-                tackles_per_game = self.driver.find_element(By.XPATH, "//div[@class='Box kNZKNS']//div[7]//div[1]//div[2]//div[2]").text
-                possession_won_opp_half_per_game = self.driver.find_element(By.XPATH, "//div[@class='Box kNZKNS']//div[7]//div[1]//div[2]//div[3]").text
-                balls_recovered_per_game = self.driver.find_element(By.XPATH, "//div[@class='Box kNZKNS']//div[7]//div[1]//div[2]//div[4]").text
-                dribbled_past_per_game = self.driver.find_element(By.XPATH, "//div[@class='Box kNZKNS']//div[7]//div[1]//div[2]//div[5]").text
-                clearances_per_game = self.driver.find_element(By.XPATH, "//div[@class='Box kNZKNS']//div[7]//div[1]//div[2]//div[6]").text
+        self._open_player_page(player['link'])
+        if not self.select_competition():
+            print(f"'{self.competition}' not available for this player. Skipping to the next player.")
+            return  # Skip this player if LaLiga is not available
 
-            amount_intercepctions_per_game = clean_stat_value(interceptions_per_game, 3)
-            amount_tackles_per_game = clean_stat_value(tackles_per_game, 3)
-            amount_possession_won_opp_half_per_game = clean_stat_value(possession_won_opp_half_per_game, 2)
-            amount_balls_recovered_per_game = clean_stat_value(balls_recovered_per_game, 4)                
-            amount_dribbled_past_per_game = clean_stat_value(dribbled_past_per_game, 4)
-            amount_clearances_per_game = clean_stat_value(clearances_per_game, 3)
+        try:
+            current_season = self._current_season()
+        except TimeoutException as e:
+            raise PlayerScrapeError("No season selector was found") from e
+        if self.season != current_season and not self.select_season():
+            print(f"Season '{self.season}' not available for this player. Skipping to the next player...")
+            return
 
+        try:
+            self.waits.until('stats_block', EC.presence_of_element_located((By.XPATH, STATS_BLOCK_XPATH)))
+        except TimeoutException as e:
+            raise PlayerScrapeError("No statistics were found") from e
+
+        if self.snapshots is not None and self._reuse_snapshot(player, team_name):
+            return
+
+        page_source = None
+        if self.cache is not None or self.parser_pool is not None:
+            page_source = self.driver.page_source
+        if self.cache is not None:
+            self.cache.put(cache_kind, player['link'], page_source, self.competition, self.season)
+
+        if self.parser_pool is not None:
+            # Hand the page to the parser processes and move the browser on straight away
+            future = self.parser_pool.submit(team_name, player['link'], player['position'], page_source,
+                                             self.competition, self.season)
+            self._pending_pages.append((team_name, player['link'], future))
+            return
+
+        # Proceed to scrape player data if LaLiga is selected
+        if player['position'].lower() == "goalkeeper":
+            self.scrape_goalkeeper_data(player['link'], team_name)
+        else:
+            self.scrape_field_player_data(player['link'], team_name)
+        print(f"Page loads for this player: {self.navigator.page_loads(player['link'])}")
+
+    def _use_cached_page(self, player, team_name, cache_kind):
+        """
+        Parses the player's page from the cache instead of navigating to it.
 
-            fouls_per_game = self.driver.find_element(By.XPATH,
-                                                    "//div[@class='Box kNZKNS']//div[8]//div[1]//div[2]//div[6]").text
-            amount_fouls_per_game = clean_stat_value(fouls_per_game, 1)
+        Parameters:
+            player (dict): The player's 'link' and 'position' from the squad table.
+            team_name (str): The team the player belongs to.
+            cache_kind (str): Kind of cache entry, selecting its TTL.
 
+        Returns:
+            bool: True if a fresh cached page was found and parsed.
+        """
+        page_source = self.cache.get(cache_kind, player['link'], self.competition, self.season)
+        if page_source is None:
+            return False
+        try:
+            player_name, stats = parse_player_page(page_source, player['position'])
+        except Exception as e:
+            print(f"Error parsing cached page, scraping it again: {e}")
+            return False
 
+        self.teams_data.setdefault(team_name, {})[player_name] = stats
+        self.record_player(team_name, player['link'], player_name, stats)
+        return True
 
-        
-            if team_name not in self.teams_data:
-                self.teams_data['Team'] = {}
-            self.teams_data[team_name][player_name] = {
-                'Games Played': amount_games,
-                'Minutes Played': amount_minutes_played,
-                'Goals': amount_goals,
-                'Expected Goals (xG)': amount_xg,
-                'Big Chances Missed': amount_big_chances_missed,
-                'Shots Per Game': amount_shots_per_game,
-                'Shots on Target Per Game': amount_shots_target_per_game,
-                'Assists': amount_assists,
-                'Expected Assists (xA)': amount_xa,
-                'Big Chances Created': amount_big_chances_created,
-                'Key Passes Per Game': amount_key_passes_per_game,
-                'Passes Completed Per Game': amount_passes_completed_per_game,
-                'Pass Completion Percentage': amount_passes_completed_per_game_percentage,
-                'Succesful Passes Opp. Half': amount_succesful_passes_opp_half,
-                'Succesful Passes Opp. Half Percentage':amount_succesful_passes_opp_half_percentage,
-                'Succesful Long Balls':amount_succesful_long_balls,
-                'Succesful Long Balls Percentage':amount_succesful_long_balls_percentage,
-                'Successful Dribbles Per Game': amount_succesful_dribles,
-                'Total Duels Won Per Game': amount_total_duels_won_per_game,
-                'Total Duels Won Percentage': amount_total_duels_won_percentage,
-                'Ground Duels Won Per Game': amount_ground_duels_won_per_game,
-                'Ground Duels Won Percentage': amount_ground_duels_won_per_game_percentage,
-                'Aerial Duels Won Per Game': amount_aerial_duels_won_per_game,
-                'Aerial Duels Won Percentage': amount_aerial_duels_won_per_game_percentage,
-                'Interceptions Per Game':amount_intercepctions_per_game,
-                'Tackles Per Game':amount_tackles_per_game,
-                'Possession Won Opp. Half':amount_possession_won_opp_half_per_game,
-                'Balls Recovered Per Game':amount_balls_recovered_per_game,
-                'Dribbled Past Per Game':amount_dribbled_past_per_game,
-                'Clearances Per Game':amount_clearances_per_game,
-                'Possession Lost Per Game': amount_possession_lost_per_game,
-                'Fouls Committed Per Game':amount_fouls_per_game,
-                'Fouls Received Per Game': amount_fouls_received_per_game,
-                'Offsides Per Game': amount_offside_per_game
-                }   
+    def _reuse_snapshot(self, player, team_name):
+        """
+        Reads the player's fingerprint and reuses the stored snapshot if it still matches.
 
-        except TimeoutException:
-            print("Error: Element took too long to load.")
-        except Exception as e:
-            print(f"Error extracting {player_name}'s data: {e}")
+        The fingerprint is the games played and minutes shown for the selected
+        competition and season, so it changes whenever the player has played since
+        the snapshot. It is read in one small script call, while extracting the
+        player costs the whole statistics block and its parsing.
 
+        Parameters:
+            player (dict): The player's 'link' and 'position' from the squad table.
+            team_name (str): The team the player belongs to.
 
-    def scrape_players_data(self, team_name):
+        Returns:
+            bool: True if the snapshot was reused and the player needs no extraction.
         """
-        Scrapes player data from a table on the webpage.
+        fingerprint = read_fingerprint(self.driver)
+        if fingerprint is None:
+            return False
+        self._fingerprints[player['link']] = fingerprint
 
-        This method waits for the player data table to be present, retrieves each row 
-        in the table, and extracts information about each player. The extracted data is 
-        stored in a list, which can later be processed or saved.
+        if not self.refresh:
+            return False
+        snapshot = self.snapshots.get(player['link'], self.competition, self.season)
+        if snapshot is None or snapshot[0] != fingerprint:
+            self.refresh_counts['changed'] += 1
+            return False
 
-        Raises:
-            TimeoutException: If the table or its rows take too long to load.
-            Exception: For any other error that may occur while scraping player data.
+        _, player_name, stats = snapshot
+        print(f"{player_name} unchanged since the last run. Reusing stored statistics...")
+        self.refresh_counts['unchanged'] += 1
+        self.teams_data.setdefault(team_name, {})[player_name] = stats
+        self.record_player(team_name, player['link'], player_name, stats)
+        return True
+
+    def collect_parsed_pages(self):
         """
-        
-        if team_name not in self.teams_data:
-            self.teams_data[team_name] = {}  # Creates a new dictionary for this team
+        Waits for the captured player pages to be parsed and stores their data.
+        """
+        for team_name, player_link, future in self._pending_pages:
+            try:
+                player_name, stats = future.result()
+            except Exception as e:
+                print(f"Error parsing player page: {e}")
+                continue
+            self.teams_data.setdefault(team_name, {})[player_name] = stats
+            self.record_player(team_name, player_link, player_name, stats)
+        self._pending_pages = []
 
-        try:
-            table_xpath = "//table[contains(@class, 'fEUhaC')]"
-            WebDriverWait(self.driver, 30).until(
-                EC.presence_of_element_located((By.XPATH, table_xpath))
-            )
-            rows = self.driver.find_elements(By.XPATH, "//table[contains(@class, 'fEUhaC')]//tr[@class='TableRow ygnhC']")
-            players = []
-            for row in rows:
-                try:
-                    player_link = row.find_element(By.XPATH, ".//td[1]//a").get_attribute("href")
-                    position = row.find_element(By.XPATH, ".//td[2]").text
-                    players.append({'link': player_link, 'position': position})
-                except Exception as e:
-                    print(f"Error extracting row data: {e}")
-
-            for player in players:
-                self.driver.get(player['link'])
-                if not self.select_competition():
-                    print("'LaLiga' not available for this player. Skipping to the next player.")
-                    continue  # Skip this player if LaLiga is not available
-
-                try:
-                    season_element = WebDriverWait(self.driver, 30).until(
-                        EC.presence_of_element_located((By.CLASS_NAME, "Text.jFxLbA"))
-                    )                    
-                    current_season = season_element.text
-                    if '24/25' != current_season:
-                        print("Season '24/25' not available for this player. Skipping to the next player...")
-                        continue  
-                except TimeoutException:
-                    print("No season selector was found. Skipping to the next player.")
-                    continue
-
-                # Proceed to scrape player data if LaLiga is selected
-                try:
-                    if player['position'].lower() == "goalkeeper":
-                        self.scrape_goalkeeper_data(player['link'], team_name)
-                    else:
-                        self.scrape_field_player_data(player['link'], team_name)
-                except Exception as e:
-                    print(f"Error scraping player data: {e}")
-        except Exception as e:
-            print(f"Error: {e}")
+    def record_player(self, team_name, player_link, player_name, stats):
+        """
+        Persists a finished player outside of teams_data.
+
+        Parameters:
+            team_name (str): The player's team.
+            player_link (str): URL link to the player's profile page.
+            player_name (str): The player's name.
+            stats (dict): The player's statistics.
+        """
+        # Streamed first, so a crash in between duplicates the player rather than losing it
+        if self.sink is not None:
+            self.sink.write(team_name, player_name, stats, self.competition, self.season, player_link)
+        if self.checkpoint is not None:
+            self.checkpoint.record_player(team_name, player_link, player_name, stats, self.competition, self.season)
+        fingerprint = self._fingerprints.pop(player_link, None)
+        if self.snapshots is not None and fingerprint is not None:
+            self.snapshots.record(player_link, self.competition, self.season, team_name, player_name, fingerprint,
+                                  stats)
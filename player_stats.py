@@ -0,0 +1,322 @@
+from lxml import html as lxml_html
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import NoSuchElementException
+from data_manager import clean_stat_value
+
+PLAYER_NAME_XPATH = "//h2[@class='Text cuNqBu']"
+STATS_BLOCK_XPATH = "//div[@class='Box kNZKNS']"
+STAT_XPATH = STATS_BLOCK_XPATH + "//div[{section}]//div[1]//div[2]//div[{row}]"
+
+# Every (section, row) cell of the statistics block read by the player parsers
+STAT_SECTIONS = range(4, 9)
+STAT_ROWS = range(1, 10)
+STAT_CELLS = [(section, row) for section in STAT_SECTIONS for row in STAT_ROWS]
+
+# Games played and minutes per game, the first rows to change once a player plays again
+FINGERPRINT_CELLS = [(4, 1), (4, 4)]
+
+# Evaluates every requested XPath inside the browser and returns the rendered text
+# of each match, so that a whole statistics block costs a single WebDriver command.
+READ_STATS_SCRIPT = """
+const nameXpath = arguments[0];
+const cells = arguments[1];
+const template = arguments[2];
+function textOf(xpath) {
+    const node = document.evaluate(xpath, document, null,
+        XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    if (node === null) {
+        return null;
+    }
+    return node.innerText !== undefined ? node.innerText : node.textContent;
+}
+const result = {name: textOf(nameXpath), cells: {}};
+for (const [section, row] of cells) {
+    const xpath = template.replace('{section}', section).replace('{row}', row);
+    result.cells[section + ',' + row] = textOf(xpath);
+}
+return result;
+"""
+
+
+class LiveStatReader:
+    """
+    Reads statistics from the player page one WebDriver command at a time.
+
+    Attributes:
+        driver (webdriver.Chrome): The WebDriver instance showing the player page.
+    """
+
+    def __init__(self, driver):
+        """
+        Initializes the reader with a WebDriver.
+
+        Parameters:
+            driver (webdriver.Chrome): The WebDriver instance showing the player page.
+        """
+        self.driver = driver
+
+    def player_name(self):
+        """
+        Returns the name shown in the player page header.
+        """
+        return self.driver.find_element(By.XPATH, PLAYER_NAME_XPATH).text
+
+    def text(self, section, row):
+        """
+        Returns the text of a statistics row.
+
+        Parameters:
+            section (int): Position of the statistics section in the block.
+            row (int): Position of the row inside the section.
+
+        Raises:
+            NoSuchElementException: If the row is not on the page.
+        """
+        return self.driver.find_element(By.XPATH, STAT_XPATH.format(section=section, row=row)).text
+
+
+class BatchStatReader:
+    """
+    Reads the whole statistics block of a player page in one round trip.
+
+    The header and every row of the block are fetched with a single
+    `execute_script` call when the reader is created; lookups afterwards are
+    plain dictionary accesses.
+
+    Attributes:
+        name (str | None): The name shown in the player page header.
+        cells (dict): Row text keyed by "section,row", None for missing rows.
+    """
+
+    def __init__(self, driver, cells=STAT_CELLS):
+        """
+        Captures the statistics block from the page currently loaded in the driver.
+
+        Parameters:
+            driver (webdriver.Chrome): The WebDriver instance showing the player page.
+            cells (list[tuple[int, int]]): The (section, row) cells to capture.
+        """
+        result = driver.execute_script(READ_STATS_SCRIPT, PLAYER_NAME_XPATH, [list(cell) for cell in cells], STAT_XPATH)
+        self.name = result['name']
+        self.cells = result['cells']
+
+    def player_name(self):
+        """
+        Returns the name shown in the player page header.
+
+        Raises:
+            NoSuchElementException: If the page has no player header.
+        """
+        if self.name is None:
+            raise NoSuchElementException(f"Unable to locate element: {PLAYER_NAME_XPATH}")
+        return self.name
+
+    def text(self, section, row):
+        """
+        Returns the text of a statistics row.
+
+        Parameters:
+            section (int): Position of the statistics section in the block.
+            row (int): Position of the row inside the section.
+
+        Raises:
+            NoSuchElementException: If the row is not on the page.
+        """
+        value = self.cells.get(f"{section},{row}")
+        if value is None:
+            raise NoSuchElementException(f"Unable to locate element: {STAT_XPATH.format(section=section, row=row)}")
+        return value
+
+
+class HtmlStatReader:
+    """
+    Reads statistics from a captured player page without a browser.
+
+    Uses the same XPaths as the live readers, evaluated with lxml over the HTML
+    returned by `driver.page_source`.
+
+    Attributes:
+        tree (lxml.html.HtmlElement): The parsed page.
+    """
+
+    def __init__(self, page_source):
+        """
+        Parses a captured player page.
+
+        Parameters:
+            page_source (str): HTML of the player page.
+        """
+        self.tree = lxml_html.fromstring(page_source)
+
+    def _text(self, xpath):
+        nodes = self.tree.xpath(xpath)
+        if not nodes:
+            raise NoSuchElementException(f"Unable to locate element: {xpath}")
+        # Join text nodes with spaces so that words split across elements stay apart,
+        # as they do in the rendered text the live readers return
+        return " ".join(part.strip() for part in nodes[0].itertext() if part.strip())
+
+    def player_name(self):
+        """
+        Returns the name shown in the player page header.
+
+        Raises:
+            NoSuchElementException: If the page has no player header.
+        """
+        return self._text(PLAYER_NAME_XPATH)
+
+    def text(self, section, row):
+        """
+        Returns the text of a statistics row.
+
+        Parameters:
+            section (int): Position of the statistics section in the block.
+            row (int): Position of the row inside the section.
+
+        Raises:
+            NoSuchElementException: If the row is not on the page.
+        """
+        return self._text(STAT_XPATH.format(section=section, row=row))
+
+
+def parse_goalkeeper(reader):
+    """
+    Extracts a goalkeeper's statistics from a stat reader.
+
+    Parameters:
+        reader (LiveStatReader | BatchStatReader | HtmlStatReader): Reader over the player's page.
+
+    Returns:
+        tuple[str, dict]: The player's name and statistics.
+    """
+    player_name = reader.player_name()
+    print(f"Scraping {player_name}")
+
+    try:
+        amount_penalties_saved_and_faced = clean_stat_value(reader.text(5, 2), 2)
+        if '/' in amount_penalties_saved_and_faced:
+            penalty_saved, penalties_faced = map(int, amount_penalties_saved_and_faced.split('/'))
+        else:
+            # If it's a single number, assume it represents penalties faced with 0 penalties saved
+            penalties_faced = int(amount_penalties_saved_and_faced)
+            penalty_saved = 0
+    except Exception as e:
+        print(f"Error retrieving penalties saved data: {e}")
+        penalties_faced = 0
+        penalty_saved = 0
+
+    return player_name, {
+        'Games Played': clean_stat_value(reader.text(4, 1), 2),
+        'Minutes Played': clean_stat_value(reader.text(4, 4), 3),
+        'Goals Conceded Per Game': clean_stat_value(reader.text(5, 1), 4),
+        'Penalties Saved': penalty_saved,
+        'Penalties Faced': penalties_faced,
+        'Saves Per Game': clean_stat_value(reader.text(5, 3), 3),
+        'Saves Per Game Percentage': clean_stat_value(reader.text(5, 3), 4),
+        'Goals Conceded': clean_stat_value(reader.text(5, 5), 2),
+        'Total Saves': clean_stat_value(reader.text(5, 8), 2),
+        'Goals Prevented': clean_stat_value(reader.text(5, 9), 2),
+        'Passes Completed': clean_stat_value(reader.text(7, 6), 3),
+        'Percentage of Passes Completed': clean_stat_value(reader.text(7, 6), 4),
+        'Clean Sheets': clean_stat_value(reader.text(8, 1), 2),
+        'Errors leading to shot': clean_stat_value(reader.text(8, 8), 4),
+        'Errors leading to goal': clean_stat_value(reader.text(8, 9), 4)
+    }
+
+
+def parse_field_player(reader):
+    """
+    Extracts a field player's statistics from a stat reader.
+
+    Parameters:
+        reader (LiveStatReader | BatchStatReader | HtmlStatReader): Reader over the player's page.
+
+    Returns:
+        tuple[str, dict]: The player's name and statistics.
+    """
+    player_name = reader.player_name()
+    print(f"Scraping {player_name}")
+
+    amount_games = clean_stat_value(reader.text(4, 1), 2)
+    amount_minutes_played = clean_stat_value(reader.text(4, 4), 3)
+    amount_goals = clean_stat_value(reader.text(5, 1), 1)
+
+    amount_xg = 0
+    amount_shots_per_game = 0
+    amount_shots_target_per_game = 0
+    amount_big_chances_missed = 0
+
+    try:
+        xg_element = reader.text(5, 2)
+        if "Expected Goals (xG)" in xg_element:
+            amount_xg = clean_stat_value(xg_element, 3)
+            amount_shots_per_game = clean_stat_value(reader.text(5, 5), 3)
+            amount_shots_target_per_game = clean_stat_value(reader.text(5, 6), 5)
+            amount_big_chances_missed = clean_stat_value(reader.text(5, 7), 3)
+    except Exception as e:
+        print(f"Error retrieving {player_name}'s xG related data: {e}")
+
+    passes_completed_per_game = reader.text(6, 6)
+    succesful_passes_opp_half = reader.text(6, 8)
+    succesful_long_balls = reader.text(6, 9)
+    total_duels_won = reader.text(8, 2)
+    ground_duels_won = reader.text(8, 3)
+    aerial_duels_won = reader.text(8, 4)
+
+    # Players with clean sheets listed first have the defensive rows shifted down by one
+    first_element_verification = clean_stat_value(reader.text(7, 1), 0)
+    offset = 1 if 'Clean' in first_element_verification else 0
+
+    return player_name, {
+        'Games Played': amount_games,
+        'Minutes Played': amount_minutes_played,
+        'Goals': amount_goals,
+        'Expected Goals (xG)': amount_xg,
+        'Big Chances Missed': amount_big_chances_missed,
+        'Shots Per Game': amount_shots_per_game,
+        'Shots on Target Per Game': amount_shots_target_per_game,
+        'Assists': clean_stat_value(reader.text(6, 1), 1),
+        'Expected Assists (xA)': clean_stat_value(reader.text(6, 2), 3),
+        'Big Chances Created': clean_stat_value(reader.text(6, 4), 3),
+        'Key Passes Per Game': clean_stat_value(reader.text(6, 5), 2),
+        'Passes Completed Per Game': clean_stat_value(passes_completed_per_game, 3),
+        'Pass Completion Percentage': clean_stat_value(passes_completed_per_game, 4),
+        'Succesful Passes Opp. Half': clean_stat_value(succesful_passes_opp_half, 3),
+        'Succesful Passes Opp. Half Percentage': clean_stat_value(succesful_passes_opp_half, 4),
+        'Succesful Long Balls': clean_stat_value(succesful_long_balls, 3),
+        'Succesful Long Balls Percentage': clean_stat_value(succesful_long_balls, 4),
+        'Successful Dribbles Per Game': clean_stat_value(reader.text(8, 1), 2),
+        'Total Duels Won Per Game': clean_stat_value(total_duels_won, 3),
+        'Total Duels Won Percentage': clean_stat_value(total_duels_won, 4),
+        'Ground Duels Won Per Game': clean_stat_value(ground_duels_won, 3),
+        'Ground Duels Won Percentage': clean_stat_value(ground_duels_won, 4),
+        'Aerial Duels Won Per Game': clean_stat_value(aerial_duels_won, 3),
+        'Aerial Duels Won Percentage': clean_stat_value(aerial_duels_won, 4),
+        'Interceptions Per Game': clean_stat_value(reader.text(7, 1 + offset), 3),
+        'Tackles Per Game': clean_stat_value(reader.text(7, 2 + offset), 3),
+        'Possession Won Opp. Half': clean_stat_value(reader.text(7, 3 + offset), 2),
+        'Balls Recovered Per Game': clean_stat_value(reader.text(7, 4 + offset), 4),
+        'Dribbled Past Per Game': clean_stat_value(reader.text(7, 5 + offset), 4),
+        'Clearances Per Game': clean_stat_value(reader.text(7, 6 + offset), 3),
+        'Possession Lost Per Game': clean_stat_value(reader.text(8, 5), 2),
+        'Fouls Committed Per Game': clean_stat_value(reader.text(8, 6), 1),
+        'Fouls Received Per Game': clean_stat_value(reader.text(8, 7), 2),
+        'Offsides Per Game': clean_stat_value(reader.text(8, 8), 1)
+    }
+
+
+def read_fingerprint(driver):
+    """
+    Reads a cheap fingerprint of the statistics shown on the current player page.
+
+    Parameters:
+        driver (webdriver.Chrome): The WebDriver instance showing the player page.
+
+    Returns:
+        str | None: The fingerprint, or None if its rows are not on the page.
+    """
+    reader = BatchStatReader(driver, cells=FINGERPRINT_CELLS)
+    values = [reader.cells.get(f"{section},{row}") for section, row in FINGERPRINT_CELLS]
+    if None in values:
+        return None
+    return "|".join(" ".join(value.split()) for value in values)
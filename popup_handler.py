@@ -1,7 +1,67 @@
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.common.exceptions import WebDriverException
+
+from instrumentation import metrics
+
+POPUP_CLOSE_XPATH = '//*[@id="portals"]/div/div/div/div/div/div[1]/div/div[5]/button[1]'
+
+# Installs (once per document) a MutationObserver that clicks the popup close button
+# as soon as it is inserted, probes for a popup that is already showing, and returns
+# the counters accumulated since the previous call. A popup is counted as seen when
+# its close button is found, and as dismissed once the click has taken it off the
+# page. With arguments[1] false, only the counters are read. Never waits for anything.
+DISMISS_POPUP_SCRIPT = """
+const xpath = arguments[0];
+const probe = arguments[1];
+function findClose() {
+    return document.evaluate(xpath, document, null,
+        XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+}
+function settle(stats) {
+    stats.pending = stats.pending.filter(button => {
+        if (button.isConnected && button.getClientRects().length > 0) {
+            return true;
+        }
+        stats.dismissed += 1;
+        return false;
+    });
+}
+function dismiss(stats) {
+    settle(stats);
+    const button = findClose();
+    if (button === null || button.dataset.popupSeen) {
+        return false;
+    }
+    button.dataset.popupSeen = 'true';
+    stats.seen += 1;
+    try {
+        button.scrollIntoView();
+        button.click();
+    } catch (e) {
+        return false;
+    }
+    stats.pending.push(button);
+    settle(stats);
+    return true;
+}
+if (window.__popupStats === undefined) {
+    if (!probe) {
+        return {seen: 0, dismissed: 0};
+    }
+    window.__popupStats = {seen: 0, dismissed: 0, pending: []};
+    const observer = new MutationObserver(() => dismiss(window.__popupStats));
+    observer.observe(document.documentElement, {childList: true, subtree: true});
+}
+const stats = window.__popupStats;
+if (probe) {
+    dismiss(stats);
+} else {
+    settle(stats);
+}
+const result = {seen: stats.seen, dismissed: stats.dismissed};
+stats.seen = 0;
+stats.dismissed = 0;
+return result;
+"""
 
 class PopupHandler:
     """
@@ -9,6 +69,10 @@ class PopupHandler:
 
     Attributes:
         driver (webdriver.Chrome): The WebDriver instance to interact with the browser.
+        popups_seen (int): Number of popups found on the pages visited.
+        popups_dismissed (int): Number of popups that were closed.
+        checks (int): Number of times `cerrar_popup` was called.
+        observing (bool): Whether the current page has the popup observer installed.
     """
 
     def __init__(self, driver):
@@ -20,25 +84,64 @@ class PopupHandler:
             driver (webdriver.Chrome): The WebDriver instance to manage browser interactions.
         """
         self.driver = driver
-    
+        self.popups_seen = 0
+        self.popups_dismissed = 0
+        self.checks = 0
+        self.observing = False
+
+    @metrics.timed('popup')
     def cerrar_popup(self):
         """
         Closes a popup if it is present on the page.
 
-        This method attempts to locate the popup close button, scrolls it into view,
-        and clicks it. It waits until the popup becomes invisible to ensure it was
-        successfully closed.
+        A single script call clicks the close button if the popup is already
+        showing, and installs an observer on the page that closes the popup the
+        moment it appears later on. Nothing is waited for, so calling this on a
+        page without a popup costs one round trip instead of the implicit wait.
+
+        Returns:
+            bool: True if a popup was closed since the previous call.
 
         Exceptions Handled:
-            NoSuchElementException: If the popup or close button is not found.
-            TimeoutException: If the popup does not disappear within the specified timeout.
+            WebDriverException: If the script cannot run on the current page.
         """
+        self.checks += 1
         try:
-            close_button = self.driver.find_element(By.XPATH, '//*[@id="portals"]/div/div/div/div/div/div[1]/div/div[5]/button[1]')
-            self.driver.execute_script("arguments[0].scrollIntoView();", close_button)
-            close_button.click()
-            WebDriverWait(self.driver, 10).until(
-                EC.invisibility_of_element_located((By.XPATH, '//*[@id="portals"]/div/div/div/div/div/div[1]/div/div[5]/button[1]'))
-            )
-        except (NoSuchElementException, TimeoutException):
-            pass
+            stats = self.driver.execute_script(DISMISS_POPUP_SCRIPT, POPUP_CLOSE_XPATH, True)
+        except WebDriverException:
+            return False
+
+        self.observing = True
+        self.popups_seen += stats['seen']
+        self.popups_dismissed += stats['dismissed']
+        return stats['dismissed'] > 0
+
+    def collect(self):
+        """
+        Adds the popups the page's observer handled since the last call to the totals.
+
+        The observer's counters live in the page and are lost with it, so this is
+        called before navigating away. Nothing is sent to the browser if no
+        observer was installed on the current page.
+
+        Exceptions Handled:
+            WebDriverException: If the script cannot run on the current page.
+        """
+        if not self.observing:
+            return
+        self.observing = False
+        try:
+            stats = self.driver.execute_script(DISMISS_POPUP_SCRIPT, POPUP_CLOSE_XPATH, False)
+        except WebDriverException:
+            return
+        self.popups_seen += stats['seen']
+        self.popups_dismissed += stats['dismissed']
+
+    def stats(self):
+        """
+        Returns the popup counters collected so far.
+
+        Returns:
+            dict: Counts of checks made, popups seen and popups dismissed.
+        """
+        return {'checks': self.checks, 'seen': self.popups_seen, 'dismissed': self.popups_dismissed}
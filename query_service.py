@@ -0,0 +1,432 @@
+from collections import OrderedDict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlparse
+import argparse
+import json
+import math
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from parquet_writer import read_players
+
+KEY_COLUMNS = ['Competition', 'Season', 'Team', 'Player Name']
+
+# Query parameters that restrict a query to a group of players, and the column they match
+FILTER_COLUMNS = {'team': 'Team', 'competition': 'Competition', 'season': 'Season'}
+
+
+def _source_path(source):
+    return source[0] if isinstance(source, tuple) else source
+
+
+def _load_source(source):
+    if isinstance(source, tuple):
+        path, competition, season = source
+    else:
+        path, competition, season = source, None, None
+    if os.path.isdir(path):
+        df = read_players(path)
+        for col in df.columns[df.dtypes == np.float32]:
+            # Widened as they are, e.g. when concatenated with a CSV source, float32 values
+            # would read e.g. 0.30000001192092896
+            df[col] = df[col].to_numpy().astype(str).astype(np.float64)
+        return df
+    df = pd.read_csv(path, index_col=['Team', 'Player Name'])
+    # The CSV files carry no competition or season of their own
+    if competition is not None:
+        df['Competition'] = competition
+        df['Season'] = season
+    return df
+
+
+def _source_version(source):
+    path = _source_path(source)
+    # A Parquet dataset changes whenever any of its files does
+    if not os.path.isdir(path):
+        return os.stat(path).st_mtime_ns
+    latest = os.stat(path).st_mtime_ns
+    for directory, _, files in os.walk(path):
+        for name in files:
+            latest = max(latest, os.stat(os.path.join(directory, name)).st_mtime_ns)
+    return latest
+
+
+class _IndexState:
+    """
+    The arrays and indexes built from one load of the sources.
+    """
+
+    def __init__(self, df):
+        rows = df.reset_index()
+        for key in KEY_COLUMNS:
+            if key not in rows.columns:
+                rows[key] = None
+        self.stat_columns = [col for col in rows.columns if col not in KEY_COLUMNS]
+        self.keys = {}
+        for key in KEY_COLUMNS:
+            column = rows[key].astype(object)
+            self.keys[key] = column.where(column.notna(), None).to_numpy()
+        stats = rows[self.stat_columns]
+        self.values = stats.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+        self.size = len(rows)
+
+        # Ascending order of every column with its missing values left out
+        self.sorted_positions = {}
+        self.sorted_values = {}
+        for i, col in enumerate(self.stat_columns):
+            column = self.values[:, i]
+            positions = np.flatnonzero(~np.isnan(column))
+            order = positions[np.argsort(column[positions], kind='stable')]
+            self.sorted_positions[col] = order
+            self.sorted_values[col] = column[order]
+
+        # Row positions of every team, competition and season
+        self.groups = {}
+        for column in FILTER_COLUMNS.values():
+            groups = {}
+            for position, value in enumerate(self.keys[column]):
+                if value is not None:
+                    groups.setdefault(str(value), []).append(position)
+            self.groups[column] = {value: np.array(positions) for value, positions in groups.items()}
+
+
+class PlayerIndex:
+    """
+    Scraped player statistics held in memory with per-column sorted indexes.
+
+    The statistics are loaded once from players_data.csv files and/or Parquet
+    datasets. CSV files hold no competition or season, so when several sources
+    are loaded each CSV file must be given with the competition and season it
+    belongs to. Every statistics column gets a sorted index, and rows are grouped
+    by team, competition and season, so top-k, range and per-team queries never
+    rescan the table. Results are cached until the sources change on disk, which
+    is checked at most once per `check_interval`.
+
+    Attributes:
+        sources (list[str | tuple[str, str, str]]): CSV files, optionally with their
+            competition and season, and Parquet dataset directories loaded.
+        cache_size (int): Number of query results kept.
+        check_interval (float): Seconds between two checks of the sources for changes.
+        loaded_at (float | None): When the sources were last loaded.
+    """
+
+    def __init__(self, sources, cache_size=1024, check_interval=1.0):
+        """
+        Loads the sources and builds their indexes.
+
+        Parameters:
+            sources (list[str | tuple[str, str, str]]): CSV files written by `main`, or
+                (path, competition, season) tuples of them, and/or Parquet dataset directories.
+            cache_size (int): Number of query results kept.
+            check_interval (float): Seconds between two checks of the sources for changes.
+
+        Raises:
+            ValueError: If several sources are loaded and a CSV file has no competition and season.
+        """
+        self.sources = list(sources)
+        unlabelled = [source for source in self.sources
+                      if not isinstance(source, tuple) and not os.path.isdir(source)]
+        if len(self.sources) > 1 and unlabelled:
+            raise ValueError(f"Give the competition and season of {unlabelled[0]}: players of different "
+                             "sources cannot be told apart otherwise")
+        self.cache_size = cache_size
+        self.check_interval = check_interval
+        self.loaded_at = None
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._versions = None
+        self._checked_at = 0.0
+        self._state = None
+        self.reload()
+
+    def reload(self):
+        """
+        Loads the sources again, rebuilding the indexes and dropping cached results.
+        """
+        versions = [_source_version(source) for source in self.sources]
+        frames = [_load_source(source) for source in self.sources]
+        state = _IndexState(pd.concat(frames) if len(frames) > 1 else frames[0])
+        with self._lock:
+            self._state = state
+            self._versions = versions
+            self._cache.clear()
+            self.loaded_at = time.time()
+
+    def refresh_if_changed(self):
+        """
+        Reloads the sources if any of them changed since they were loaded.
+
+        Returns:
+            bool: True if the sources were reloaded.
+        """
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return False
+        self._checked_at = now
+        if [_source_version(source) for source in self.sources] == self._versions:
+            return False
+        self.reload()
+        return True
+
+    def _cached(self, key, compute):
+        self.refresh_if_changed()
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            state = self._state
+        result = compute(state)
+        with self._lock:
+            if state is self._state:
+                self._cache[key] = result
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return result
+
+    @staticmethod
+    def _mask(state, filters):
+        mask = None
+        for name, value in filters.items():
+            if value is None:
+                continue
+            if name not in FILTER_COLUMNS:
+                raise KeyError(f"Unknown filter '{name}'")
+            group = np.zeros(state.size, dtype=bool)
+            group[state.groups[FILTER_COLUMNS[name]].get(value, [])] = True
+            mask = group if mask is None else mask & group
+        return mask
+
+    @staticmethod
+    def _column(state, column):
+        if column not in state.sorted_positions:
+            raise KeyError(f"Unknown column '{column}'")
+        return column
+
+    @staticmethod
+    def _records(state, positions, columns=None):
+        columns = state.stat_columns if columns is None else columns
+        indexes = [state.stat_columns.index(col) for col in columns]
+        records = []
+        for position in positions:
+            record = {key: state.keys[key][position] for key in KEY_COLUMNS if state.keys[key][position] is not None}
+            for col, i in zip(columns, indexes):
+                value = state.values[position, i]
+                record[col] = None if math.isnan(value) else float(value)
+            records.append(record)
+        return records
+
+    def columns(self):
+        """
+        Returns the statistics columns that can be queried.
+        """
+        return list(self._state.stat_columns)
+
+    def top(self, column, k=10, ascending=False, **filters):
+        """
+        Returns the k players with the highest (or lowest) value of a column.
+
+        Parameters:
+            column (str): Statistics column to rank by, e.g. 'Expected Goals (xG)'.
+            k (int): Number of players to return.
+            ascending (bool): Return the lowest values instead of the highest.
+            **filters: Optional 'team', 'competition' and 'season' to restrict the ranking to.
+
+        Returns:
+            list[dict]: The players' keys and the column's value, best first.
+
+        Raises:
+            KeyError: If the column or a filter is unknown.
+        """
+        def compute(state):
+            order = state.sorted_positions[self._column(state, column)]
+            if not ascending:
+                order = order[::-1]
+            mask = self._mask(state, filters)
+            if mask is not None:
+                order = order[mask[order]]
+            return self._records(state, order[:k], [column])
+
+        return self._cached(('top', column, k, ascending, tuple(sorted(filters.items()))), compute)
+
+    def range(self, column, low=None, high=None, **filters):
+        """
+        Returns the players whose value of a column lies between two bounds.
+
+        Parameters:
+            column (str): Statistics column to filter on.
+            low (float, optional): Inclusive lower bound.
+            high (float, optional): Inclusive upper bound.
+            **filters: Optional 'team', 'competition' and 'season' to restrict the result to.
+
+        Returns:
+            list[dict]: The players' keys and the column's value, in ascending order.
+
+        Raises:
+            KeyError: If the column or a filter is unknown.
+        """
+        def compute(state):
+            values = state.sorted_values[self._column(state, column)]
+            start = 0 if low is None else np.searchsorted(values, low, side='left')
+            end = len(values) if high is None else np.searchsorted(values, high, side='right')
+            positions = state.sorted_positions[column][start:end]
+            mask = self._mask(state, filters)
+            if mask is not None:
+                positions = positions[mask[positions]]
+            return self._records(state, positions, [column])
+
+        return self._cached(('range', column, low, high, tuple(sorted(filters.items()))), compute)
+
+    def team(self, team, **filters):
+        """
+        Returns every statistic of a team's players.
+
+        Parameters:
+            team (str): The team's name.
+            **filters: Optional 'competition' and 'season' to restrict the result to.
+
+        Returns:
+            list[dict]: The team's players with all their statistics.
+
+        Raises:
+            KeyError: If a filter is unknown.
+        """
+        def compute(state):
+            mask = self._mask(state, dict(filters, team=team))
+            return self._records(state, np.flatnonzero(mask))
+
+        return self._cached(('team', team, tuple(sorted(filters.items()))), compute)
+
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    """
+    Answers GET requests against a PlayerIndex with JSON.
+
+    Endpoints:
+        /columns                                       Queryable statistics columns.
+        /top?column=..&k=10&ascending=0[&team=..]      Top-k players by a column.
+        /range?column=..&min=..&max=..[&team=..]       Players within a range of a column.
+        /team?name=..                                  Every statistic of a team's players.
+
+    'competition' and 'season' may be added to any query to filter by them.
+    """
+
+    index = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        filters = {name: params[name] for name in ('competition', 'season') if name in params}
+        try:
+            if url.path == '/columns':
+                result = self.index.columns()
+            elif url.path == '/top':
+                result = self.index.top(params['column'], k=int(params.get('k', 10)),
+                                        ascending=params.get('ascending', '0') in ('1', 'true'),
+                                        team=params.get('team'), **filters)
+            elif url.path == '/range':
+                result = self.index.range(params['column'],
+                                          low=float(params['min']) if 'min' in params else None,
+                                          high=float(params['max']) if 'max' in params else None,
+                                          team=params.get('team'), **filters)
+            elif url.path == '/team':
+                result = self.index.team(params['name'], **filters)
+            else:
+                return self._send(404, {'error': f"Unknown endpoint '{url.path}'"})
+        except KeyError as e:
+            return self._send(400, {'error': f"Missing or unknown: {e.args[0]}"})
+        except ValueError as e:
+            return self._send(400, {'error': str(e)})
+        self._send(200, result)
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class QueryServer:
+    """
+    A local HTTP API serving queries against a PlayerIndex.
+
+    Attributes:
+        index (PlayerIndex): The index queries are answered from.
+        url (str): Base URL the server is reachable at once started.
+    """
+
+    def __init__(self, index, host="127.0.0.1", port=0):
+        """
+        Initializes the server without starting it.
+
+        Parameters:
+            index (PlayerIndex): The index queries are answered from.
+            host (str): Interface to listen on.
+            port (int): Port to listen on; 0 picks a free port.
+        """
+        self.index = index
+        self.url = None
+        self._address = (host, port)
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """
+        Starts serving in a background thread.
+
+        Returns:
+            QueryServer: The started server.
+        """
+        handler = type(QueryRequestHandler.__name__, (QueryRequestHandler,), {'index': self.index})
+        self._server = ThreadingHTTPServer(self._address, handler)
+        host, port = self._server.server_address[:2]
+        self.url = f"http://{host}:{port}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stops the server and waits for its thread to finish.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+if __name__ == "__main__":
+    from main import parse_job
+
+    parser = argparse.ArgumentParser(description="Serve queries over scraped player statistics.")
+    parser.add_argument("sources", nargs="+",
+                        help="Parquet dataset directories and/or players_data CSV files, the latter as "
+                             "PATH@COMPETITION:SEASON when several sources are served.")
+    parser.add_argument("--port", type=int, default=8050, help="Port to listen on.")
+    args = parser.parse_args()
+
+    sources = []
+    for value in args.sources:
+        path, _, job = value.partition("@")
+        sources.append((path,) + parse_job(job) if job else path)
+    server = QueryServer(PlayerIndex(sources), port=args.port).start()
+    print(f"Serving {len(args.sources)} source(s) at {server.url}")
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
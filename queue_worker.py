@@ -0,0 +1,269 @@
+from contextlib import contextmanager
+import argparse
+import multiprocessing
+import os
+import socket
+import threading
+import time
+
+from browser_manager import BrowserManager, BROWSER_PROFILES
+from data_manager import convert_stat_columns
+from job_queue import JobQueue
+from parquet_writer import write_partitioned
+from retry_queue import RETRYABLE_ERRORS, CircuitBreaker, describe_error
+from scheduler import CrawlJob
+from worker_pool import ScraperWorker
+
+
+class QueueWorker:
+    """
+    A browser that takes its tasks from a shared JobQueue until the queue runs dry.
+
+    Standings tasks queue a task per team, and team tasks a task per player of
+    the squad. Player tasks store the scraped statistics in the queue's results.
+    The lease on the current task is renewed from a background thread, so a
+    long task is not reclaimed while its worker is alive; if the worker dies,
+    the lease expires and another worker picks the task up.
+
+    Attributes:
+        queue (JobQueue): The queue tasks are taken from.
+        worker_id (str): Identifier of the worker in the queue's leases and results.
+        worker (ScraperWorker): The browser and scrapers the tasks run on.
+        heartbeat_interval (float): Seconds between two renewals of the current lease.
+        poll_interval (float): Seconds to wait when no task is available.
+        tasks_done (int): Number of tasks completed by this worker.
+        tasks_failed (int): Number of tasks this worker failed on.
+    """
+
+    def __init__(self, queue, worker_id=None, headless=True, browser_options=None, heartbeat_interval=None,
+                 poll_interval=2.0, worker=None, **scraper_options):
+        """
+        Starts the worker's browser, unless an already started worker is given.
+
+        Parameters:
+            queue (JobQueue): The queue to take tasks from.
+            worker_id (str, optional): Identifier of the worker; defaults to the host name
+                and process id.
+            headless (bool): Whether the browser runs without a visible window.
+            browser_options (dict, optional): Extra keyword arguments for the BrowserManager.
+            heartbeat_interval (float, optional): Seconds between two lease renewals;
+                defaults to a third of the queue's lease.
+            poll_interval (float): Seconds to wait when no task is available.
+            worker (ScraperWorker, optional): Browser and scrapers to use instead of starting them.
+            **scraper_options: Extra keyword arguments for the worker's PlayerScraper.
+        """
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.heartbeat_interval = heartbeat_interval or queue.lease_seconds / 3
+        self.poll_interval = poll_interval
+        self.tasks_done = 0
+        self.tasks_failed = 0
+        if worker is None:
+            scraper_options.setdefault('breaker', CircuitBreaker())
+            worker = ScraperWorker(BrowserManager(headless=headless, **(browser_options or {})), **scraper_options)
+        self.worker = worker
+
+    @contextmanager
+    def _heartbeat(self, task):
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(self.heartbeat_interval):
+                if not self.queue.heartbeat(task['id'], self.worker_id):
+                    print(f"[{self.worker_id}] Lost the lease on task {task['id']}")
+                    return
+
+        thread = threading.Thread(target=beat, daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def run_task(self, task):
+        """
+        Runs one task on the worker's browser.
+
+        Parameters:
+            task (dict): A task as returned by `JobQueue.claim`.
+
+        Returns:
+            tuple[list[dict], list[tuple]]: The players scraped and the tasks to queue next,
+                as expected by `JobQueue.complete`.
+        """
+        payload = task['payload']
+        job = {'competition': payload['competition'], 'season': payload['season'], 'priority': payload['priority']}
+        if task['kind'] == 'standings':
+            scraper = self.worker.sofascore_scraper
+            scraper.league_url = payload['league_url']
+            teams = scraper.get_teams()
+            print(f"[{self.worker_id}] {len(teams)} teams in {job['competition']} {job['season']}")
+            return [], [('team', dict(job, team=team), job['priority']) for team in teams]
+
+        if task['kind'] == 'team':
+            team = payload['team']
+            squad = self.worker.read_squad(team)
+            print(f"[{self.worker_id}] {len(squad)} players in {team['name']}")
+            return [], [('player', dict(job, player=player, team_name=team['name']), job['priority'])
+                        for player in squad]
+
+        player = payload['player']
+        players = self.worker.scrape_player(player, payload['team_name'], job['competition'], job['season'])
+        results = [{'competition': job['competition'], 'season': job['season'], 'team': payload['team_name'],
+                    'player_url': player['link'], 'player_name': player_name, 'stats': stats}
+                   for player_name, stats in players.items()]
+        return results, []
+
+    def run(self, exit_when_idle=True):
+        """
+        Claims and runs tasks until the queue is finished.
+
+        Parameters:
+            exit_when_idle (bool): Return once every task is done or failed; otherwise keep
+                polling for new tasks.
+        """
+        while True:
+            task = self.queue.claim(self.worker_id)
+            if task is None:
+                if exit_when_idle and self.queue.is_finished():
+                    break
+                time.sleep(self.poll_interval)
+                continue
+
+            with self._heartbeat(task):
+                try:
+                    results, children = self.run_task(task)
+                except RETRYABLE_ERRORS as e:
+                    self.worker.navigator.invalidate()
+                    retried = self.queue.fail(task['id'], self.worker_id, describe_error(e))
+                    self.tasks_failed += 1
+                    print(f"[{self.worker_id}] {task['kind']} task {task['id']} failed"
+                          f"{', will be retried' if retried else ''}: {describe_error(e)}")
+                    continue
+                except Exception as e:
+                    # Not a misbehaving page: retrying will not help, but the other tasks can go on
+                    self.worker.navigator.invalidate()
+                    self.queue.fail(task['id'], self.worker_id, describe_error(e), retry=False)
+                    self.tasks_failed += 1
+                    print(f"[{self.worker_id}] {task['kind']} task {task['id']} failed: {describe_error(e)}")
+                    continue
+
+            if self.queue.complete(task['id'], self.worker_id, results, children):
+                self.tasks_done += 1
+            else:
+                print(f"[{self.worker_id}] Task {task['id']} was reclaimed before it finished; result dropped")
+
+    def quit(self):
+        """
+        Closes the worker's browser.
+        """
+        self.worker.quit()
+
+
+def seed(queue, jobs):
+    """
+    Queues the standings of every (competition, season) pair to crawl.
+
+    Parameters:
+        queue (JobQueue): The queue to seed.
+        jobs (list[tuple[str, str]]): The (competition, season) pairs to crawl.
+    """
+    for competition, season in jobs:
+        job = CrawlJob(competition, season)
+        payload = {'competition': job.competition, 'season': job.season, 'priority': job.priority,
+                   'league_url': job.league_url}
+        if queue.add('standings', payload, job.priority):
+            print(f"Queued {job.label}")
+
+
+def export(queue, parquet_dir=None):
+    """
+    Writes the results of every job in the queue to players_data_<competition>_<season>.csv.
+
+    Parameters:
+        queue (JobQueue): The queue holding the results.
+        parquet_dir (str, optional): Directory of a Parquet dataset every job is also written to.
+    """
+    for competition, season in queue.jobs():
+        players_df = convert_stat_columns(queue.load_results(competition, season))
+        file_name = f"players_data_{competition}_{season}.csv".replace(" ", "_").replace("/", "-")
+        players_df.to_csv(file_name, index=True)
+        print(f"Wrote {len(players_df)} players to {file_name}")
+        if parquet_dir is not None:
+            write_partitioned(players_df, parquet_dir, competition=competition, season=season)
+
+
+def work(queue_path, lease_seconds=120.0, headless=True, browser_options=None, exit_when_idle=True):
+    """
+    Runs one worker against a queue until it is finished, then closes its browser.
+
+    Parameters:
+        queue_path (str): Location of the queue's SQLite database.
+        lease_seconds (float): Lease taken on every claimed task.
+        headless (bool): Whether the browser runs without a visible window.
+        browser_options (dict, optional): Extra keyword arguments for the BrowserManager.
+        exit_when_idle (bool): Return once the queue is finished instead of waiting for new tasks.
+    """
+    queue = JobQueue(queue_path, lease_seconds=lease_seconds)
+    worker = QueueWorker(queue, headless=headless, browser_options=browser_options)
+    try:
+        worker.run(exit_when_idle=exit_when_idle)
+    finally:
+        worker.quit()
+        queue.close()
+    print(f"[{worker.worker_id}] {worker.tasks_done} tasks done, {worker.tasks_failed} failed")
+
+
+def start_workers(queue_path, processes, **work_options):
+    """
+    Runs several workers against a queue, each in its own process with its own browser.
+
+    Parameters:
+        queue_path (str): Location of the queue's SQLite database.
+        processes (int): Number of worker processes.
+        **work_options: Keyword arguments for `work`.
+    """
+    # Spawned rather than forked, so no process inherits another's threads or connections
+    context = multiprocessing.get_context('spawn')
+    workers = [context.Process(target=work, args=(queue_path,), kwargs=work_options) for _ in range(processes)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+
+
+if __name__ == "__main__":
+    from main import parse_job
+
+    parser = argparse.ArgumentParser(description="Crawl with worker processes sharing a SQLite job queue.")
+    parser.add_argument("command", choices=["seed", "work", "status", "export"])
+    parser.add_argument("--queue", default="job_queue.db", help="SQLite file of the shared job queue.")
+    parser.add_argument("--job", type=parse_job, action="append", dest="jobs", default=[],
+                        help="COMPETITION:SEASON to queue with 'seed'; may be repeated.")
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes to start on this host.")
+    parser.add_argument("--lease", type=float, default=120.0, help="Seconds a task stays leased without a heartbeat.")
+    parser.add_argument("--profile", choices=sorted(BROWSER_PROFILES), help="Browser profile of the workers.")
+    parser.add_argument("--remote-url", help="Remote WebDriver endpoint to start the browsers on.")
+    parser.add_argument("--stay", action="store_true", help="Keep polling for new tasks once the queue is finished.")
+    parser.add_argument("--parquet-dir", help="With 'export', also write a Parquet dataset.")
+    args = parser.parse_args()
+
+    if args.command == "seed":
+        queue = JobQueue(args.queue)
+        seed(queue, args.jobs)
+        queue.close()
+    elif args.command == "work":
+        options = {'lease_seconds': args.lease, 'exit_when_idle': not args.stay,
+                   'browser_options': {'profile': args.profile, 'remote_url': args.remote_url}}
+        if args.processes > 1:
+            start_workers(args.queue, args.processes, **options)
+        else:
+            work(args.queue, **options)
+    else:
+        queue = JobQueue(args.queue)
+        if args.command == "status":
+            queue.report()
+        else:
+            export(queue, args.parquet_dir)
+        queue.close()
@@ -0,0 +1,125 @@
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from functools import partial
+import argparse
+import os
+import threading
+
+# Extensions tried, in order, for request paths recorded without one
+RECORDED_EXTENSIONS = ('.json', '.html')
+
+
+class ReplayRequestHandler(SimpleHTTPRequestHandler):
+    """
+    Serves recorded responses from a directory, mapping request paths to files.
+
+    A request for `/api/v1/team/2829/players` is answered with
+    `<root>/api/v1/team/2829/players.json` (or `.html`) when the path itself is
+    not a file. Query strings and fragments are ignored. If `rewrite_from` is
+    set, occurrences of it in HTML responses are replaced with the server's own
+    base URL, so that recorded absolute links stay on the replay server.
+    """
+
+    rewrite_from = None
+
+    def translate_path(self, path):
+        file_path = super().translate_path(path)
+        if os.path.isfile(file_path):
+            return file_path
+        for extension in RECORDED_EXTENSIONS:
+            if os.path.isfile(file_path.rstrip(os.sep) + extension):
+                return file_path.rstrip(os.sep) + extension
+        return file_path
+
+    def do_GET(self):
+        file_path = self.translate_path(self.path)
+        if self.rewrite_from is None or not file_path.endswith('.html') or not os.path.isfile(file_path):
+            return super().do_GET()
+
+        with open(file_path, 'rb') as f:
+            body = f.read()
+        host, port = self.server.server_address[:2]
+        body = body.replace(self.rewrite_from.encode('utf-8'), f"http://{host}:{port}".encode('utf-8'))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ReplayServer:
+    """
+    A local HTTP server that stands in for SofaScore by replaying recorded responses.
+
+    Attributes:
+        root (str): Directory holding the recorded responses.
+        url (str): Base URL the server is reachable at once started.
+    """
+
+    def __init__(self, root, host="127.0.0.1", port=0, handler_class=ReplayRequestHandler, rewrite_from=None):
+        """
+        Initializes the server without starting it.
+
+        Parameters:
+            root (str): Directory holding the recorded responses.
+            host (str): Interface to listen on.
+            port (int): Port to listen on; 0 picks a free port.
+            handler_class (type): Request handler used to answer requests.
+            rewrite_from (str, optional): Base URL to replace with the server's own in
+                HTML responses, e.g. 'https://www.sofascore.com'.
+        """
+        self.root = root
+        self.url = None
+        self._address = (host, port)
+        self._handler_class = handler_class
+        self._rewrite_from = rewrite_from
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """
+        Starts serving in a background thread.
+
+        Returns:
+            ReplayServer: The started server.
+        """
+        handler_class = type(self._handler_class.__name__, (self._handler_class,), {'rewrite_from': self._rewrite_from})
+        handler = partial(handler_class, directory=self.root)
+        self._server = ThreadingHTTPServer(self._address, handler)
+        host, port = self._server.server_address[:2]
+        self.url = f"http://{host}:{port}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stops the server and waits for its thread to finish.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve recorded SofaScore responses locally.")
+    parser.add_argument("root", help="Directory holding the recorded responses.")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on.")
+    args = parser.parse_args()
+
+    server = ReplayServer(args.root, port=args.port).start()
+    print(f"Replaying {args.root} at {server.url}")
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
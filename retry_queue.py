@@ -0,0 +1,286 @@
+from collections import deque
+import heapq
+import itertools
+import random
+import threading
+import time
+import traceback
+from urllib.parse import urlparse
+
+from selenium.common.exceptions import WebDriverException
+
+from competition_error import PlayerScrapeError
+from instrumentation import metrics
+
+# Errors a player page can raise that are worth trying again later. Anything
+# else points at a bug, e.g. a layout the parser does not expect: it is given
+# up on straight away and reported apart from the transient failures.
+RETRYABLE_ERRORS = (PlayerScrapeError, WebDriverException)
+
+
+def describe_error(error):
+    """
+    Returns an error's type and the first line of its message, for failure reports.
+    """
+    # Selenium keeps the bare message in msg; its str adds a stack trace
+    lines = str(getattr(error, 'msg', None) or error).strip().splitlines()
+    return f"{type(error).__name__}: {lines[0]}" if lines else type(error).__name__
+
+
+def _raised_at(error):
+    frames = traceback.extract_tb(error.__traceback__)
+    if not frames:
+        return None
+    return f"{frames[-1].filename}:{frames[-1].lineno} in {frames[-1].name}"
+
+
+class RetryQueue:
+    """
+    Players whose scrape failed, held back until the end of the run and retried then.
+
+    A failed player is deferred rather than retried straight away, so one
+    misbehaving page does not stall its worker. Each retry waits an
+    exponentially growing, jittered delay after the failure, bounded by
+    `max_delay`. Players still failing after `max_attempts` are given up on and
+    reported with every error they raised. Players given up on after an error
+    outside RETRYABLE_ERRORS are reported separately, as likely bugs, with
+    where the error was raised.
+
+    Attributes:
+        max_attempts (int): Attempts, including the first one, before a player is given up on.
+        base_delay (float): Seconds to wait before the first retry.
+        max_delay (float): Upper bound of the wait before a retry, in seconds.
+        failed (dict): Players given up on, keyed by (link, competition, season), with
+            their entry, the errors of every attempt and, for unexpected errors, where
+            the last one was raised.
+        recovered (int): Number of players that succeeded on a retry.
+    """
+
+    def __init__(self, max_attempts=3, base_delay=2.0, max_delay=60.0):
+        """
+        Initializes an empty queue.
+
+        Parameters:
+            max_attempts (int): Attempts, including the first one, before a player is given up on.
+            base_delay (float): Seconds to wait before the first retry.
+            max_delay (float): Upper bound of the wait before a retry, in seconds.
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failed = {}
+        self.recovered = 0
+        self._queue = []
+        self._order = itertools.count()
+        self._errors = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(entry):
+        return entry['player']['link'], entry['competition'], entry['season']
+
+    def __len__(self):
+        with self._lock:
+            return len(self._queue)
+
+    def defer(self, entry, error):
+        """
+        Records a failed attempt and queues the player for a later retry.
+
+        Parameters:
+            entry (dict): The 'player', 'team_name', 'competition' and 'season' that failed.
+            error (Exception): What the attempt raised.
+
+        Returns:
+            bool: True if the player will be retried, False if it was given up on.
+        """
+        key = self.key(entry)
+        with self._lock:
+            errors = self._errors.setdefault(key, [])
+            errors.append(describe_error(error))
+            attempts = len(errors)
+            if attempts >= self.max_attempts:
+                self.failed[key] = {'entry': entry, 'errors': errors, 'raised_at': None}
+                del self._errors[key]
+                return False
+            delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1)) * random.uniform(0.5, 1.0)
+            heapq.heappush(self._queue, (time.monotonic() + delay, next(self._order), entry))
+        metrics.observe('retry_deferred', delay)
+        return True
+
+    def give_up(self, entry, error):
+        """
+        Gives up on a player straight away, e.g. after an error that is not worth retrying.
+
+        Errors outside RETRYABLE_ERRORS are kept apart as unexpected, together with
+        where they were raised.
+
+        Parameters:
+            entry (dict): The 'player', 'team_name', 'competition' and 'season' that failed.
+            error (Exception): What the attempt raised.
+        """
+        key = self.key(entry)
+        raised_at = None if isinstance(error, RETRYABLE_ERRORS) else _raised_at(error) or 'unknown location'
+        with self._lock:
+            errors = self._errors.pop(key, [])
+            errors.append(describe_error(error))
+            self.failed[key] = {'entry': entry, 'errors': errors, 'raised_at': raised_at}
+
+    def succeeded(self, entry):
+        """
+        Records that a player was scraped, counting it as recovered if it had failed before.
+
+        Parameters:
+            entry (dict): The 'player', 'competition' and 'season' that succeeded.
+        """
+        with self._lock:
+            if self._errors.pop(self.key(entry), None) is not None:
+                self.recovered += 1
+
+    def pop_due(self):
+        """
+        Takes the next player whose retry delay has passed.
+
+        Returns:
+            dict | None: The entry, or None if no retry is due yet.
+        """
+        with self._lock:
+            if not self._queue or self._queue[0][0] > time.monotonic():
+                return None
+            return heapq.heappop(self._queue)[2]
+
+    def wait_time(self):
+        """
+        Returns the seconds until the next retry is due, or None if nothing is queued.
+        """
+        with self._lock:
+            if not self._queue:
+                return None
+            return max(0.0, self._queue[0][0] - time.monotonic())
+
+    def report(self):
+        """
+        Prints how many players recovered on a retry, and which players failed and why.
+
+        Players that hit an unexpected error are listed after the transient failures.
+        """
+        unexpected = {key: failure for key, failure in self.failed.items() if failure['raised_at'] is not None}
+        print(f"Retries: {self.recovered} players recovered, {len(self.failed)} players failed "
+              f"({len(unexpected)} on unexpected errors)")
+        for (link, competition, season), failure in self.failed.items():
+            if failure['raised_at'] is not None:
+                continue
+            print(f"Failed {link} ({competition} {season}) after {len(failure['errors'])} attempts:")
+            for attempt, error in enumerate(failure['errors'], 1):
+                print(f"    {attempt}. {error}")
+        for (link, competition, season), failure in unexpected.items():
+            print(f"Unexpected error on {link} ({competition} {season}), likely a bug, "
+                  f"raised at {failure['raised_at']}:")
+            print(f"    {failure['errors'][-1]}")
+
+
+class CircuitBreaker:
+    """
+    Slows requests to a host down while its recent error rate is too high.
+
+    Outcomes are kept over a sliding window per host. When at least
+    `threshold` of the last `window` requests failed, the breaker opens and
+    every caller of `before` waits out a cooldown. The first request after the
+    cooldown is a probe: success closes the breaker, failure opens it again
+    with twice the cooldown, up to `max_cooldown`.
+
+    Attributes:
+        window (int): Number of recent outcomes kept per host.
+        threshold (float): Error rate, between 0 and 1, that opens the breaker.
+        min_calls (int): Outcomes needed before the error rate is trusted.
+        cooldown (float): Seconds the breaker stays open the first time it trips.
+        max_cooldown (float): Upper bound of the cooldown, in seconds.
+        trips (dict): Number of times the breaker opened, per host.
+    """
+
+    def __init__(self, window=20, threshold=0.5, min_calls=5, cooldown=10.0, max_cooldown=120.0):
+        """
+        Initializes a closed breaker for every host.
+
+        Parameters:
+            window (int): Number of recent outcomes kept per host.
+            threshold (float): Error rate, between 0 and 1, that opens the breaker.
+            min_calls (int): Outcomes needed before the error rate is trusted.
+            cooldown (float): Seconds the breaker stays open the first time it trips.
+            max_cooldown (float): Upper bound of the cooldown, in seconds.
+        """
+        self.window = window
+        self.threshold = threshold
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.trips = {}
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def host(url):
+        return urlparse(url).netloc
+
+    def _state(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = {
+                'outcomes': deque(maxlen=self.window), 'open_until': 0.0, 'cooldown': self.cooldown, 'probing': False,
+            }
+        return state
+
+    def before(self, url):
+        """
+        Waits until the breaker of the URL's host lets requests through.
+
+        Parameters:
+            url (str): The URL about to be requested.
+        """
+        host = self.host(url)
+        with self._lock:
+            delay = self._state(host)['open_until'] - time.monotonic()
+        if delay > 0:
+            with metrics.timed('breaker_wait'):
+                time.sleep(delay)
+
+    def record(self, url, ok):
+        """
+        Records the outcome of a request, opening or closing the host's breaker.
+
+        Parameters:
+            url (str): The URL that was requested.
+            ok (bool): Whether the request succeeded.
+        """
+        host = self.host(url)
+        with self._lock:
+            state = self._state(host)
+            if state['probing']:
+                state['probing'] = False
+                if ok:
+                    state['cooldown'] = self.cooldown
+                    state['outcomes'].clear()
+                else:
+                    state['cooldown'] = min(self.max_cooldown, state['cooldown'] * 2)
+                    self._open(host, state)
+                return
+
+            state['outcomes'].append(ok)
+            outcomes = state['outcomes']
+            if not ok and len(outcomes) >= self.min_calls:
+                if outcomes.count(False) / len(outcomes) >= self.threshold:
+                    self._open(host, state)
+
+    def _open(self, host, state):
+        state['open_until'] = time.monotonic() + state['cooldown']
+        state['probing'] = True
+        state['outcomes'].clear()
+        self.trips[host] = self.trips.get(host, 0) + 1
+        print(f"Error rate too high on {host}, pausing requests for {state['cooldown']:.1f}s")
+
+    def report(self):
+        """
+        Prints how often the breaker opened for every host.
+        """
+        for host, trips in self.trips.items():
+            print(f"Circuit breaker opened {trips} times for {host}")
@@ -0,0 +1,279 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import heapq
+import itertools
+import time
+
+from data_manager import CURRENT_SEASON, PlayerStatsAccumulator
+from sofascore_scraper import LEAGUE_URLS
+
+# Task kinds, in the order they run within a priority level
+STANDINGS, TEAM, PLAYER = 0, 1, 2
+
+
+class CrawlJob:
+    """
+    One competition and season to crawl, with its progress.
+
+    Attributes:
+        competition (str): Competition name as shown in the player page dropdown.
+        season (str): Season label, e.g. '24/25'.
+        league_url (str): Standings page listing the job's teams.
+        priority (int): Lower runs first; current-season jobs come before back-seasons.
+        teams (int): Number of teams found on the standings page.
+        teams_done (int): Number of squads read.
+        players (int): Number of players queued for the job.
+        players_done (int): Number of players processed.
+        accumulator (PlayerStatsAccumulator): The job's scraped players, unless the
+            scheduler streams them instead.
+        started_at (float | None): When the job's first task started.
+        finished_at (float | None): When the job's last task finished.
+    """
+
+    def __init__(self, competition, season=CURRENT_SEASON, league_url=None, priority=None):
+        """
+        Initializes a job.
+
+        Parameters:
+            competition (str): Competition name as shown in the player page dropdown.
+            season (str): Season label, e.g. '24/25'.
+            league_url (str, optional): Standings page listing the job's teams; defaults to
+                the competition's entry in LEAGUE_URLS. Back-seasons should point it at
+                that season's standings.
+            priority (int, optional): Lower runs first. Defaults to 0 for the current
+                season and 1 otherwise.
+
+        Raises:
+            ValueError: If no standings page is known for the competition.
+        """
+        if league_url is None:
+            if competition not in LEAGUE_URLS:
+                raise ValueError(f"No standings page known for '{competition}', pass its league_url")
+            league_url = LEAGUE_URLS[competition]
+        self.competition = competition
+        self.season = season
+        self.league_url = league_url
+        self.priority = priority if priority is not None else (0 if season == CURRENT_SEASON else 1)
+        self.teams = 0
+        self.teams_done = 0
+        self.players = 0
+        self.players_done = 0
+        self.accumulator = PlayerStatsAccumulator()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def label(self):
+        return f"{self.competition} {self.season}"
+
+    def __str__(self):
+        return self.label
+
+    def throughput(self):
+        """
+        Returns the job's players processed per minute so far.
+        """
+        if self.started_at is None:
+            return 0.0
+        elapsed = (self.finished_at or time.perf_counter()) - self.started_at
+        return 60 * self.players_done / elapsed if elapsed > 0 else 0.0
+
+
+class CrawlScheduler:
+    """
+    Crawls several competitions and seasons with one shared pool of browsers.
+
+    Standings, team and player tasks go through a single priority queue.
+    Teams appearing in several jobs have their squad read once, and every
+    player page is loaded once; the competitions and seasons wanted from it are
+    then selected one after the other. Current-season jobs run first, and
+    players that failed are retried last.
+
+    Squads are read from the team pages, which only list the current roster. A
+    back-season job therefore covers the current players who played in that
+    season; players who have since left the team are missing from it.
+
+    A job is finished once all its squads are read and all its players
+    processed, and `on_finished` is called with it then, while other jobs keep
+    running. Jobs that later receive retried players are passed to it again
+    once the retries are done.
+
+    Attributes:
+        pool (WorkerPool): The browsers the tasks run on.
+        jobs (list[CrawlJob]): The jobs being crawled.
+        accumulate (bool): Whether scraped players are kept in their job's accumulator.
+        on_finished (callable | None): Called with every job once it finishes.
+    """
+
+    def __init__(self, pool, jobs, accumulate=True, on_finished=None):
+        """
+        Initializes the scheduler and queues the standings of every job.
+
+        Parameters:
+            pool (WorkerPool): The browsers the tasks run on.
+            jobs (list[CrawlJob]): The jobs to crawl.
+            accumulate (bool): Keep scraped players in their job's accumulator. Turn off
+                when the pool's scrapers stream players to an NDJSONSink.
+            on_finished (callable, optional): Called with every job once it finishes, e.g.
+                to write its output before the other jobs are done.
+        """
+        self.pool = pool
+        self.jobs = jobs
+        self.accumulate = accumulate
+        self.on_finished = on_finished
+        self._queue = []
+        self._order = itertools.count()
+        self._teams = {}
+        self._players = {}
+        for job in jobs:
+            self._push(job.priority, STANDINGS, job)
+
+    def _push(self, priority, kind, payload):
+        heapq.heappush(self._queue, (priority, kind, next(self._order), payload))
+
+    def _queue_team(self, job, team):
+        # A team shared by several jobs is only opened once
+        targets = self._teams.get(team['url'])
+        if targets is None:
+            self._teams[team['url']] = {'team': team, 'jobs': [job], 'squad': None}
+            self._push(job.priority, TEAM, team['url'])
+        elif targets['squad'] is not None:
+            self._add_squad(job, team['name'], targets['squad'])
+        else:
+            targets['jobs'].append(job)
+
+    def _add_squad(self, job, team_name, squad):
+        for player in squad:
+            self._queue_player(job, team_name, player)
+        job.teams_done += 1
+        self._check_finished(job)
+
+    def _queue_player(self, job, team_name, player):
+        targets = self._players.get(player['link'])
+        if targets is None:
+            self._players[player['link']] = targets = {'player': player, 'targets': []}
+            self._push(job.priority, PLAYER, player['link'])
+        targets['targets'].append((job, team_name))
+        job.players += 1
+
+    def _run_standings(self, worker, job):
+        scraper = worker.sofascore_scraper
+        scraper.league_url = job.league_url
+        return scraper.get_teams()
+
+    def _run_player(self, worker, player, targets):
+        results = []
+        for job, team_name in targets:
+            try:
+                players = worker.scrape_player(player, team_name, job.competition, job.season)
+            except Exception as e:
+                print(f"Error scraping {player['link']} for {job.label}: {e}")
+                players = {}
+            results.append((job, team_name, players))
+        return results
+
+    def _start(self, executor, task):
+        priority, kind, _, key = task
+        if kind == STANDINGS:
+            jobs = [key]
+            future = executor.submit(self.pool.run, lambda worker: self._run_standings(worker, key))
+        elif kind == TEAM:
+            targets = self._teams[key]
+            jobs = targets['jobs']
+            future = executor.submit(self.pool.run, lambda worker: worker.read_squad(targets['team']))
+        else:
+            targets = self._players.pop(key)
+            jobs = [job for job, _ in targets['targets']]
+            future = executor.submit(
+                self.pool.run, lambda worker: self._run_player(worker, targets['player'], targets['targets'])
+            )
+        now = time.perf_counter()
+        for job in jobs:
+            if job.started_at is None:
+                job.started_at = now
+        return future
+
+    def _finish(self, task, result):
+        priority, kind, _, key = task
+        if kind == STANDINGS:
+            # Counted up front, so that a shared squad read earlier cannot finish the job early
+            key.teams = len(result)
+            print(f"[{key.label}] {key.teams} teams queued")
+            if key.season != CURRENT_SEASON:
+                print(f"[{key.label}] Squads come from the current rosters; players who left since are not crawled")
+            for team in result:
+                self._queue_team(key, team)
+            if key.teams == 0:
+                self._check_finished(key)
+        elif kind == TEAM:
+            targets = self._teams[key]
+            targets['squad'] = result
+            for job in targets['jobs']:
+                self._add_squad(job, targets['team']['name'], result)
+        else:
+            for job, team_name, players in result:
+                if self.accumulate:
+                    job.accumulator.add_team(team_name, players)
+                job.players_done += 1
+                self._check_finished(job)
+                if job.players_done % 10 == 0 or job.finished_at is not None:
+                    self._print_progress(job)
+
+    def _check_finished(self, job):
+        if job.finished_at is None and job.teams_done == job.teams and job.players_done == job.players:
+            job.finished_at = time.perf_counter()
+            if self.on_finished is not None:
+                self.on_finished(job)
+
+    def _print_progress(self, job):
+        print(f"[{job.label}] {job.teams_done}/{job.teams} teams, {job.players_done}/{job.players} players, "
+              f"{job.throughput():.1f} players/min")
+
+    def run(self):
+        """
+        Runs every queued task, keeping all browsers of the pool busy.
+
+        Every job is handed to `on_finished` as soon as it finishes; the jobs that
+        got players back from the final retries are handed to it again afterwards.
+
+        Returns:
+            list[CrawlJob]: The jobs, each with its scraped players in its accumulator.
+        """
+        with ThreadPoolExecutor(max_workers=len(self.pool.workers)) as executor:
+            running = {}
+            while self._queue or running:
+                while self._queue and len(running) < len(self.pool.workers):
+                    task = heapq.heappop(self._queue)
+                    running[self._start(executor, task)] = task
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        # Standings and squads that cannot be read count as empty
+                        print(f"Error running crawl task {task[3]}: {e}")
+                        result = []
+                    self._finish(task, result)
+
+        # Players deferred after failing are retried once every other task is done
+        jobs = {(job.competition, job.season): job for job in self.jobs}
+        retried = []
+        for entry, players in self.pool.retry_deferred():
+            job = jobs[(entry['competition'], entry['season'])]
+            if self.accumulate:
+                job.accumulator.add_team(entry['team_name'], players)
+            if players and job not in retried:
+                retried.append(job)
+        if self.on_finished is not None:
+            for job in retried:
+                self.on_finished(job)
+        return self.jobs
+
+    def report(self):
+        """
+        Prints the progress and throughput of every job.
+        """
+        for job in self.jobs:
+            self._print_progress(job)
+        self.pool.retries.report()
+        self.pool.breaker.report()
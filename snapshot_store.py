@@ -0,0 +1,101 @@
+import json
+import sqlite3
+import threading
+import time
+
+
+class SnapshotStore:
+    """
+    The last scraped statistics of every player, kept across runs for change detection.
+
+    Snapshots are kept per player, competition and season. Each one carries a
+    fingerprint built from the games played and minutes on the player page.
+    When the fingerprint on the live page still matches, the stored statistics
+    can be reused instead of extracting them again.
+
+    Attributes:
+        path (str): Location of the SQLite database.
+    """
+
+    def __init__(self, path="player_snapshots.db"):
+        """
+        Opens the store, creating its table if needed.
+
+        Snapshots stored without their competition and season by an earlier
+        version are discarded, since they cannot be told apart.
+
+        Parameters:
+            path (str): Location of the SQLite database.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(snapshots)")]
+        if columns and 'competition' not in columns:
+            print(f"Discarding the snapshots in {path}, stored without competition and season")
+            self._conn.execute("DROP TABLE snapshots")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS snapshots (
+                player_url TEXT NOT NULL,
+                competition TEXT NOT NULL,
+                season TEXT NOT NULL,
+                team TEXT NOT NULL,
+                player_name TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                stats TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (player_url, competition, season)
+            )
+            """
+        )
+
+    def get(self, player_url, competition, season):
+        """
+        Returns the last snapshot of a player for a competition and season.
+
+        Parameters:
+            player_url (str): URL of the player's page.
+            competition (str): The competition the statistics belong to.
+            season (str): The season the statistics belong to.
+
+        Returns:
+            tuple[str, str, dict] | None: The fingerprint, player name and statistics,
+                or None if the player was never scraped.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fingerprint, player_name, stats FROM snapshots "
+                "WHERE player_url = ? AND competition = ? AND season = ?",
+                (player_url, competition, season)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], json.loads(row[2])
+
+    def record(self, player_url, competition, season, team_name, player_name, fingerprint, stats):
+        """
+        Stores the latest snapshot of a player for a competition and season.
+
+        Parameters:
+            player_url (str): URL of the player's page.
+            competition (str): The competition the statistics belong to.
+            season (str): The season the statistics belong to.
+            team_name (str): The player's team.
+            player_name (str): The player's name.
+            fingerprint (str): The fingerprint read from the page the statistics came from.
+            stats (dict): The player's statistics.
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (player_url, competition, season, team_name, player_name, fingerprint, json.dumps(stats), time.time())
+            )
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,427 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from data_manager import CURRENT_SEASON
+from instrumentation import metrics
+
+API_URL = "https://api.sofascore.com/api/v1"
+SITE_URL = "https://www.sofascore.com"
+
+# LaLiga and its 24/25 season, matching SofaScoreScraper.league_url
+LALIGA_TOURNAMENT_ID = 8
+LALIGA_SEASON_ID = 61643
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/130.0 Safari/537.36",
+    "Accept": "application/json",
+}
+
+
+class SofaScoreApiClient:
+    """
+    A client for SofaScore's JSON API built on a pooled keep-alive session.
+
+    Attributes:
+        base_url (str): Root of the API, e.g. a local replay server when testing.
+        session (requests.Session): Session reusing connections across requests.
+        max_concurrency (int): Maximum number of requests in flight at once.
+        record_dir (str | None): If set, every response is saved there under its path.
+        cache (PageCache | None): If set, responses are looked up there before requesting them.
+    """
+
+    def __init__(self, base_url=API_URL, pool_size=10, max_concurrency=4, timeout=15, record_dir=None, cache=None):
+        """
+        Initializes the client and its connection pool.
+
+        Parameters:
+            base_url (str): Root of the API.
+            pool_size (int): Number of keep-alive connections kept per host.
+            max_concurrency (int): Maximum number of requests in flight at once.
+            timeout (float): Seconds to wait for a response.
+            record_dir (str, optional): Directory to save responses to, for replaying
+                them later through `replay_server.ReplayServer`.
+            cache (PageCache, optional): Cache of JSON responses.
+        """
+        self.base_url = base_url.rstrip('/')
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.record_dir = record_dir
+        self.cache = cache
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+    def get_json(self, path):
+        """
+        Fetches an API path and decodes its JSON body.
+
+        Parameters:
+            path (str): Path relative to the API root, e.g. '/team/2829/players'.
+
+        Returns:
+            dict | None: The decoded body, or None if the resource does not exist.
+
+        Raises:
+            requests.HTTPError: If the API answers with an error other than 404.
+        """
+        url = self.base_url + path
+        if self.cache is not None:
+            cached = self.cache.get('api', url)
+            if cached is not None:
+                return json.loads(cached)
+
+        with self._slots, metrics.timed('api_request'):
+            response = self.session.get(url, timeout=self.timeout)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        payload = response.json()
+
+        if self.cache is not None:
+            self.cache.put('api', url, response.text)
+
+        if self.record_dir is not None:
+            record_path = os.path.join(self.record_dir, path.strip('/') + '.json')
+            os.makedirs(os.path.dirname(record_path), exist_ok=True)
+            with open(record_path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f)
+        return payload
+
+    def close(self):
+        """
+        Closes every pooled connection.
+        """
+        self.session.close()
+
+
+class ApiTeamScraper:
+    """
+    Retrieves the teams of a competition from the standings endpoint.
+
+    Attributes:
+        client (SofaScoreApiClient): Client used for the requests.
+        tournament_id (int): SofaScore id of the competition.
+        season_id (int): SofaScore id of the season.
+    """
+
+    def __init__(self, client, tournament_id=LALIGA_TOURNAMENT_ID, season_id=LALIGA_SEASON_ID):
+        """
+        Initializes the scraper with an API client and competition.
+
+        Parameters:
+            client (SofaScoreApiClient): Client used for the requests.
+            tournament_id (int): SofaScore id of the competition.
+            season_id (int): SofaScore id of the season.
+        """
+        self.client = client
+        self.tournament_id = tournament_id
+        self.season_id = season_id
+
+    def get_teams(self):
+        """
+        Retrieves the teams in the competition's standings.
+
+        Returns:
+            list[dict]: Team names, page URLs and SofaScore ids, in standings order.
+        """
+        payload = self.client.get_json(
+            f"/unique-tournament/{self.tournament_id}/season/{self.season_id}/standings/total"
+        )
+        teams = []
+        if not payload or not payload.get('standings'):
+            print("Error: no standings returned for this competition")
+            return teams
+
+        for row in payload['standings'][0]['rows']:
+            team = row['team']
+            teams.append({
+                'name': team['name'],
+                'url': f"{SITE_URL}/team/football/{team['slug']}/{team['id']}",
+                'id': team['id'],
+            })
+        return teams
+
+
+def _per_game(statistics, key, digits=1):
+    appearances = statistics.get('appearances') or 0
+    if not appearances:
+        return "0"
+    return f"{(statistics.get(key) or 0) / appearances:.{digits}f}"
+
+
+def _percentage(value):
+    return f"{round(value or 0)}%"
+
+
+def _ratio_percentage(part, whole):
+    return _percentage(100 * part / whole if whole else 0)
+
+
+def _count(statistics, key):
+    return str(statistics.get(key) or 0)
+
+
+def _decimal(statistics, key):
+    return f"{statistics.get(key) or 0:.2f}"
+
+
+def format_goalkeeper_stats(statistics):
+    """
+    Converts season statistics from the API into the goalkeeper columns of teams_data.
+
+    Values are formatted the way the player page shows them, so the output matches
+    what `PlayerScraper.scrape_goalkeeper_data` collects.
+
+    Parameters:
+        statistics (dict): The 'statistics' object of the season statistics endpoint.
+
+    Returns:
+        dict: The goalkeeper's statistics.
+    """
+    saves = statistics.get('saves') or 0
+    goals_conceded = statistics.get('goalsConceded') or 0
+    return {
+        'Games Played': _count(statistics, 'appearances'),
+        'Minutes Played': _per_game(statistics, 'minutesPlayed', 0),
+        'Goals Conceded Per Game': _per_game(statistics, 'goalsConceded'),
+        'Penalties Saved': statistics.get('penaltySave') or 0,
+        'Penalties Faced': statistics.get('penaltyFaced') or 0,
+        'Saves Per Game': _per_game(statistics, 'saves'),
+        'Saves Per Game Percentage': _ratio_percentage(saves, saves + goals_conceded),
+        'Goals Conceded': str(goals_conceded),
+        'Total Saves': str(saves),
+        'Goals Prevented': _decimal(statistics, 'goalsPrevented'),
+        'Passes Completed': _per_game(statistics, 'accuratePasses'),
+        'Percentage of Passes Completed': _percentage(statistics.get('accuratePassesPercentage')),
+        'Clean Sheets': _count(statistics, 'cleanSheet'),
+        'Errors leading to shot': _count(statistics, 'errorLeadToShot'),
+        'Errors leading to goal': _count(statistics, 'errorLeadToGoal')
+    }
+
+
+def format_field_player_stats(statistics):
+    """
+    Converts season statistics from the API into the field player columns of teams_data.
+
+    Values are formatted the way the player page shows them, so the output matches
+    what `PlayerScraper.scrape_field_player_data` collects.
+
+    Parameters:
+        statistics (dict): The 'statistics' object of the season statistics endpoint.
+
+    Returns:
+        dict: The field player's statistics.
+    """
+    return {
+        'Games Played': _count(statistics, 'appearances'),
+        'Minutes Played': _per_game(statistics, 'minutesPlayed', 0),
+        'Goals': _count(statistics, 'goals'),
+        'Expected Goals (xG)': _decimal(statistics, 'expectedGoals'),
+        'Big Chances Missed': _count(statistics, 'bigChancesMissed'),
+        'Shots Per Game': _per_game(statistics, 'totalShots'),
+        'Shots on Target Per Game': _per_game(statistics, 'shotsOnTarget'),
+        'Assists': _count(statistics, 'assists'),
+        'Expected Assists (xA)': _decimal(statistics, 'expectedAssists'),
+        'Big Chances Created': _count(statistics, 'bigChancesCreated'),
+        'Key Passes Per Game': _per_game(statistics, 'keyPasses'),
+        'Passes Completed Per Game': _per_game(statistics, 'accuratePasses'),
+        'Pass Completion Percentage': _percentage(statistics.get('accuratePassesPercentage')),
+        'Succesful Passes Opp. Half': _per_game(statistics, 'accurateOppositionHalfPasses'),
+        'Succesful Passes Opp. Half Percentage': _ratio_percentage(
+            statistics.get('accurateOppositionHalfPasses') or 0, statistics.get('totalOppositionHalfPasses') or 0
+        ),
+        'Succesful Long Balls': _per_game(statistics, 'accurateLongBalls'),
+        'Succesful Long Balls Percentage': _percentage(statistics.get('accurateLongBallsPercentage')),
+        'Successful Dribbles Per Game': _per_game(statistics, 'successfulDribbles'),
+        'Total Duels Won Per Game': _per_game(statistics, 'totalDuelsWon'),
+        'Total Duels Won Percentage': _percentage(statistics.get('totalDuelsWonPercentage')),
+        'Ground Duels Won Per Game': _per_game(statistics, 'groundDuelsWon'),
+        'Ground Duels Won Percentage': _percentage(statistics.get('groundDuelsWonPercentage')),
+        'Aerial Duels Won Per Game': _per_game(statistics, 'aerialDuelsWon'),
+        'Aerial Duels Won Percentage': _percentage(statistics.get('aerialDuelsWonPercentage')),
+        'Interceptions Per Game': _per_game(statistics, 'interceptions'),
+        'Tackles Per Game': _per_game(statistics, 'tackles'),
+        'Possession Won Opp. Half': _per_game(statistics, 'possessionWonAttThird'),
+        'Balls Recovered Per Game': _per_game(statistics, 'ballRecovery'),
+        'Dribbled Past Per Game': _per_game(statistics, 'dribbledPast'),
+        'Clearances Per Game': _per_game(statistics, 'clearances'),
+        'Possession Lost Per Game': _per_game(statistics, 'possessionLost'),
+        'Fouls Committed Per Game': _per_game(statistics, 'fouls'),
+        'Fouls Received Per Game': _per_game(statistics, 'wasFouled'),
+        'Offsides Per Game': _per_game(statistics, 'offsides')
+    }
+
+
+class ApiPlayerScraper:
+    """
+    Retrieves squads and per-competition season statistics from the JSON API.
+
+    Fills `teams_data` with the same structure as `PlayerScraper`, so the results
+    can be passed to `create_dataframe` unchanged.
+
+    Attributes:
+        client (SofaScoreApiClient): Client used for the requests.
+        tournament_id (int): SofaScore id of the competition.
+        season_id (int): SofaScore id of the season.
+        competition (str): Name the competition is recorded under, as in the browser backend.
+        season (str): Season the statistics are recorded under, e.g. '24/25'.
+        teams_data (dict): A dictionary to store scraped team and player data.
+        checkpoint (CheckpointStore | None): If set, every finished player is recorded
+            there, and players it already holds are reloaded instead of requested.
+        sink (NDJSONSink | None): If set, every finished player is appended to it.
+    """
+
+    def __init__(self, client, tournament_id=LALIGA_TOURNAMENT_ID, season_id=LALIGA_SEASON_ID, checkpoint=None,
+                 sink=None, competition="LaLiga", season=CURRENT_SEASON):
+        """
+        Initializes the scraper with an API client and competition.
+
+        Parameters:
+            client (SofaScoreApiClient): Client used for the requests.
+            tournament_id (int): SofaScore id of the competition.
+            season_id (int): SofaScore id of the season.
+            checkpoint (CheckpointStore, optional): Store recording finished players.
+            sink (NDJSONSink, optional): Stream finished players are appended to.
+            competition (str): Name of the competition the ids refer to.
+            season (str): Label of the season the ids refer to.
+        """
+        self.client = client
+        self.tournament_id = tournament_id
+        self.season_id = season_id
+        self.competition = competition
+        self.season = season
+        self.checkpoint = checkpoint
+        self.sink = sink
+        self.teams_data = {}
+
+    def get_players(self, team_id):
+        """
+        Retrieves a team's squad.
+
+        Parameters:
+            team_id (int): SofaScore id of the team.
+
+        Returns:
+            list[dict]: Each player's name, SofaScore id, position and page URL.
+
+        Raises:
+            requests.RequestException: If the squad cannot be retrieved.
+        """
+        payload = self.client.get_json(f"/team/{team_id}/players") or {}
+        players = []
+        for entry in payload.get('players', []):
+            player = entry['player']
+            players.append({
+                'name': player['name'],
+                'id': player['id'],
+                'position': player.get('position', ''),
+                'link': f"{SITE_URL}/player/{player.get('slug', '')}/{player['id']}",
+            })
+        return players
+
+    def scrape_player(self, player):
+        """
+        Retrieves a player's statistics for the competition and season.
+
+        Parameters:
+            player (dict): A player as returned by `get_players`.
+
+        Returns:
+            dict | None: The player's statistics, or None if the player has none
+                for this competition and season.
+        """
+        payload = self.client.get_json(
+            f"/player/{player['id']}/unique-tournament/{self.tournament_id}/season/{self.season_id}/statistics/overall"
+        )
+        if not payload or 'statistics' not in payload:
+            print(f"No statistics for {player['name']} in this competition. Skipping to the next player...")
+            return None
+
+        print(f"Scraping {player['name']}")
+        if player['position'] == 'G':
+            return format_goalkeeper_stats(payload['statistics'])
+        return format_field_player_stats(payload['statistics'])
+
+    def scrape_players_data(self, team_name, team_id):
+        """
+        Scrapes every player in a team's squad concurrently.
+
+        Parameters:
+            team_name (str): Name under which the team is stored in teams_data.
+            team_id (int): SofaScore id of the team.
+
+        Returns:
+            bool: True if no player failed; players without statistics count as done.
+        """
+        if team_name not in self.teams_data:
+            self.teams_data[team_name] = {}
+
+        players = self.get_players(team_id)
+        completed = (self.checkpoint.completed_players(team_name, self.competition, self.season)
+                     if self.checkpoint is not None else {})
+        for player in players:
+            if player['link'] in completed:
+                player_name, stats = completed[player['link']]
+                self.teams_data[team_name][player_name] = stats
+        players = [player for player in players if player['link'] not in completed]
+
+        complete = True
+        with ThreadPoolExecutor(max_workers=self.client.max_concurrency) as executor:
+            results = executor.map(self._scrape_safely, players)
+            for player, (failed, stats) in zip(players, results):
+                if failed:
+                    complete = False
+                elif stats is not None:
+                    self.teams_data[team_name][player['name']] = stats
+                    if self.sink is not None:
+                        self.sink.write(team_name, player['name'], stats, player_url=player['link'])
+                    if self.checkpoint is not None:
+                        self.checkpoint.record_player(team_name, player['link'], player['name'], stats,
+                                                      self.competition, self.season)
+        return complete
+
+    def _scrape_safely(self, player):
+        # Returns whether the player failed along with the statistics, since None alone
+        # also means a player without statistics for the competition
+        try:
+            return False, self.scrape_player(player)
+        except Exception as e:
+            print(f"Error scraping {player['name']}'s data: {e}")
+            return True, None
+
+    def scrape_teams(self, teams):
+        """
+        Scrapes the given teams one after another.
+
+        Parameters:
+            teams (list[dict]): Teams as returned by ApiTeamScraper.get_teams().
+
+        Yields:
+            tuple[str, dict]: The team name and its scraped players.
+        """
+        for team in teams:
+            if self.checkpoint is not None and self.checkpoint.team_completed(team['name'], self.competition, self.season):
+                print(f"Reloading {team['name']} from checkpoint")
+                yield team['name'], self.checkpoint.load_team(team['name'], self.competition, self.season)
+                continue
+
+            print(f"Scraping players from: {team['name']}")
+            try:
+                complete = self.scrape_players_data(team['name'], team['id'])
+            except requests.RequestException as e:
+                # Only the squad request is unguarded; the team is left for a resumed run
+                print(f"Error retrieving {team['name']}'s squad: {e}. Skipping to the next team...")
+                self.teams_data.pop(team['name'], None)
+                continue
+            # A team with failed players is left open, so that a resumed run retries them
+            if self.checkpoint is not None and complete:
+                self.checkpoint.record_team(team['name'], self.competition, self.season)
+            yield team['name'], self.teams_data.pop(team['name'], {})
@@ -1,7 +1,44 @@
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
+import json
+
+from instrumentation import metrics
+from page_state import PageNavigator
+from wait_engine import AdaptiveWait
+
+# Standings pages of the competitions the scraper knows, by the name shown in
+# the competition dropdown of player pages
+LEAGUE_URLS = {
+    'LaLiga': "https://www.sofascore.com/en-us/tournament/soccer/spain/laliga/8#id:61643",
+    'Premier League': "https://www.sofascore.com/en-us/tournament/soccer/england/premier-league/17",
+    'Serie A': "https://www.sofascore.com/en-us/tournament/soccer/italy/serie-a/23",
+    'Bundesliga': "https://www.sofascore.com/en-us/tournament/soccer/germany/bundesliga/35",
+    'Ligue 1': "https://www.sofascore.com/en-us/tournament/soccer/france/ligue-1/34",
+}
+
+STANDINGS_XPATH = '//*[@id="__next"]/main/div/div[3]/div/div[1]/div[1]/div[2]/div[1]/div/div[1]/div/div[2]'
+STANDINGS_ROW_XPATH = ".//a[@data-testid='standings_row']"
+TEAM_NAME_SELECTOR = ".Box.ljKzDM"
+LIST_VIEW_XPATH = '//*[@id="__next"]/main/div[2]/div/div[2]/div[1]/div[5]/div[1]/div[2]/label[2]/div'
+
+# Reads the name and link of every standings row in the browser, so that the
+# whole team list costs a single WebDriver command.
+READ_STANDINGS_SCRIPT = """
+const [tableXpath, rowXpath, nameSelector] = arguments;
+const table = document.evaluate(tableXpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+if (table === null) {
+    return [];
+}
+const rows = document.evaluate(rowXpath, table, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+const teams = [];
+for (let i = 0; i < rows.snapshotLength; i++) {
+    const row = rows.snapshotItem(i);
+    const name = row.querySelector(nameSelector);
+    teams.push({name: name === null ? null : name.innerText, url: row.href});
+}
+return teams;
+"""
 
 class SofaScoreScraper:
     """
@@ -11,24 +48,39 @@ class SofaScoreScraper:
         driver (webdriver.Chrome): The WebDriver instance to interact with the website.
         popup_handler (PopupHandler): Instance to manage popups during scraping.
         league_url (str): The URL of the LaLiga league page on SofaScore.
+        cache (PageCache | None): Cache consulted for the team list before navigating.
+        waits (AdaptiveWait): Wait engine for the elements the scraper needs.
+        navigator (PageNavigator): Tracks the loaded page, shared with the player scraper.
     """
-    def __init__(self, driver, popup_handler):
+    def __init__(self, driver, popup_handler, cache=None, waits=None, navigator=None):
         """
         Initializes the SofaScoreScraper with a WebDriver, popup handler, and league URL.
 
         Parameters:
             driver (webdriver.Chrome): The WebDriver instance for browser automation.
             popup_handler (PopupHandler): An instance to handle popups during scraping.
+            cache (PageCache, optional): Cache for the team list of the standings page.
+            waits (AdaptiveWait, optional): Wait engine shared with the other users of the
+                driver. A new one is created if not given.
+            navigator (PageNavigator, optional): Navigator shared with the other users of
+                the driver, so that it knows the standings page was loaded. A new one is
+                created if not given.
         """
         self.driver = driver
         self.popup_handler = popup_handler
-        self.league_url = "https://www.sofascore.com/en-us/tournament/soccer/spain/laliga/8#id:61643"
+        self.cache = cache
+        self.waits = waits if waits is not None else AdaptiveWait(driver)
+        self.navigator = navigator if navigator is not None else PageNavigator(driver, popup_handler)
+        self.league_url = LEAGUE_URLS['LaLiga']
     
+    @metrics.timed('standings')
     def get_teams(self):
         """
         Retrieves a list of teams in the LaLiga league.
 
-        Navigates to the LaLiga league page, closes any popups, and collects team names and URLs.
+        Navigates to the LaLiga league page, closes any popups, and collects team names and URLs
+        from every standings row with a single script evaluation.
+        A fresh team list in the cache is returned without navigating.
 
         Returns:
             list[dict]: A list of dictionaries containing team names and URLs.
@@ -37,43 +89,38 @@ class SofaScoreScraper:
             TimeoutException: If the teams element takes too long to load.
         """
 
-        self.driver.get(self.league_url)
+        if self.cache is not None:
+            cached = self.cache.get('standings', self.league_url)
+            if cached is not None:
+                return json.loads(cached)
+
+        self.navigator.navigate(self.league_url)
         self.popup_handler.cerrar_popup()
         teams = []
         try:
-            standings_element = WebDriverWait(self.driver, 30).until(
-                EC.presence_of_element_located(
-                    (By.XPATH, '//*[@id="__next"]/main/div/div[3]/div/div[1]/div[1]/div[2]/div[1]/div/div[1]/div/div[2]')
-                )
-            )
+            self.waits.until('standings', EC.presence_of_element_located((By.XPATH, STANDINGS_XPATH)))
             #//*[@id="__next"]/main/div/div[3]/div/div[1]/div[1]/div[2]/div[1]/div/div[1]/div/div[2]/div/a[1]/div/div[2]
             #//*[@id="__next"]/main/div/div[3]/div/div[1]/div[1]/div[2]/div[1]/div/div[1]/div/div[2]/div/a[2]/div/div[2]
-            rows = standings_element.find_elements(By.XPATH, ".//a[@data-testid='standings_row']")
-            for row in rows:
-                team_name = row.find_element(By.CLASS_NAME, "Box.ljKzDM").text
-                team_url = row.get_attribute('href')
-                teams.append({'name': team_name, 'url': team_url})
+            rows = self.driver.execute_script(READ_STANDINGS_SCRIPT, STANDINGS_XPATH, STANDINGS_ROW_XPATH, TEAM_NAME_SELECTOR)
+            teams = [{'name': row['name'], 'url': row['url']} for row in rows if row['name']]
         except TimeoutException:
             print("Error: el elemento no estuvo disponible a tiempo")
+
+        if self.cache is not None and teams:
+            self.cache.put('standings', self.league_url, json.dumps(teams))
         return teams
     
-    def switch_to_list_view(self, team_url):
+    @metrics.timed('list_view')
+    def switch_to_list_view(self):
         """
-        Switches the page view to list view for a specific team.
+        Switches the team page currently loaded to list view.
 
-        Parameters:
-            team_url (str): The URL of the team's page.
-
-        Raises:
-            TimeoutException: If the list view button takes too long to load or click.
+        The page has to be loaded by the caller; it is not navigated to again.
         """
-        
-        self.driver.get(team_url)
         try:
-            list_view_button = WebDriverWait(self.driver, 30).until(
-                EC.element_to_be_clickable(
-                    (By.XPATH, '//*[@id="__next"]/main/div[2]/div/div[2]/div[1]/div[5]/div[1]/div[2]/label[2]/div')
-                )
+            list_view_button = self.waits.until(
+                'list_view_button',
+                EC.element_to_be_clickable((By.XPATH, LIST_VIEW_XPATH))
             )
             list_view_button.click()
         except Exception as e:
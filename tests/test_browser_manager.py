@@ -0,0 +1,43 @@
+import json
+
+from browser_manager import TrafficMeter, report_traffic
+
+
+class LoggingDriver:
+    """
+    Stands in for a Chrome driver whose performance log holds one finished request per page load.
+    """
+
+    def __init__(self, sizes):
+        self.sizes = sizes
+        self.log = []
+
+    def execute(self, driver_command, params=None):
+        self.log = [{'message': json.dumps({'message': {
+            'method': 'Network.loadingFinished', 'params': {'encodedDataLength': self.sizes[params['url']]}
+        }})}]
+
+    def get_log(self, kind):
+        log, self.log = self.log, []
+        return log
+
+
+def test_report_lists_the_heaviest_pages(capsys):
+    sizes = {'standings': 400 * 1024, 'team': 200 * 1024, 'player/1': 120 * 1024, 'player/2': 300 * 1024}
+    meters = []
+    for urls in (['standings', 'team', 'player/1'], ['player/2', 'player/1']):
+        driver = LoggingDriver(sizes)
+        meter = TrafficMeter(driver)
+        for url in urls:
+            driver.execute('get', {'url': url})
+        meters.append(meter)
+
+    report_traffic(meters, top=3)
+
+    assert capsys.readouterr().out.splitlines() == [
+        "Transferred 1140 KB over 5 pages (228 KB per page, profile 'default')",
+        "Heaviest pages:",
+        "         400 KB  standings",
+        "         300 KB  player/2",
+        "         240 KB  player/1",
+    ]
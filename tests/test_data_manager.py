@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+from data_manager import create_dataframe, convert_stat_columns
+
+
+def test_converts_text_statistics():
+    df = create_dataframe({'Real Madrid': {
+        'Thibaut Courtois': {'Games Played': '30', 'Penalties Saved': '2/5', 'Pass Completion Percentage': '81.5%'},
+        'Vinicius Junior': {'Games Played': '1,024', 'Goals': '-', 'Pass Completion Percentage': '79%'},
+    }})
+
+    typed = convert_stat_columns(df)
+
+    courtois = typed.loc[('Real Madrid', 'Thibaut Courtois')]
+    vinicius = typed.loc[('Real Madrid', 'Vinicius Junior')]
+    assert courtois['Games Played'] == 30
+    assert courtois['Penalties Saved'] == 2
+    assert courtois['Penalties Faced'] == 5
+    assert courtois['Pass Completion Percentage'] == np.float32(81.5)
+    assert vinicius['Games Played'] == 1024
+    assert pd.isna(vinicius['Goals'])
+    assert str(typed['Games Played'].dtype) == 'Int16'
+    assert typed['Pass Completion Percentage'].dtype == np.float32
+
+
+def test_converts_a_table_without_players():
+    df = create_dataframe({})
+
+    typed = convert_stat_columns(df)
+
+    assert typed.empty
+    assert list(typed.columns) == list(df.columns)
+    assert list(typed.index.names) == ['Team', 'Player Name']
+    assert str(typed['Games Played'].dtype) == 'Int16'
+    assert typed['Pass Completion Percentage'].dtype == np.float32
+
@@ -0,0 +1,46 @@
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from data_manager import CURRENT_SEASON
+from db_loader import load_csv, load_players
+
+
+def players(goals):
+    df = pd.DataFrame({
+        'Team': ['Real Madrid', 'Real Madrid', 'Barcelona'],
+        'Player Name': ['Vinicius Junior', 'Jude Bellingham', 'Lamine Yamal'],
+        'Goals': goals,
+        'Accurate Passes %': [81.5, 89.0, None],
+    })
+    return df.set_index(['Team', 'Player Name'])
+
+
+def stored(engine):
+    with engine.connect() as conn:
+        return conn.execute(text(
+            'SELECT "Team", "Player Name", "Season", "Goals" FROM player_data ORDER BY "Player Name"'
+        )).fetchall()
+
+
+def test_reload_updates_only_changed_rows(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'players.db'}")
+
+    assert load_players(engine, players([11, 9, 6])) == 3
+    assert load_players(engine, players([11, 9, 6])) == 0
+    assert load_players(engine, players([12, 9, 6])) == 1
+
+    assert stored(engine) == [
+        ('Real Madrid', 'Jude Bellingham', CURRENT_SEASON, 9.0),
+        ('Barcelona', 'Lamine Yamal', CURRENT_SEASON, 6.0),
+        ('Real Madrid', 'Vinicius Junior', CURRENT_SEASON, 12.0),
+    ]
+
+
+def test_seasons_are_kept_apart(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'players.db'}")
+    csv_path = tmp_path / 'players_data.csv'
+    players([11, 9, 6]).to_csv(csv_path)
+
+    assert load_csv(engine, str(csv_path), season='23/24') == 3
+    assert load_csv(engine, str(csv_path)) == 3
+    assert len(stored(engine)) == 6
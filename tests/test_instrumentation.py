@@ -0,0 +1,65 @@
+import json
+
+from instrumentation import Histogram, Instrumentation
+
+
+class FakeDriver:
+    def execute(self, driver_command, params=None):
+        return {'value': driver_command}
+
+
+def test_histogram_quantiles_are_bucket_bounds():
+    histogram = Histogram(buckets=(0.1, 1, 10))
+    for seconds in (0.05, 0.5, 0.5, 5, 50):
+        histogram.observe(seconds)
+
+    assert histogram.counts == [1, 2, 1, 1]
+    assert histogram.quantile(0.5) == 1
+    assert histogram.quantile(0.8) == 10
+    assert histogram.quantile(1.0) == float('inf')
+    assert Histogram().quantile(0.5) is None
+
+
+def test_commands_are_attributed_to_the_scope(tmp_path):
+    metrics = Instrumentation()
+    driver = metrics.instrument_driver(FakeDriver())
+
+    with metrics.scope(team='Real Madrid'):
+        driver.execute('get', {'url': 'team/2829'})
+        with metrics.scope(player='player/868812'), metrics.timed('player'):
+            driver.execute('executeScript')
+            driver.execute('executeScript')
+    driver.execute('quit')
+    metrics.milestone('first_team_page')
+    metrics.milestone('first_team_page')
+
+    summary = metrics.summary()
+    assert summary['total_commands'] == 4
+    assert summary['commands']['executeScript']['count'] == 2
+    assert summary['team_commands'] == {'Real Madrid': 3}
+    assert summary['player_commands'] == {'player/868812': 2}
+    assert summary['phases']['player']['count'] == 1
+    assert list(summary['milestones']) == ['first_team_page']
+
+    metrics.write(str(tmp_path))
+    with open(tmp_path / 'metrics.json', encoding='utf-8') as f:
+        assert json.load(f)['team_commands'] == {'Real Madrid': 3}
+    prometheus = (tmp_path / 'metrics.prom').read_text(encoding='utf-8').splitlines()
+    assert 'scraper_webdriver_command_seconds_count{command="executeScript"} 2' in prometheus
+    assert 'scraper_webdriver_command_seconds_bucket{command="executeScript",le="+Inf"} 2' in prometheus
+    assert 'scraper_team_webdriver_commands_total{team="Real Madrid"} 3' in prometheus
+    assert not any('868812' in line for line in prometheus)
+
+
+def test_disabled_instrumentation_records_nothing():
+    metrics = Instrumentation(enabled=False)
+    driver = metrics.instrument_driver(FakeDriver())
+
+    with metrics.timed('player'):
+        assert driver.execute('get') == {'value': 'get'}
+    metrics.milestone('first_team_page')
+
+    summary = metrics.summary()
+    assert summary['total_commands'] == 0
+    assert summary['phases'] == {}
+    assert summary['milestones'] == {}
@@ -0,0 +1,106 @@
+import threading
+import time
+
+from data_manager import COLUMNS
+from job_queue import JobQueue
+from queue_worker import QueueWorker
+
+
+class FakeWorker:
+    """
+    Stands in for a ScraperWorker, recording which players it scraped.
+    """
+
+    def __init__(self, scraped, delay=0.0):
+        self.scraped = scraped
+        self.delay = delay
+        self.navigator = self
+
+    def scrape_player(self, player, team_name, competition, season):
+        time.sleep(self.delay)
+        self.scraped.append(player['link'])
+        return {player['link'].rsplit('/', 1)[-1]: {'Goals': '1'}}
+
+    def invalidate(self):
+        pass
+
+    def quit(self):
+        pass
+
+
+def player_payload(index):
+    return {'competition': 'LaLiga', 'season': '24/25', 'priority': 0, 'team_name': 'Team',
+            'player': {'link': f"https://www.sofascore.com/player/p{index}", 'position': 'F'}}
+
+
+def seed_players(path, count, lease_seconds):
+    queue = JobQueue(path, lease_seconds=lease_seconds, base_delay=0)
+    for index in range(count):
+        queue.add('player', player_payload(index))
+    return queue
+
+
+def run_worker(path, worker_id, scraped, lease_seconds, delay=0.0):
+    queue = JobQueue(path, lease_seconds=lease_seconds, base_delay=0)
+    worker = QueueWorker(queue, worker_id=worker_id, worker=FakeWorker(scraped, delay),
+                         heartbeat_interval=lease_seconds / 4, poll_interval=0.05)
+    worker.run()
+    queue.close()
+    return worker
+
+
+def attempts(queue):
+    return dict(queue._conn.execute("SELECT id, attempts FROM tasks").fetchall())
+
+
+def test_expired_lease_is_reclaimed_once(tmp_path):
+    path = str(tmp_path / "queue.db")
+    queue = seed_players(path, 3, lease_seconds=0.5)
+
+    # A worker that dies right after claiming never renews or releases its lease
+    crashed = JobQueue(path, lease_seconds=0.5)
+    task = crashed.claim('crashed')
+
+    scraped = []
+    threads = [threading.Thread(target=run_worker, args=(path, f"w{i}", scraped, 0.5)) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+
+    assert sorted(scraped) == sorted(player_payload(i)['player']['link'] for i in range(3))
+    assert attempts(queue) == {1: 2, 2: 1, 3: 1}
+    assert queue.counts() == {'player': {'done': 3}}
+    assert len(queue.load_results('LaLiga', '24/25')) == 3
+
+    # The crashed worker coming back late cannot complete the task a second time
+    assert not crashed.complete(task['id'], 'crashed', [])
+    assert not crashed.heartbeat(task['id'], 'crashed')
+    crashed.close()
+    queue.close()
+
+
+def test_heartbeat_keeps_a_long_task_leased(tmp_path):
+    path = str(tmp_path / "queue.db")
+    queue = seed_players(path, 2, lease_seconds=0.3)
+
+    scraped = []
+    # Every task takes several leases to finish, so only the heartbeats keep it from being reclaimed
+    threads = [threading.Thread(target=run_worker, args=(path, f"w{i}", scraped, 0.3, 1.0)) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+
+    assert sorted(scraped) == sorted(player_payload(i)['player']['link'] for i in range(2))
+    assert attempts(queue) == {1: 1, 2: 1}
+    queue.close()
+
+
+def test_load_results_without_results(tmp_path):
+    queue = JobQueue(str(tmp_path / "queue.db"))
+    players = queue.load_results('LaLiga', '24/25')
+    assert players.empty
+    assert list(players.columns) == COLUMNS
+    assert list(players.index.names) == ['Team', 'Player Name']
+    queue.close()
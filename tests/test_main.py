@@ -0,0 +1,33 @@
+import pandas as pd
+import pytest
+
+from data_manager import PlayerStatsAccumulator
+from main import open_checkpoint, write_partial
+
+
+def test_partial_dump_keeps_replaced_players(tmp_path):
+    path = str(tmp_path / 'partial_player_data.csv')
+    accumulator = PlayerStatsAccumulator()
+    accumulator.add_team('Real Madrid', {'Vinicius Junior': {'Games Played': '10', 'Goals': '5'}})
+    write_partial(accumulator, path)
+
+    accumulator.add_team('Barcelona', {'Lamine Yamal': {'Games Played': '9', 'Goals': '3'}})
+    # A retry stores a player scraped before the last dump again
+    accumulator.add_player('Real Madrid', 'Vinicius Junior', {'Games Played': '11', 'Goals': '6'})
+    write_partial(accumulator, path)
+
+    saved = pd.read_csv(path, index_col=['Team', 'Player Name'])
+    assert len(saved) == 2
+    assert saved.loc[('Real Madrid', 'Vinicius Junior'), 'Goals'] == 6
+    assert saved.loc[('Barcelona', 'Lamine Yamal'), 'Games Played'] == 9
+    assert list(tmp_path.iterdir()) == [tmp_path / 'partial_player_data.csv']
+
+
+def test_checkpoint_is_only_opened_when_enabled(tmp_path):
+    assert open_checkpoint(None, resume=False) is None
+    with pytest.raises(ValueError):
+        open_checkpoint(None, resume=True)
+
+    checkpoint = open_checkpoint(str(tmp_path / 'scrape_checkpoint.db'), resume=False)
+    checkpoint.close()
+    assert list(tmp_path.iterdir()) == [tmp_path / 'scrape_checkpoint.db']
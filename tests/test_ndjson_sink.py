@@ -0,0 +1,57 @@
+import os
+import signal
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from ndjson_sink import NDJSONSink, read_records, write_csv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Writes a synced batch, then keeps writing without syncing until it is killed
+CRASHING_WRITER = textwrap.dedent("""
+    import os, signal, sys
+    sys.path.insert(0, {root!r})
+    from ndjson_sink import NDJSONSink
+
+    sink = NDJSONSink({path!r}, append=False, fsync_every=10, fsync_interval=3600)
+    for i in range(10):
+        sink.write('Team', f'synced {{i}}', {{'Goals': str(i)}}, 'LaLiga', '24/25')
+    sink.fsync_every = 10 ** 9
+    for i in range(5000):
+        sink.write('Team', f'unsynced {{i}}', {{'Goals': str(i), 'Padding': os.urandom(16).hex()}}, 'LaLiga', '24/25')
+    os.kill(os.getpid(), signal.SIGKILL)
+""")
+
+
+def crash_writer(path):
+    process = subprocess.run([sys.executable, '-c', CRASHING_WRITER.format(root=ROOT, path=str(path))])
+    assert process.returncode == -signal.SIGKILL
+
+
+@pytest.mark.parametrize('name', ['players.ndjson', 'players.ndjson.gz'])
+def test_resume_after_crash(tmp_path, name):
+    path = tmp_path / name
+    crash_writer(path)
+
+    with NDJSONSink(str(path), append=True) as sink:
+        for i in range(3):
+            sink.write('Team', f'resumed {i}', {'Goals': str(i)}, 'LaLiga', '24/25')
+
+    players = [record['player'] for record in read_records(str(path))]
+    assert players[:10] == [f'synced {i}' for i in range(10)]
+    assert players[-3:] == [f'resumed {i}' for i in range(3)]
+    unsynced = players[10:-3]
+    assert unsynced == [f'unsynced {i}' for i in range(len(unsynced))]
+
+    assert write_csv(str(path), str(tmp_path / 'players.csv')) == len(players)
+
+
+def test_read_stops_at_unfinished_member(tmp_path):
+    path = tmp_path / 'players.ndjson.gz'
+    crash_writer(path)
+
+    players = [record['player'] for record in read_records(str(path))]
+    assert players[:10] == [f'synced {i}' for i in range(10)]
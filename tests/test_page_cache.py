@@ -0,0 +1,63 @@
+import pytest
+
+import page_cache
+from page_cache import PageCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(page_cache.time, 'time', clock)
+    return clock
+
+
+def test_entries_expire_after_their_kind_ttl(tmp_path, clock):
+    cache = PageCache(str(tmp_path), ttls={'player': 60, 'archive': 600})
+    cache.put('player', 'player/1', '<html>24/25</html>', 'LaLiga', '24/25')
+    cache.put('archive', 'player/1', '<html>23/24</html>', 'LaLiga', '23/24')
+
+    clock.now += 60
+    assert cache.get('player', 'player/1', 'LaLiga', '24/25') == '<html>24/25</html>'
+    clock.now += 1
+    assert cache.get('player', 'player/1', 'LaLiga', '24/25') is None
+    assert cache.get('archive', 'player/1', 'LaLiga', '23/24') == '<html>23/24</html>'
+    # Unknown kinds are never fresh
+    assert cache.get('unknown', 'player/1', 'LaLiga', '23/24') is None
+
+    assert cache.stats() == {
+        'archive': {'hits': 1, 'misses': 0, 'hit_ratio': 1.0},
+        'player': {'hits': 1, 'misses': 1, 'hit_ratio': 0.5},
+        'unknown': {'hits': 0, 'misses': 1, 'hit_ratio': 0.0},
+    }
+    cache.close()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    cache = PageCache(str(tmp_path), max_bytes=25)
+    cache.put('team', 'team/1', 'a' * 10)
+    clock.now += 1
+    cache.put('team', 'team/2', 'b' * 10)
+    clock.now += 1
+    # Reading the first team makes the second one the least recently used
+    assert cache.get('team', 'team/1') == 'a' * 10
+    clock.now += 1
+    cache.put('team', 'team/3', 'c' * 10)
+
+    assert cache.get('team', 'team/2') is None
+    assert cache.get('team', 'team/1') == 'a' * 10
+    assert cache.get('team', 'team/3') == 'c' * 10
+    cache.close()
+
+    # The index survives reopening the cache
+    reopened = PageCache(str(tmp_path), max_bytes=25)
+    assert reopened.get('team', 'team/3') == 'c' * 10
+    assert reopened.get('team', 'team/2') is None
+    reopened.close()
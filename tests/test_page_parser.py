@@ -0,0 +1,74 @@
+import json
+import os
+
+import pytest
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+from page_parser import MANIFEST_FILE, PageParserPool, parse_player_page, reparse_directory
+from player_stats import BatchStatReader, LiveStatReader, parse_field_player, parse_goalkeeper
+from replay_server import ReplayServer
+
+PAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'pages')
+PLAYERS = [('field_player', 'Forward', parse_field_player), ('goalkeeper', 'Goalkeeper', parse_goalkeeper)]
+
+
+def page_source(name):
+    with open(os.path.join(PAGES, f"{name}.html"), encoding='utf-8') as f:
+        return f.read()
+
+
+class RenderedDriver:
+    """
+    Answers the statistics script with the text the browser renders for every cell of a fixture page.
+    """
+
+    def __init__(self, name):
+        with open(os.path.join(PAGES, f"{name}.rendered.json"), encoding='utf-8') as f:
+            self.rendered = json.load(f)
+
+    def execute_script(self, script, *args):
+        return self.rendered
+
+
+@pytest.mark.parametrize('name, position, parse', PLAYERS)
+def test_captured_page_parses_like_the_rendered_page(name, position, parse):
+    expected = parse(BatchStatReader(RenderedDriver(name)))
+    assert expected[1]['Games Played'] == '30'
+
+    assert parse_player_page(page_source(name), position) == expected
+
+
+@pytest.mark.parametrize('name, position, parse', PLAYERS)
+def test_captured_page_parses_like_the_live_reader(name, position, parse):
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless=new')
+    try:
+        driver = webdriver.Chrome(options=options)
+    except WebDriverException as e:
+        pytest.skip(f"No browser to compare against: {type(e).__name__}")
+
+    try:
+        with ReplayServer(PAGES) as server:
+            driver.get(f"{server.url}/{name}.html")
+            assert parse_player_page(driver.page_source, position) == parse(LiveStatReader(driver))
+    finally:
+        driver.quit()
+
+
+def test_manifest_keeps_competition_and_season(tmp_path):
+    pool = PageParserPool(max_workers=1, html_dir=str(tmp_path))
+    link = 'https://www.sofascore.com/player/vinicius-junior/868812'
+    pool.submit('Real Madrid', link, 'Forward', page_source('field_player'), 'LaLiga', '24/25')
+    pool.submit('Real Madrid', link, 'Forward', page_source('field_player'), 'LaLiga', '23/24')
+    pool.close()
+
+    with open(tmp_path / MANIFEST_FILE, encoding='utf-8') as f:
+        entries = [json.loads(line) for line in f]
+    assert [(entry['competition'], entry['season']) for entry in entries] == [('LaLiga', '24/25'), ('LaLiga', '23/24')]
+    # Each season's page is kept in its own file
+    assert len({entry['file'] for entry in entries}) == 2
+
+    teams_data = reparse_directory(str(tmp_path), max_workers=1, competition='LaLiga', season='23/24')
+    assert list(teams_data['Real Madrid']) == ['Vinícius Júnior']
+    assert reparse_directory(str(tmp_path), max_workers=1, competition='Premier League', season='23/24') == {}
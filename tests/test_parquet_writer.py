@@ -0,0 +1,57 @@
+import glob
+import os
+
+import numpy as np
+import pytest
+
+from data_manager import create_dataframe
+from parquet_writer import read_players, write_partitioned
+
+
+def players(goals=('11', '3')):
+    return create_dataframe({
+        'Real Madrid': {'Vinicius Junior': {'Games Played': '30', 'Goals': goals[0], 'Pass Completion Percentage': '85%'}},
+        'Barcelona': {'Lamine Yamal': {'Games Played': '32', 'Goals': goals[1], 'Pass Completion Percentage': '79%'}},
+    })
+
+
+def test_round_trip_keeps_values_and_types(tmp_path):
+    write_partitioned(players(), str(tmp_path), competition='LaLiga', season='24/25')
+
+    read = read_players(str(tmp_path))
+
+    assert sorted(read.index) == [('Barcelona', 'Lamine Yamal'), ('Real Madrid', 'Vinicius Junior')]
+    assert read.loc[('Real Madrid', 'Vinicius Junior'), 'Goals'] == 11
+    assert read.loc[('Barcelona', 'Lamine Yamal'), 'Pass Completion Percentage'] == pytest.approx(79)
+    assert str(read['Games Played'].dtype) == 'Int16'
+    assert read['Pass Completion Percentage'].dtype == np.float32
+    assert set(read['Season'].astype(str)) == {'24/25'}
+
+
+def test_rewriting_a_team_replaces_its_partition(tmp_path):
+    write_partitioned(players(), str(tmp_path))
+    write_partitioned(players(goals=('12', '3')), str(tmp_path))
+
+    read = read_players(str(tmp_path), columns=['Goals'])
+
+    assert len(read) == 2
+    assert read.loc[('Real Madrid', 'Vinicius Junior'), 'Goals'] == 12
+
+
+def test_filters_skip_other_partitions(tmp_path):
+    write_partitioned(players(), str(tmp_path), competition='LaLiga', season='24/25')
+    write_partitioned(players(), str(tmp_path), competition='LaLiga', season='23/24')
+    # Partitions the filters rule out are never opened, so breaking them does not matter. The
+    # first file found is kept intact, since the dataset reads its schema from that one.
+    paths = sorted(glob.glob(os.path.join(str(tmp_path), '**', '*.parquet'), recursive=True))
+    wanted = [path for path in paths if 'Season=24%2F25' in path and 'Team=Real%20Madrid' in path]
+    assert len(paths) == 4 and len(wanted) == 1 and paths[0] != wanted[0]
+    for path in paths[1:]:
+        if path != wanted[0]:
+            with open(path, 'wb') as f:
+                f.write(b'not parquet')
+
+    read = read_players(str(tmp_path), columns=['Goals'], teams=['Real Madrid'], competition='LaLiga', season='24/25')
+
+    assert list(read.index) == [('Real Madrid', 'Vinicius Junior')]
+    assert list(read.columns) == ['Goals']
@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+
+from data_manager import convert_stat_columns, create_dataframe
+from player_metrics import MetricsEngine, per90_table, team_aggregates
+
+
+def players(real_madrid_goals='3'):
+    return convert_stat_columns(create_dataframe({
+        'Real Madrid': {
+            'Vinicius Junior': {'Games Played': '10', 'Minutes Played': '90', 'Goals': real_madrid_goals},
+            'Jude Bellingham': {'Games Played': '8', 'Minutes Played': '90', 'Goals': '2'},
+            'Arda Guler': {'Games Played': '5', 'Minutes Played': '60', 'Goals': '0'},
+        },
+        'Barcelona': {
+            'Lamine Yamal': {'Games Played': '4', 'Minutes Played': '45', 'Goals': '1'},
+        },
+    }))
+
+
+def test_team_rates_are_per_90_match_minutes():
+    df = players()
+
+    teams = team_aggregates(per90_table(df), df)
+
+    real_madrid = teams.loc[('Real Madrid',)]
+    assert real_madrid['Players'] == 3
+    assert real_madrid['Minutes'] == 900 + 720 + 300
+    assert real_madrid['Match Minutes'] == 10 * 90
+    assert real_madrid['Goals'] == 5
+    assert real_madrid['Goals per 90'] == pytest.approx(5 * 90 / 900)
+    barcelona = teams.loc[('Barcelona',)]
+    assert barcelona['Match Minutes'] == 4 * 90
+    assert barcelona['Goals per 90'] == pytest.approx(1 * 90 / 360)
+
+
+def test_engine_recomputes_only_changed_teams():
+    engine = MetricsEngine(min_minutes=0)
+
+    assert sorted(engine.update(players())) == [('Barcelona',), ('Real Madrid',)]
+    assert engine.update(players()) == []
+    assert engine.update(players(real_madrid_goals='4')) == [('Real Madrid',)]
+
+    fresh = MetricsEngine(min_minutes=0)
+    fresh.update(players(real_madrid_goals='4'))
+    pd.testing.assert_frame_equal(engine.per90.sort_index(), fresh.per90.sort_index())
+    pd.testing.assert_frame_equal(engine.teams.sort_index(), fresh.teams.sort_index())
+    pd.testing.assert_frame_equal(engine.percentiles.sort_index(), fresh.percentiles.sort_index())
+    assert engine.teams.loc[('Real Madrid',), 'Goals'] == 6
+
+    # A team missing from the table is dropped
+    df = players()
+    assert engine.update(df[df.index.get_level_values('Team') == 'Real Madrid']) == [('Real Madrid',)]
+    assert list(engine.teams.index) == [('Real Madrid',)]
+    assert set(engine.per90.index.get_level_values('Team')) == {'Real Madrid'}
@@ -0,0 +1,83 @@
+import os
+
+import pytest
+import requests
+
+from data_manager import convert_stat_columns, create_dataframe
+from parquet_writer import write_partitioned
+from query_service import PlayerIndex, QueryServer
+
+
+def players(vinicius_goals='11'):
+    return convert_stat_columns(create_dataframe({
+        'Real Madrid': {
+            'Vinicius Junior': {'Goals': vinicius_goals, 'Expected Goals (xG)': '13.47'},
+            'Jude Bellingham': {'Goals': '9', 'Expected Goals (xG)': '0.3'},
+        },
+        'Barcelona': {
+            'Lamine Yamal': {'Goals': '6', 'Expected Goals (xG)': '5.1'},
+            'Pedri': {'Goals': None},
+        },
+    }))
+
+
+@pytest.fixture
+def sources(tmp_path):
+    csv_path = str(tmp_path / 'players_data.csv')
+    players().to_csv(csv_path)
+    parquet_dir = str(tmp_path / 'parquet')
+    write_partitioned(players(), parquet_dir, competition='LaLiga', season='23/24')
+    return [(csv_path, 'LaLiga', '24/25'), parquet_dir]
+
+
+def names(records):
+    return [(record['Player Name'], record['Season']) for record in records]
+
+
+def test_queries_use_the_indexes(sources):
+    index = PlayerIndex(sources)
+
+    assert names(index.top('Goals', k=3, season='24/25')) == [
+        ('Vinicius Junior', '24/25'), ('Jude Bellingham', '24/25'), ('Lamine Yamal', '24/25')
+    ]
+    # Missing values are left out of rankings
+    assert ('Pedri', '24/25') not in names(index.top('Goals', k=10, ascending=True))
+    assert names(index.range('Goals', low=6, high=9, team='Barcelona')) == [('Lamine Yamal', '24/25'),
+                                                                            ('Lamine Yamal', '23/24')]
+    team = index.team('Real Madrid', season='23/24')
+    assert sorted(names(team)) == [('Jude Bellingham', '23/24'), ('Vinicius Junior', '23/24')]
+    # Parquet holds float32, which must not come back widened
+    assert [record['Expected Goals (xG)'] for record in index.top('Expected Goals (xG)', k=2, ascending=True)] == [0.3, 0.3]
+
+    with pytest.raises(KeyError):
+        index.top('Unknown')
+    with pytest.raises(KeyError):
+        index.top('Goals', league='LaLiga')
+
+
+def test_results_follow_changes_on_disk(sources):
+    csv_path = sources[0][0]
+    index = PlayerIndex(sources[:1], check_interval=0)
+    assert index.top('Goals', k=1)[0]['Goals'] == 11
+
+    players(vinicius_goals='12').to_csv(csv_path)
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    assert index.top('Goals', k=1)[0]['Goals'] == 12
+
+
+def test_unlabelled_csv_cannot_be_mixed(sources):
+    with pytest.raises(ValueError):
+        PlayerIndex([sources[0][0], sources[1]])
+
+
+def test_http_endpoints(sources):
+    with QueryServer(PlayerIndex(sources)) as server:
+        top = requests.get(f"{server.url}/top", params={'column': 'Goals', 'k': 1, 'season': '23/24'}).json()
+        missing = requests.get(f"{server.url}/top", params={'column': 'Unknown'})
+        unknown = requests.get(f"{server.url}/players")
+
+    assert names(top) == [('Vinicius Junior', '23/24')]
+    assert missing.status_code == 400
+    assert unknown.status_code == 404
@@ -0,0 +1,88 @@
+import pytest
+
+import retry_queue
+from competition_error import PlayerScrapeError
+from retry_queue import CircuitBreaker, RetryQueue
+
+URL = "https://www.sofascore.com/player/vinicius-junior/868812"
+
+
+def entry(link=URL):
+    return {'player': {'link': link, 'position': 'F'}, 'team_name': 'Real Madrid',
+            'competition': 'LaLiga', 'season': '24/25'}
+
+
+@pytest.fixture
+def no_jitter(monkeypatch):
+    monkeypatch.setattr(retry_queue.random, 'uniform', lambda low, high: high)
+
+
+def test_retries_back_off_exponentially_up_to_the_bound(no_jitter):
+    retries = RetryQueue(max_attempts=4, base_delay=10, max_delay=25)
+
+    delays = []
+    for _ in range(3):
+        assert retries.defer(entry(), PlayerScrapeError("No statistics were found"))
+        delays.append(retries.wait_time())
+        retries._queue.clear()
+
+    assert delays == [pytest.approx(10, abs=0.5), pytest.approx(20, abs=0.5), pytest.approx(25, abs=0.5)]
+    # The fourth failure uses up the attempts
+    assert not retries.defer(entry(), PlayerScrapeError("No statistics were found"))
+    assert retries.failed[(URL, 'LaLiga', '24/25')]['errors'] == ["PlayerScrapeError: No statistics were found"] * 4
+
+
+def test_due_players_come_back_and_recover(no_jitter):
+    retries = RetryQueue(base_delay=0)
+    retries.defer(entry(), PlayerScrapeError("No statistics were found"))
+
+    assert len(retries) == 1
+    assert retries.pop_due() == entry()
+    retries.succeeded(entry())
+    assert retries.recovered == 1
+    assert retries.failed == {}
+
+
+def test_unexpected_errors_are_reported_as_bugs(capsys):
+    retries = RetryQueue()
+    retries.give_up(entry(), PlayerScrapeError("No statistics were found"))
+    try:
+        {}['Goals']
+    except KeyError as e:
+        retries.give_up(entry(URL + '0'), e)
+
+    retries.report()
+
+    assert retries.failed[(URL, 'LaLiga', '24/25')]['raised_at'] is None
+    assert 'test_retry_queue.py' in retries.failed[(URL + '0', 'LaLiga', '24/25')]['raised_at']
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0] == "Retries: 0 players recovered, 2 players failed (1 on unexpected errors)"
+    assert lines[1] == f"Failed {URL} (LaLiga 24/25) after 1 attempts:"
+    assert lines[3].startswith(f"Unexpected error on {URL}0 (LaLiga 24/25), likely a bug, raised at ")
+    assert lines[4] == "    KeyError: 'Goals'"
+
+
+def test_breaker_opens_and_probes(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(retry_queue.time, 'sleep', sleeps.append)
+    breaker = CircuitBreaker(window=4, threshold=0.5, min_calls=2, cooldown=10, max_cooldown=15)
+
+    breaker.record(URL, True)
+    breaker.record(URL, False)
+    assert breaker.trips == {'www.sofascore.com': 1}
+    breaker.before(URL)
+    assert sleeps[-1] == pytest.approx(10, abs=0.5)
+
+    # A failed probe opens the breaker again for twice the cooldown, up to the bound
+    breaker.record(URL, False)
+    assert breaker.trips == {'www.sofascore.com': 2}
+    breaker.before(URL)
+    assert sleeps[-1] == pytest.approx(15, abs=0.5)
+
+    # A successful probe closes it, and its history starts over
+    monkeypatch.setattr(retry_queue.time, 'monotonic', lambda: float('inf'))
+    breaker.record(URL, True)
+    breaker.record(URL, True)
+    breaker.before(URL)
+    assert len(sleeps) == 2
+    assert breaker.trips == {'www.sofascore.com': 2}
@@ -0,0 +1,80 @@
+from scheduler import CrawlJob, CrawlScheduler
+
+STANDINGS = {
+    'current': [{'name': 'Alaves', 'url': 'team/alaves'}, {'name': 'Betis', 'url': 'team/betis'}],
+    'previous': [{'name': 'Alaves', 'url': 'team/alaves'}, {'name': 'Betis', 'url': 'team/betis'}],
+}
+SQUADS = {
+    'team/alaves': [],
+    'team/betis': [{'link': 'player/isco', 'position': 'M'}, {'link': 'player/fekir', 'position': 'M'}],
+}
+
+
+class FakeScraper:
+    league_url = None
+
+    def get_teams(self):
+        return STANDINGS[self.league_url]
+
+
+class FakeWorker:
+    """
+    Stands in for a ScraperWorker, answering from STANDINGS and SQUADS.
+    """
+
+    def __init__(self):
+        self.sofascore_scraper = FakeScraper()
+
+    def read_squad(self, team):
+        return SQUADS[team['url']]
+
+    def scrape_player(self, player, team_name, competition, season):
+        return {player['link']: {'Goals': '1'}}
+
+
+class Reporter:
+    def report(self):
+        pass
+
+
+class FakePool:
+    """
+    Stands in for a WorkerPool with one worker, whose deferred players come back from `retried`.
+    """
+
+    def __init__(self, retried=()):
+        self.workers = [FakeWorker()]
+        self.retried = list(retried)
+        self.retries = self.breaker = Reporter()
+
+    def run(self, task):
+        return task(self.workers[0])
+
+    def retry_deferred(self):
+        yield from self.retried
+
+
+def test_jobs_are_handed_over_as_they_finish():
+    current = CrawlJob('LaLiga', '24/25', league_url='current')
+    previous = CrawlJob('LaLiga', '23/24', league_url='previous')
+    finished = []
+
+    def on_finished(job):
+        finished.append((job.label, len(job.accumulator), previous.finished_at is None))
+
+    CrawlScheduler(FakePool(), [current, previous], on_finished=on_finished).run()
+
+    # The current season is handed over before the back-season is done, and the
+    # back-season is not finished by its first, already read and empty, squad
+    assert finished == [('LaLiga 24/25', 2, True), ('LaLiga 23/24', 2, False)]
+
+
+def test_jobs_with_retried_players_are_handed_over_again():
+    current = CrawlJob('LaLiga', '24/25', league_url='current')
+    retried = [({'competition': 'LaLiga', 'season': '24/25', 'team_name': 'Betis'}, {'player/joaquin': {}}),
+               ({'competition': 'LaLiga', 'season': '24/25', 'team_name': 'Betis'}, {})]
+    finished = []
+
+    CrawlScheduler(FakePool(retried), [current], on_finished=lambda job: finished.append(len(job.accumulator))).run()
+
+    assert finished == [2, 3]
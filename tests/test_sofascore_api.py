@@ -0,0 +1,121 @@
+import os
+
+import pytest
+
+from checkpoint_store import CheckpointStore
+from data_manager import COLUMNS, CURRENT_SEASON, convert_stat_columns, create_dataframe
+from player_stats import parse_field_player, parse_goalkeeper
+from replay_server import ReplayRequestHandler, ReplayServer
+from sofascore_api import ApiPlayerScraper, ApiTeamScraper, SofaScoreApiClient
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'sofascore')
+
+
+class StubStatReader:
+    """
+    Answers every cell of the statistics block with numbers, to list the columns a browser scrape yields.
+    """
+
+    def player_name(self):
+        return 'Player'
+
+    def text(self, section, row):
+        return " ".join(str(i) for i in range(1, 13))
+
+
+class FailingRequestHandler(ReplayRequestHandler):
+    """
+    Answers the paths in `failing` with a server error and replays every other one.
+    """
+
+    failing = ()
+
+    def do_GET(self):
+        if self.path in self.failing:
+            self.send_error(500)
+            return
+        super().do_GET()
+
+
+def failing_server(*paths):
+    handler_class = type('FailingRequestHandler', (FailingRequestHandler,), {'failing': paths})
+    return ReplayServer(FIXTURES, handler_class=handler_class)
+
+
+@pytest.fixture
+def client():
+    with ReplayServer(FIXTURES) as server:
+        client = SofaScoreApiClient(base_url=f"{server.url}/api/v1")
+        yield client
+        client.close()
+
+
+def test_teams_from_standings(client):
+    assert ApiTeamScraper(client).get_teams() == [
+        {'name': 'Barcelona', 'url': 'https://www.sofascore.com/team/football/barcelona/2817', 'id': 2817},
+        {'name': 'Real Madrid', 'url': 'https://www.sofascore.com/team/football/real-madrid/2829', 'id': 2829},
+    ]
+
+
+def test_players_match_the_browser_layout(client):
+    teams = ApiTeamScraper(client).get_teams()
+    teams_data = dict(ApiPlayerScraper(client).scrape_teams(teams))
+
+    # The player without statistics for the season is skipped
+    assert sorted(teams_data['Real Madrid']) == ['Thibaut Courtois', 'Vinícius Júnior']
+    assert list(teams_data['Barcelona']) == ['Lamine Yamal']
+
+    _, field_player = parse_field_player(StubStatReader())
+    _, goalkeeper = parse_goalkeeper(StubStatReader())
+    assert list(teams_data['Real Madrid']['Vinícius Júnior']) == list(field_player)
+    assert list(teams_data['Real Madrid']['Thibaut Courtois']) == list(goalkeeper)
+
+    vinicius = teams_data['Real Madrid']['Vinícius Júnior']
+    assert vinicius['Games Played'] == '30'
+    assert vinicius['Minutes Played'] == '83'
+    assert vinicius['Expected Goals (xG)'] == '13.47'
+    assert vinicius['Shots Per Game'] == '3.2'
+    assert vinicius['Pass Completion Percentage'] == '85%'
+    assert vinicius['Succesful Passes Opp. Half Percentage'] == '77%'
+    courtois = teams_data['Real Madrid']['Thibaut Courtois']
+    assert courtois['Saves Per Game Percentage'] == '75%'
+    assert courtois['Goals Prevented'] == '4.21'
+
+    players_df = convert_stat_columns(create_dataframe(teams_data))
+    assert list(players_df.columns) == COLUMNS
+    assert players_df.loc[('Real Madrid', 'Vinícius Júnior'), 'Pass Completion Percentage'] == pytest.approx(85)
+    assert players_df.loc[('Barcelona', 'Lamine Yamal'), 'Minutes Played'] == pytest.approx(82)
+    assert players_df.loc[('Real Madrid', 'Thibaut Courtois'), 'Clean Sheets'] == 12
+
+
+def test_team_with_failed_players_is_left_open(tmp_path):
+    checkpoint = CheckpointStore(str(tmp_path / 'checkpoint.db'))
+    failing = '/api/v1/player/868812/unique-tournament/8/season/61643/statistics/overall'
+    with failing_server(failing) as server:
+        client = SofaScoreApiClient(base_url=f"{server.url}/api/v1")
+        teams = ApiTeamScraper(client).get_teams()
+        teams_data = dict(ApiPlayerScraper(client, checkpoint=checkpoint).scrape_teams(teams))
+        client.close()
+
+    assert list(teams_data['Real Madrid']) == ['Thibaut Courtois']
+    # Recorded under the same labels as the browser backend
+    assert checkpoint.team_completed('Barcelona', 'LaLiga', CURRENT_SEASON)
+    assert not checkpoint.team_completed('Real Madrid', 'LaLiga', CURRENT_SEASON)
+    assert list(checkpoint.completed_players('Real Madrid', 'LaLiga', CURRENT_SEASON)) == [
+        'https://www.sofascore.com/player/thibaut-courtois/70988'
+    ]
+    checkpoint.close()
+
+
+def test_failed_squad_skips_the_team(tmp_path):
+    checkpoint = CheckpointStore(str(tmp_path / 'checkpoint.db'))
+    with failing_server('/api/v1/team/2817/players') as server:
+        client = SofaScoreApiClient(base_url=f"{server.url}/api/v1")
+        teams = ApiTeamScraper(client).get_teams()
+        teams_data = dict(ApiPlayerScraper(client, checkpoint=checkpoint).scrape_teams(teams))
+        client.close()
+
+    assert list(teams_data) == ['Real Madrid']
+    assert not checkpoint.team_completed('Barcelona', 'LaLiga', CURRENT_SEASON)
+    assert checkpoint.team_completed('Real Madrid', 'LaLiga', CURRENT_SEASON)
+    checkpoint.close()
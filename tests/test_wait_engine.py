@@ -0,0 +1,60 @@
+import time
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+import wait_engine
+from wait_engine import AdaptiveWait
+
+
+def ready_after(seconds):
+    ready_at = time.monotonic() + seconds
+    return lambda driver: time.monotonic() >= ready_at
+
+
+def learned(waits, name, count=5):
+    for _ in range(count):
+        waits.until(name, lambda driver: True, default=2)
+
+
+def test_timeout_is_learned_from_the_latency_percentile(monkeypatch):
+    # Every wait reads the clock when it starts and when it is over
+    readings = iter([0, 0.1, 0, 0.2, 0, 0.3, 0, 0.4, 0, 1.0])
+    monkeypatch.setattr(wait_engine.time, 'perf_counter', lambda: next(readings))
+    waits = AdaptiveWait(driver=None, percentile=0.95, margin=3.0, min_timeout=0.5)
+
+    for _ in range(4):
+        waits.until('stats_block', lambda driver: True)
+    assert waits.timeout_for('stats_block', 30) == 30
+    waits.until('stats_block', lambda driver: True)
+
+    assert waits.timeout_for('stats_block', 30) == pytest.approx(3.0)
+    # The default stays the upper bound
+    assert waits.timeout_for('stats_block', 2.5) == 2.5
+    assert waits.stats()['stats_block']['median'] == pytest.approx(0.3)
+
+
+def test_slow_wait_falls_back_to_the_default():
+    waits = AdaptiveWait(driver=None, min_timeout=0.05, poll_frequency=0.01)
+    learned(waits, 'stats_block')
+    assert waits.timeout_for('stats_block', 2) == 0.05
+
+    assert waits.until('stats_block', ready_after(0.2), default=2)
+
+    stats = waits.stats()['stats_block']
+    assert stats['fallbacks'] == 1
+    assert stats['timeouts'] == 0
+
+
+def test_wait_without_fallback_fails_at_the_learned_timeout():
+    waits = AdaptiveWait(driver=None, min_timeout=0.05, poll_frequency=0.01)
+    learned(waits, 'competition_option')
+
+    start = time.monotonic()
+    with pytest.raises(TimeoutException):
+        waits.until('competition_option', ready_after(1), default=2, fallback=False)
+
+    assert time.monotonic() - start < 0.5
+    stats = waits.stats()['competition_option']
+    assert stats['fallbacks'] == 0
+    assert stats['timeouts'] == 1
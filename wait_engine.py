@@ -0,0 +1,151 @@
+from collections import deque
+import threading
+import time
+
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+
+from instrumentation import metrics
+
+
+class AdaptiveWait:
+    """
+    Waits for named readiness conditions with timeouts learned during the run.
+
+    Every condition starts out with the caller's default timeout. Once enough
+    waits for it have succeeded, its timeout becomes a multiple of the observed
+    latency percentile, so a condition that is never going to be met (e.g. a
+    competition missing from a player's menu) gives up after a few seconds
+    instead of the full default. A learned timeout can be too tight for one
+    slow render, so unless the caller expects the condition to fail at times,
+    a wait that runs out of it gets the rest of the default before it fails.
+    Timed-out waits are counted but not used as samples.
+
+    Attributes:
+        driver (webdriver.Chrome): The WebDriver instance to poll.
+        percentile (float): Latency percentile the learned timeouts are based on.
+        margin (float): Factor applied to that percentile.
+        min_timeout (float): Lower bound of a learned timeout, in seconds.
+        min_samples (int): Successful waits needed before a timeout is learned.
+        poll_frequency (float): Seconds between two checks of a condition.
+        timeouts (dict): Number of timed-out waits per condition.
+        fallbacks (dict): Number of waits per condition that outlasted the learned timeout.
+    """
+
+    def __init__(self, driver, percentile=0.95, margin=3.0, min_timeout=2.0, min_samples=5, window=200,
+                 poll_frequency=0.1):
+        """
+        Initializes the wait engine for a driver.
+
+        Parameters:
+            driver (webdriver.Chrome): The WebDriver instance to poll.
+            percentile (float): Latency percentile the learned timeouts are based on.
+            margin (float): Factor applied to that percentile.
+            min_timeout (float): Lower bound of a learned timeout, in seconds.
+            min_samples (int): Successful waits needed before a timeout is learned.
+            window (int): Number of recent latencies kept per condition.
+            poll_frequency (float): Seconds between two checks of a condition.
+        """
+        self.driver = driver
+        self.percentile = percentile
+        self.margin = margin
+        self.min_timeout = min_timeout
+        self.min_samples = min_samples
+        self.poll_frequency = poll_frequency
+        self.timeouts = {}
+        self.fallbacks = {}
+        self._window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def timeout_for(self, name, default):
+        """
+        Returns the timeout to use for a condition.
+
+        Parameters:
+            name (str): Name of the condition.
+            default (float): Timeout used until enough latencies were observed; also
+                the upper bound of the learned timeout.
+
+        Returns:
+            float: The timeout in seconds.
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(name, ()))
+        if len(samples) < self.min_samples:
+            return default
+        latency = samples[min(len(samples) - 1, int(self.percentile * len(samples)))]
+        return min(default, max(self.min_timeout, latency * self.margin))
+
+    def until(self, name, condition, default=30, fallback=True):
+        """
+        Waits until a condition returns a truthy value.
+
+        Parameters:
+            name (str): Name of the condition, e.g. 'season_label'.
+            condition (callable): Called with the driver, like the expected conditions
+                of `selenium.webdriver.support.expected_conditions`.
+            default (float): Timeout in seconds until one has been learned.
+            fallback (bool): Keep waiting up to the default once the learned timeout runs
+                out. Pass False for conditions that are legitimately never met, e.g. an
+                option missing from a menu, so that they keep failing fast.
+
+        Returns:
+            The condition's truthy result, e.g. the element found.
+
+        Raises:
+            TimeoutException: If the condition is not met within the timeout.
+        """
+        timeout = self.timeout_for(name, default)
+        start = time.perf_counter()
+        try:
+            result = WebDriverWait(self.driver, timeout, poll_frequency=self.poll_frequency).until(condition)
+        except TimeoutException:
+            remaining = default - (time.perf_counter() - start)
+            if not fallback or timeout >= default or remaining <= 0:
+                self._timed_out(name, start)
+                raise
+            with self._lock:
+                self.fallbacks[name] = self.fallbacks.get(name, 0) + 1
+            try:
+                result = WebDriverWait(self.driver, remaining, poll_frequency=self.poll_frequency).until(condition)
+            except TimeoutException:
+                self._timed_out(name, start)
+                raise
+
+        latency = time.perf_counter() - start
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self._window)
+            samples.append(latency)
+        metrics.observe(f"wait:{name}", latency)
+        return result
+
+    def _timed_out(self, name, start):
+        with self._lock:
+            self.timeouts[name] = self.timeouts.get(name, 0) + 1
+        metrics.observe(f"wait_timeout:{name}", time.perf_counter() - start)
+
+    def stats(self):
+        """
+        Returns what has been learned about every condition.
+
+        Returns:
+            dict: Sample count, median latency, timeouts, fallbacks and the current timeout of
+                every condition, keyed by name. The current timeout is None until learned.
+        """
+        with self._lock:
+            names = sorted(set(self._samples) | set(self.timeouts))
+            fallbacks = dict(self.fallbacks)
+            samples = {name: sorted(self._samples.get(name, ())) for name in names}
+        return {
+            name: {
+                'samples': len(samples[name]),
+                'median': samples[name][len(samples[name]) // 2] if samples[name] else None,
+                'timeouts': self.timeouts.get(name, 0),
+                'fallbacks': fallbacks.get(name, 0),
+                'timeout': self.timeout_for(name, float('inf')) if len(samples[name]) >= self.min_samples else None,
+            }
+            for name in names
+        }
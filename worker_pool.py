@@ -0,0 +1,300 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+import json
+import queue
+import time
+
+from selenium.common.exceptions import TimeoutException
+
+from browser_manager import BrowserManager
+from page_state import PageNavigator
+from popup_handler import PopupHandler
+from sofascore_scraper import SofaScoreScraper
+from player_scraper import PlayerScraper
+from instrumentation import metrics
+from wait_engine import AdaptiveWait
+from retry_queue import CircuitBreaker, RetryQueue
+
+MAX_WORKERS = 8
+
+
+class ScraperWorker:
+    """
+    A browser together with the popup handler and scrapers that drive it.
+
+    Attributes:
+        browser_manager (BrowserManager): The browser owned by this worker.
+        driver (webdriver.Chrome): The WebDriver instance of the browser.
+        navigator (PageNavigator): Page state shared by everything driving the browser.
+        waits (AdaptiveWait): Wait engine shared by everything driving the browser.
+        popup_handler (PopupHandler): Popup handler bound to this worker's driver.
+        cache (PageCache): Page cache shared by the worker's scrapers, also holding team rosters.
+        sofascore_scraper (SofaScoreScraper): Team scraper bound to this worker's driver.
+        player_scraper (PlayerScraper): Player scraper bound to this worker's driver.
+    """
+
+    def __init__(self, browser_manager, cache=None, **scraper_options):
+        """
+        Initializes the worker around an already started browser.
+
+        Parameters:
+            browser_manager (BrowserManager): The browser this worker will drive.
+            cache (PageCache, optional): Page cache shared by the worker's scrapers.
+            **scraper_options: Extra keyword arguments for the worker's PlayerScraper.
+        """
+        self.browser_manager = browser_manager
+        self.driver = browser_manager.get_driver()
+        self.cache = cache
+        self.waits = AdaptiveWait(self.driver)
+        self.popup_handler = PopupHandler(self.driver)
+        self.navigator = PageNavigator(self.driver, self.popup_handler)
+        self.sofascore_scraper = SofaScoreScraper(self.driver, self.popup_handler, cache=cache, waits=self.waits,
+                                                 navigator=self.navigator)
+        self.player_scraper = PlayerScraper(self.driver, self.popup_handler, navigator=self.navigator,
+                                            cache=cache, waits=self.waits, **scraper_options)
+
+    def scrape_team(self, team):
+        """
+        Scrapes every player of a team.
+
+        Reads the squad, from the roster cache if possible, and scrapes its players.
+        The team's players are removed from the worker's scraper afterwards so that
+        a long-lived worker does not keep every team it has scraped in memory.
+        Teams already finished in the checkpoint store are reloaded from it without
+        opening the team page.
+
+        Parameters:
+            team (dict): A team as returned by SofaScoreScraper.get_teams().
+
+        Returns:
+            dict: The scraped players of the team, keyed by player name.
+        """
+        scraper = self.player_scraper
+        checkpoint = scraper.checkpoint
+        if checkpoint is not None and checkpoint.team_completed(team['name'], scraper.competition, scraper.season):
+            print(f"Reloading {team['name']} from checkpoint")
+            return checkpoint.load_team(team['name'], scraper.competition, scraper.season)
+
+        print(f"Scraping players from: {team['name']}")
+        try:
+            with metrics.scope(team=team['name']), metrics.timed('team'):
+                try:
+                    squad = self.read_squad(team)
+                except TimeoutException:
+                    print(f"Error: The squad table of {team['name']} took too long to load.")
+                    return {}
+                if self.player_scraper.scrape_players_data(team['name'], players=squad) and checkpoint is not None:
+                    checkpoint.record_team(team['name'], scraper.competition, scraper.season)
+        finally:
+            # Even if the team fails, its players must not stay behind in this worker
+            players = self.player_scraper.teams_data.pop(team['name'], {})
+        return players
+
+    def open_team_page(self, team):
+        """
+        Shows a team's page in list view, closing popups.
+
+        Parameters:
+            team (dict): A team as returned by SofaScoreScraper.get_teams().
+        """
+        if self.navigator.navigate(team['url']):
+            metrics.milestone('first_team_page')
+            self.popup_handler.cerrar_popup()
+
+        try:
+            self.sofascore_scraper.switch_to_list_view()
+        except Exception as e:
+            print(f"Error switching to list view: {e}")
+            self.popup_handler.cerrar_popup()
+
+    def read_squad(self, team):
+        """
+        Lists a team's players without scraping them.
+
+        Rosters are kept in the page cache under the 'team' kind, so a team read
+        recently is listed without opening its page.
+
+        Parameters:
+            team (dict): A team as returned by SofaScoreScraper.get_teams().
+
+        Returns:
+            list[dict]: The 'link' and 'position' of every player of the team.
+
+        Raises:
+            TimeoutException: If the squad table takes too long to load.
+        """
+        if self.cache is not None:
+            cached = self.cache.get('team', team['url'])
+            if cached is not None:
+                return json.loads(cached)
+        with metrics.scope(team=team['name']):
+            self.open_team_page(team)
+            squad = self.player_scraper.read_squad()
+        if self.cache is not None and squad:
+            self.cache.put('team', team['url'], json.dumps(squad))
+        return squad
+
+    def scrape_player(self, player, team_name, competition, season):
+        """
+        Scrapes one player's statistics for a competition and season.
+
+        Scraping the same player for several competitions or seasons in a row
+        loads the page only once; only the dropdowns are changed.
+
+        Parameters:
+            player (dict): The player's 'link' and 'position' from the squad table.
+            team_name (str): The team the player belongs to.
+            competition (str): Competition to select on the player page.
+            season (str): Season to select on the player page.
+
+        Returns:
+            dict: The player's statistics keyed by player name, empty if not scraped or
+                deferred to the retry queue.
+        """
+        scraper = self.player_scraper
+        scraper.competition = competition
+        scraper.season = season
+        with metrics.scope(team=team_name, player=player['link']), metrics.timed('player'):
+            scraper.try_player(player, team_name)
+            scraper.collect_parsed_pages()
+        return scraper.teams_data.pop(team_name, {})
+
+    def retry_player(self, entry):
+        """
+        Retries a player taken from the retry queue.
+
+        Parameters:
+            entry (dict): The 'player', 'team_name', 'competition' and 'season' to retry.
+
+        Returns:
+            dict: The player's statistics keyed by player name, empty if it failed again.
+        """
+        return self.scrape_player(entry['player'], entry['team_name'], entry['competition'], entry['season'])
+
+    def quit(self):
+        """
+        Closes the worker's browser.
+        """
+        self.browser_manager.quit()
+
+
+class WorkerPool:
+    """
+    A pool of scraper workers that share out teams between their browsers.
+
+    Each team is handed to whichever worker becomes idle first, so slow teams do
+    not hold back the rest of the pool. Players that fail are deferred to a retry
+    queue shared by every worker and retried with `retry_deferred` once the
+    teams are done.
+
+    Attributes:
+        workers (list[ScraperWorker]): The workers in the pool.
+        retries (RetryQueue): Failed players waiting to be retried.
+        breaker (CircuitBreaker): Circuit breaker shared by every worker's player requests.
+    """
+
+    def __init__(self, size, headless=True, max_workers=MAX_WORKERS, cache=None, browser_options=None,
+                 retries=None, breaker=None, **scraper_options):
+        """
+        Starts the pool's browsers.
+
+        Parameters:
+            size (int): Requested number of workers.
+            headless (bool): Whether the browsers run without a visible window.
+            max_workers (int): Upper bound on the number of workers actually started.
+            cache (PageCache, optional): Page cache shared by every worker.
+            browser_options (dict, optional): Extra keyword arguments for every BrowserManager.
+            retries (RetryQueue, optional): Queue failed players are deferred to; a default
+                one is created if not given.
+            breaker (CircuitBreaker, optional): Circuit breaker for player requests; a default
+                one is created if not given.
+            **scraper_options: Extra keyword arguments for every worker's PlayerScraper.
+        """
+        size = max(1, min(size, max_workers))
+        self.retries = retries if retries is not None else RetryQueue()
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        managers = BrowserManager.pool(size, headless, **(browser_options or {}))
+        self.workers = [ScraperWorker(manager, cache=cache, retries=self.retries, breaker=self.breaker,
+                                      **scraper_options) for manager in managers]
+        self._idle = queue.Queue()
+        for worker in self.workers:
+            self._idle.put(worker)
+
+    def run(self, task):
+        """
+        Runs a task on the first worker to become idle.
+
+        Parameters:
+            task (callable): Called with the ScraperWorker, which it has to itself until it returns.
+
+        Returns:
+            The task's result.
+        """
+        worker = self._idle.get()
+        try:
+            return task(worker)
+        finally:
+            self._idle.put(worker)
+
+    def _run(self, team):
+        return self.run(lambda worker: worker.scrape_team(team))
+
+    def scrape_teams(self, teams):
+        """
+        Scrapes the given teams across the pool.
+
+        Parameters:
+            teams (list[dict]): Teams as returned by SofaScoreScraper.get_teams().
+
+        Yields:
+            tuple[str, dict]: The team name and its scraped players, in completion order.
+        """
+        with ThreadPoolExecutor(max_workers=len(self.workers)) as executor:
+            futures = {executor.submit(self._run, team): team for team in teams}
+            for future in as_completed(futures):
+                team = futures[future]
+                try:
+                    players = future.result()
+                except Exception as e:
+                    print(f"Error scraping {team['name']}: {e}")
+                    players = {}
+                yield team['name'], players
+
+    def retry_deferred(self):
+        """
+        Retries the deferred players across the pool until none is left.
+
+        Each player is started once its backoff delay has passed; players that fail
+        again go back into the queue until they run out of attempts.
+
+        Yields:
+            tuple[dict, dict]: The retried entry and its scraped players, in completion order.
+        """
+        with ThreadPoolExecutor(max_workers=len(self.workers)) as executor:
+            running = {}
+            while len(self.retries) or running:
+                while len(running) < len(self.workers):
+                    entry = self.retries.pop_due()
+                    if entry is None:
+                        break
+                    future = executor.submit(self.run, lambda worker, entry=entry: worker.retry_player(entry))
+                    running[future] = entry
+                if not running:
+                    time.sleep(self.retries.wait_time() or 0)
+                    continue
+                done, _ = wait(running, timeout=self.retries.wait_time(), return_when=FIRST_COMPLETED)
+                for future in done:
+                    entry = running.pop(future)
+                    try:
+                        players = future.result()
+                    except Exception as e:
+                        self.retries.give_up(entry, e)
+                        print(f"Error retrying {entry['player']['link']}: {e}")
+                        players = {}
+                    yield entry, players
+
+    def quit(self):
+        """
+        Closes every browser in the pool.
+        """
+        for worker in self.workers:
+            worker.quit()